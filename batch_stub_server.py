@@ -0,0 +1,293 @@
+"""
+Local stand-in for the Anthropic Message Batches and OpenAI Batch APIs.
+
+Lets `run_full_benchmark.py --batch` be exercised offline. The SDKs pick the
+server up from their base URL environment variables:
+
+    python batch_stub_server.py --port 8765 &
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub \\
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub GOOGLE_API_KEY= \\
+        python run_full_benchmark.py --batch --trials 1
+
+Batches finish --delay seconds after submission. Every model answers with a
+canned stub response. Plain /v1/messages and /v1/chat/completions calls are
+served too, so the judge runs against the stub and gets a JSON verdict back.
+"""
+import argparse
+import email
+import email.policy
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+JUDGE_PROMPT_PREFIX = "You are evaluating an AI's answer"
+
+
+def stub_answer(model, prompt):
+    if prompt.startswith(JUDGE_PROMPT_PREFIX):
+        return json.dumps({"score": 1, "reasoning": "Stub judge verdict"})
+    return f"[{model} stub] {prompt[:80]}"
+
+
+def prompt_text(messages):
+    content = messages[-1]['content'] if messages else ''
+    if isinstance(content, list):
+        content = ' '.join(block.get('text', '') for block in content)
+    return content
+
+
+def anthropic_message(params):
+    return {
+        'id': f"msg_{uuid.uuid4().hex[:24]}",
+        'type': 'message',
+        'role': 'assistant',
+        'model': params['model'],
+        'content': [{'type': 'text', 'text': stub_answer(params['model'], prompt_text(params['messages']))}],
+        'stop_reason': 'end_turn',
+        'stop_sequence': None,
+        'usage': {'input_tokens': 0, 'output_tokens': 0},
+    }
+
+
+def openai_completion(body):
+    return {
+        'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body['model'],
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': stub_answer(body['model'], prompt_text(body['messages']))},
+            'finish_reason': 'stop',
+        }],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+    }
+
+
+class StubState:
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.anthropic_batches = {}
+        self.openai_batches = {}
+        self.files = {}
+
+    def add_file(self, data, purpose, filename='batch.jsonl'):
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.files[file_id] = {
+                'id': file_id,
+                'object': 'file',
+                'bytes': len(data),
+                'created_at': int(time.time()),
+                'filename': filename,
+                'purpose': purpose,
+                'status': 'processed',
+                'data': data,
+            }
+        return file_id
+
+    def finished(self, batch):
+        return time.time() - batch['submitted'] >= self.delay
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, text, content_type='application/octet-stream'):
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_found(self):
+        self.send_json({'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}}, status=404)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip('/')
+
+        if path == '/v1/messages':
+            return self.send_json(anthropic_message(json.loads(self.read_body())))
+        if path == '/v1/messages/batches':
+            return self.create_anthropic_batch(json.loads(self.read_body()))
+        if path == '/v1/chat/completions':
+            return self.send_json(openai_completion(json.loads(self.read_body())))
+        if path == '/v1/files':
+            return self.upload_file()
+        if path == '/v1/batches':
+            return self.create_openai_batch(json.loads(self.read_body()))
+        self.not_found()
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+
+        if parts[:3] == ['v1', 'messages', 'batches'] and len(parts) == 4:
+            return self.get_anthropic_batch(parts[3])
+        if parts[:3] == ['v1', 'messages', 'batches'] and len(parts) == 5 and parts[4] == 'results':
+            return self.get_anthropic_results(parts[3])
+        if parts[:2] == ['v1', 'batches'] and len(parts) == 3:
+            return self.get_openai_batch(parts[2])
+        if parts[:2] == ['v1', 'files'] and len(parts) == 4 and parts[3] == 'content':
+            return self.get_file_content(parts[2])
+        self.not_found()
+
+    # Anthropic Message Batches
+
+    def create_anthropic_batch(self, payload):
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        results = [
+            {'custom_id': request['custom_id'], 'result': {'type': 'succeeded', 'message': anthropic_message(request['params'])}}
+            for request in payload['requests']
+        ]
+        with self.state.lock:
+            self.state.anthropic_batches[batch_id] = {'submitted': time.time(), 'results': results}
+        self.get_anthropic_batch(batch_id)
+
+    def get_anthropic_batch(self, batch_id):
+        batch = self.state.anthropic_batches.get(batch_id)
+        if batch is None:
+            return self.not_found()
+
+        finished = self.state.finished(batch)
+        total = len(batch['results'])
+        host = self.headers.get('Host')
+        self.send_json({
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if finished else 'in_progress',
+            'request_counts': {
+                'processing': 0 if finished else total,
+                'succeeded': total if finished else 0,
+                'errored': 0,
+                'canceled': 0,
+                'expired': 0,
+            },
+            'created_at': '2025-01-01T00:00:00Z',
+            'expires_at': '2025-01-02T00:00:00Z',
+            'ended_at': '2025-01-01T00:00:00Z' if finished else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"http://{host}/v1/messages/batches/{batch_id}/results" if finished else None,
+        })
+
+    def get_anthropic_results(self, batch_id):
+        batch = self.state.anthropic_batches.get(batch_id)
+        if batch is None or not self.state.finished(batch):
+            return self.not_found()
+        self.send_text('\n'.join(json.dumps(entry) for entry in batch['results']) + '\n')
+
+    # OpenAI Files + Batch
+
+    def upload_file(self):
+        # Multipart form upload; the std-lib email parser handles the MIME framing
+        message = email.message_from_bytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8') + self.read_body(),
+            policy=email.policy.default
+        )
+        data, purpose = b'', 'batch'
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == 'file':
+                data = part.get_payload(decode=True)
+            elif name == 'purpose':
+                purpose = part.get_content().strip()
+        file_id = self.state.add_file(data, purpose)
+        self.send_json({k: v for k, v in self.state.files[file_id].items() if k != 'data'})
+
+    def create_openai_batch(self, payload):
+        input_file = self.state.files.get(payload['input_file_id'])
+        if input_file is None:
+            return self.not_found()
+
+        lines = []
+        for line in input_file['data'].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(json.dumps({
+                'id': f"batch_req_{uuid.uuid4().hex[:24]}",
+                'custom_id': request['custom_id'],
+                'response': {'status_code': 200, 'request_id': uuid.uuid4().hex, 'body': openai_completion(request['body'])},
+                'error': None,
+            }))
+
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        output_file_id = self.state.add_file('\n'.join(lines).encode('utf-8'), 'batch_output', 'output.jsonl')
+        with self.state.lock:
+            self.state.openai_batches[batch_id] = {
+                'submitted': time.time(),
+                'payload': payload,
+                'output_file_id': output_file_id,
+                'total': len(lines),
+            }
+        self.get_openai_batch(batch_id)
+
+    def get_openai_batch(self, batch_id):
+        batch = self.state.openai_batches.get(batch_id)
+        if batch is None:
+            return self.not_found()
+
+        finished = self.state.finished(batch)
+        self.send_json({
+            'id': batch_id,
+            'object': 'batch',
+            'endpoint': batch['payload']['endpoint'],
+            'errors': None,
+            'input_file_id': batch['payload']['input_file_id'],
+            'completion_window': batch['payload']['completion_window'],
+            'status': 'completed' if finished else 'in_progress',
+            'output_file_id': batch['output_file_id'] if finished else None,
+            'error_file_id': None,
+            'created_at': int(batch['submitted']),
+            'request_counts': {
+                'total': batch['total'],
+                'completed': batch['total'] if finished else 0,
+                'failed': 0,
+            },
+        })
+
+    def get_file_content(self, file_id):
+        stored = self.state.files.get(file_id)
+        if stored is None:
+            return self.not_found()
+        self.send_text(stored['data'].decode('utf-8'))
+
+
+def make_server(host='127.0.0.1', port=8765, delay=0.0):
+    handler = type('BoundStubHandler', (StubHandler,), {'state': StubState(delay)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the provider batch APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help="Seconds before a submitted batch reports as finished")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.delay)
+    print(f"📦 Stub batch server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
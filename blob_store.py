@@ -0,0 +1,59 @@
+"""
+Content-addressed text blobs for the eval history database.
+
+Responses and judge reasoning are stored once per distinct text in the
+`blobs` table, keyed by the SHA-256 of the text, and compressed with zstd.
+`zstandard` is pinned in requirements.txt; where it isn't installed new
+blobs fall back to zlib, and zstd blobs written elsewhere can't be read.
+Rows in model_responses only hold the hashes. The codec is recorded per
+blob, so databases written with either codec read back the same way.
+A blob is deleted along with the last response that uses it.
+"""
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_RAW = 'raw'
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+
+# Texts shorter than this are stored as-is; compression headers would outweigh the savings
+MIN_COMPRESS_BYTES = 64
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+
+def encode_text(text):
+    """Returns (hash, codec, data) for one text"""
+    raw = text.encode('utf-8')
+    key = hashlib.sha256(raw).hexdigest()
+
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return key, CODEC_RAW, raw
+    if zstandard is not None:
+        data, codec = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), CODEC_ZSTD
+    else:
+        data, codec = zlib.compress(raw, ZLIB_LEVEL), CODEC_ZLIB
+    if len(data) >= len(raw):
+        return key, CODEC_RAW, raw
+    return key, codec, data
+
+
+def decode_text(codec, data):
+    """Inverse of encode_text; registered as the blob_text() SQL function"""
+    if codec is None or data is None:
+        return None
+    if codec == CODEC_RAW:
+        return bytes(data).decode('utf-8')
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode('utf-8')
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("This database has zstd-compressed blobs; pip install zstandard to read them")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    raise ValueError(f"Unknown blob codec: {codec}")
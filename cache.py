@@ -0,0 +1,237 @@
+"""
+On-disk caches that let benchmark re-runs skip work that was already paid for.
+
+ResponseCache stores model generations in SQLite. The key is a hash of
+(provider, model id, mode, prompt hash, generation params, trial index), so
+changing any of those misses the cache instead of returning a stale answer.
+Entries expire after `ttl` seconds (if set), and the least recently used ones
+are evicted once there are more than `max_entries`.
+
+JudgeCache stores judge verdicts, keyed on the question, expected answer,
+whitespace-normalized response and the judge's prompt/model version. Identical
+answers (across trials or across runs) are only ever judged once.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+CACHE_DB = "response_cache.db"
+
+# Most cached generations kept before least-recently-used ones are evicted
+DEFAULT_MAX_ENTRIES = 50000
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class SqliteCache:
+    """Connection, locking and hit/miss counting shared by the caches"""
+
+    def __init__(self, db_path=CACHE_DB, enabled=True, refresh=False):
+        # refresh: skip lookups but still store, to overwrite stale entries
+        self.db_path = db_path
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.entries = 0
+        self.lock = threading.Lock()
+        self.conn = None
+
+        if enabled:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.init_database()
+
+    def init_database(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': self.entries}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class ResponseCache(SqliteCache):
+    def __init__(self, db_path=CACHE_DB, ttl=None, max_entries=DEFAULT_MAX_ENTRIES, enabled=True, refresh=False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        super().__init__(db_path, enabled, refresh)
+
+    def init_database(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                trial INTEGER,
+                response TEXT NOT NULL,
+                latency_seconds REAL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (last_used)')
+        self.conn.commit()
+
+        # Also counts the entries that survive
+        self.prune()
+
+    def key(self, spec, prompt, use_search, trial):
+        params = {
+            'max_tokens': spec.max_tokens,
+            'search_tools': spec.search_tools if use_search else [],
+        }
+        parts = [
+            spec.provider,
+            spec.model_id,
+            'search' if use_search else 'no_search',
+            prompt_hash(prompt),
+            params,
+            trial,
+        ]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, spec, prompt, use_search=False, trial=None):
+        """Returns {'response', 'latency'} for a cached generation, or None"""
+        if not self.enabled or self.refresh:
+            return None
+
+        key = self.key(spec, prompt, use_search, trial)
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT response, latency_seconds, created_at FROM response_cache WHERE key = ?', (key,))
+            row = cursor.fetchone()
+
+            if row and self.ttl is not None and now - row[2] > self.ttl:
+                cursor.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+                self.entries -= 1
+                row = None
+
+            if row is None:
+                self.conn.commit()
+                self.misses += 1
+                return None
+
+            cursor.execute('UPDATE response_cache SET last_used = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return {'response': row[0], 'latency': row[1]}
+
+    def put(self, spec, prompt, response, use_search=False, trial=None, latency=None):
+        """Store a successful generation; errors are never cached"""
+        if not self.enabled or not response:
+            return
+
+        key = self.key(spec, prompt, use_search, trial)
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT 1 FROM response_cache WHERE key = ?', (key,))
+            is_new = cursor.fetchone() is None
+            cursor.execute('''
+                INSERT OR REPLACE INTO response_cache
+                (key, model_id, mode, prompt_hash, trial, response, latency_seconds, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, spec.model_id, 'search' if use_search else 'no_search', prompt_hash(prompt),
+                  trial, response, latency, now, now))
+            if is_new:
+                self.entries += 1
+            if self.entries > self.max_entries:
+                self._evict(cursor)
+            self.conn.commit()
+
+    def _evict(self, cursor):
+        cursor.execute('''
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_entries,))
+        self.entries -= cursor.rowcount
+
+    def prune(self):
+        """Drop expired entries and anything over the size limit"""
+        if not self.enabled:
+            return
+        with self.lock:
+            cursor = self.conn.cursor()
+            if self.ttl is not None:
+                cursor.execute('DELETE FROM response_cache WHERE created_at < ?', (time.time() - self.ttl,))
+            cursor.execute('SELECT COUNT(*) FROM response_cache')
+            self.entries = cursor.fetchone()[0]
+            if self.entries > self.max_entries:
+                self._evict(cursor)
+            self.conn.commit()
+
+
+def normalize_response(response):
+    """Collapse whitespace so reflowed but otherwise identical answers share a verdict"""
+    return ' '.join(response.split())
+
+
+class JudgeCache(SqliteCache):
+    def init_database(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                key TEXT PRIMARY KEY,
+                judge_version TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                reasoning TEXT,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+        cursor.execute('SELECT COUNT(*) FROM judge_cache')
+        self.entries = cursor.fetchone()[0]
+
+    def key(self, question, expected_answer, response, judge_version):
+        parts = [
+            prompt_hash(question),
+            prompt_hash(expected_answer or ''),
+            prompt_hash(normalize_response(response)),
+            judge_version,
+        ]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def get(self, question, expected_answer, response, judge_version):
+        """Returns (score, reasoning) for an already judged answer, or None"""
+        if not self.enabled or self.refresh:
+            return None
+
+        key = self.key(question, expected_answer, response, judge_version)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT score, reasoning FROM judge_cache WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, question, expected_answer, response, judge_version, score, reasoning):
+        """Store a parsed verdict; judge errors are never cached"""
+        if not self.enabled:
+            return
+
+        key = self.key(question, expected_answer, response, judge_version)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT 1 FROM judge_cache WHERE key = ?', (key,))
+            is_new = cursor.fetchone() is None
+            cursor.execute('''
+                INSERT OR REPLACE INTO judge_cache (key, judge_version, score, reasoning, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, judge_version, score, reasoning, time.time()))
+            if is_new:
+                self.entries += 1
+            self.conn.commit()
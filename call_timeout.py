@@ -0,0 +1,88 @@
+"""
+Shared, bounded executor for enforcing API call timeouts.
+
+A `with ThreadPoolExecutor(...)` block cannot abandon a hung call: leaving
+the block waits for the worker thread, and so does interpreter exit. This
+pool runs calls on daemon threads and stops waiting at the deadline. A
+timed-out call keeps its thread until the SDK gives up, and those threads
+are counted so they can be reported.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class CallTimeoutError(TimeoutError):
+    pass
+
+
+class TimeoutExecutor:
+    def __init__(self, max_workers=16):
+        self.max_workers = max_workers
+        self.tasks = queue.Queue()
+        self.threads = []
+        self.idle_workers = 0
+        self.lock = threading.Lock()
+
+        self.timeouts = 0
+        # Futures that timed out while running and have not finished since
+        self.hung = set()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        with self.lock:
+            self.tasks.put((future, fn, args, kwargs))
+            if self.idle_workers > 0:
+                self.idle_workers -= 1
+            elif len(self.threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"api-call-{len(self.threads)}",
+                    daemon=True
+                )
+                self.threads.append(thread)
+                thread.start()
+            # Otherwise every worker is busy (or hung) and the call waits its turn
+        return future
+
+    def _worker(self):
+        while True:
+            future, fn, args, kwargs = self.tasks.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self.lock:
+                self.idle_workers += 1
+
+    def run(self, fn, timeout, *args, **kwargs):
+        """Call fn on the pool; raise CallTimeoutError if it runs past timeout seconds"""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Still queued: cancelling is enough. Running: abandon the thread and count it.
+            if not future.cancel():
+                with self.lock:
+                    self.hung.add(future)
+                future.add_done_callback(self._release)
+            with self.lock:
+                self.timeouts += 1
+            raise CallTimeoutError(f"API call timed out after {timeout} seconds") from None
+
+    def _release(self, future):
+        with self.lock:
+            self.hung.discard(future)
+
+    def hung_count(self):
+        with self.lock:
+            return len(self.hung)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'timeouts': self.timeouts,
+                'hung_threads': len(self.hung),
+                'threads': len(self.threads),
+            }
@@ -0,0 +1,108 @@
+"""
+Parquet copies of detailed results, for analysis that reads a few columns.
+
+The exporters write results_detailed_<run_id>.parquet (and
+<prefix>_detailed.parquet) next to the CSVs when `pyarrow` is installed
+(it's in requirements.txt; without it they warn and write CSVs only). Repeated strings (run, question, model, mode, ...) are
+dictionary-encoded and pages are zstd-compressed. Readers load only the
+columns they ask for, so score/latency analysis never parses response text:
+
+    table = read_table("results_detailed_20260104_130836.parquet", columns=SCORE_COLUMNS)
+    df = read_frame("results_detailed_20260104_130836.parquet")   # pandas
+"""
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Trials buffered per record batch (and Parquet row group) while streaming
+PARQUET_BATCH_ROWS = 5000
+PARQUET_COMPRESSION = 'zstd'
+
+# What score/latency analysis needs; the text columns are the bulk of the file
+SCORE_COLUMNS = ['model', 'mode', 'question_id', 'trial', 'score', 'latency']
+
+# (column, Trial field, Arrow type name); 'dict' is a dictionary-encoded string
+DETAILED_COLUMNS = [
+    ('run_id', 'run_id', 'dict'),
+    ('question_id', 'question_id', 'dict'),
+    ('question', 'question', 'dict'),
+    ('expected_answer', 'expected_answer', 'dict'),
+    ('category', 'category', 'dict'),
+    ('model', 'model_name', 'dict'),
+    ('mode', 'mode', 'dict'),
+    ('trial', 'trial', 'int16'),
+    ('score', 'score', 'int8'),
+    ('error', 'error', 'string'),
+    ('latency', 'latency_seconds', 'float64'),
+    ('score_tier', 'score_tier', 'dict'),
+    ('response', 'response', 'string'),
+    ('reasoning', 'reasoning', 'string'),
+]
+
+
+def available():
+    return pa is not None
+
+
+def _require():
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow; pip install pyarrow")
+
+
+def detailed_schema():
+    _require()
+    types = {
+        'dict': pa.dictionary(pa.int32(), pa.string()),
+        'string': pa.string(),
+        'int8': pa.int8(),
+        'int16': pa.int16(),
+        'float64': pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in DETAILED_COLUMNS])
+
+
+def write_parquet(trials, filename, batch_rows=PARQUET_BATCH_ROWS):
+    """Stream Trial rows (ResultsStore.iter_trials) into a Parquet file; returns the row count"""
+    schema = detailed_schema()
+    fields = [field for _, field, _ in DETAILED_COLUMNS]
+    count = 0
+
+    with pq.ParquetWriter(filename, schema, compression=PARQUET_COMPRESSION, use_dictionary=True) as writer:
+        batch = []
+        for trial in trials:
+            batch.append(trial)
+            if len(batch) >= batch_rows:
+                writer.write_batch(_record_batch(batch, fields, schema))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_batch(_record_batch(batch, fields, schema))
+            count += len(batch)
+
+    return count
+
+
+def _record_batch(trials, fields, schema):
+    columns = [
+        pa.array([getattr(trial, field) for trial in trials], type=schema.field(index).type)
+        for index, field in enumerate(fields)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def read_table(filename, columns=SCORE_COLUMNS):
+    """The named columns of a detailed Parquet file as a pyarrow Table (columns=None reads all)"""
+    _require()
+    return pq.read_table(filename, columns=columns)
+
+
+def read_frame(filename, columns=SCORE_COLUMNS):
+    """read_table as a pandas DataFrame, dictionary columns decoded to plain strings"""
+    table = read_table(filename, columns)
+    decoded = [
+        column.cast(pa.string()) if pa.types.is_dictionary(column.type) else column
+        for column in table.columns
+    ]
+    return pa.Table.from_arrays(decoded, names=table.column_names).to_pandas()
@@ -1,118 +1,268 @@
 """
 Convert CSV data to JSON format for the website
+
+docs/data/summary.json          leaderboard
+docs/data/questions.json        explorer index: models per mode, and questions with their trial
+                                scores grouped mode -> model, no response text
+docs/data/questions/<id>.json   one shard per question with the full responses,
+                                fetched by the explorer when a trial box is clicked
+docs/data/manifest.json         content hash of every file above; the pages fetch
+                                data/<file>?v=<hash> so caches only miss on changed files
+
+The build is incremental: a file is rewritten only when its content hash differs
+from the previous manifest.
+
+The site is served by GitHub Pages from the committed docs/ folder, which
+compresses responses itself and never serves precompressed files, so none are
+written by default. --compress adds .gz (and .br when the optional `brotli`
+package is installed) siblings for a host that does serve them (nginx
+gzip_static/brotli_static, for instance); they are gitignored and have to be
+deployed with the rest of the build.
 """
+import argparse
 import csv
+import gzip
+import hashlib
 import json
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATA_DIR = 'docs/data'
+SHARD_DIR = os.path.join(DATA_DIR, 'questions')
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 16
+
+
+def load_summary(filename='twinpeaks_v1_summary_results.csv'):
+    """Leaderboard rows, one per model, sorted by no-search accuracy"""
+    summary_data = []
+    with open(filename, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            summary_data.append({
+                'model': row['model'],
+                'mode': row['mode'],
+                'pass1': float(row['pass@1']),
+                'pass3': float(row['pass@3']),
+                'accuracy': float(row['accuracy'])
+            })
 
-# Convert summary CSV to JSON
-summary_data = []
-with open('twinpeaks_v1_summary_results.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        summary_data.append({
-            'model': row['model'],
-            'mode': row['mode'],
-            'pass1': float(row['pass@1']),
-            'pass3': float(row['pass@3']),
-            'accuracy': float(row['accuracy'])
+    # Organize by model
+    models = {}
+    for row in summary_data:
+        model = row['model']
+        if model not in models:
+            models[model] = {}
+        models[model][row['mode']] = {
+            'pass1': row['pass1'],
+            'pass3': row['pass3'],
+            'accuracy': row['accuracy']
+        }
+
+    # Convert to list format sorted by no-search accuracy
+    model_list = []
+    for model, modes in models.items():
+        model_list.append({
+            'model': model,
+            'no_search': modes.get('NO SEARCH', {}),
+            'with_search': modes.get('WITH SEARCH', {})
         })
 
-# Organize by model
-models = {}
-for row in summary_data:
-    model = row['model']
-    if model not in models:
-        models[model] = {}
-    models[model][row['mode']] = {
-        'pass1': row['pass1'],
-        'pass3': row['pass3'],
-        'accuracy': row['accuracy']
+    # Sort by no-search accuracy
+    model_list.sort(key=lambda x: x.get('no_search', {}).get('accuracy', 0), reverse=True)
+    return model_list
+
+
+def load_questions(filename='twinpeaks_v1_detailed_results.csv'):
+    """Questions sorted by ID, each with all its responses, accuracy and difficulty"""
+    questions = {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            q_id = row['question_id']
+            if q_id not in questions:
+                questions[q_id] = {
+                    'id': q_id,
+                    'question': row['question'],
+                    'expected_answer': row['expected_answer'],
+                    'responses': []
+                }
+            questions[q_id]['responses'].append({
+                'model': row['model'],
+                'mode': row['mode'],
+                'trial': int(row['trial']),
+                'response': row['response'],
+                'score': int(row['score']),
+                'reasoning': row['reasoning'],
+                'latency': float(row['latency']) if row['latency'] else 0
+            })
+
+    # Calculate difficulty for each question (lower accuracy = harder)
+    for q_data in questions.values():
+        total_score = sum(r['score'] for r in q_data['responses'])
+        total_trials = len(q_data['responses'])
+        q_data['accuracy'] = (total_score / total_trials * 100) if total_trials > 0 else 0
+
+        # Difficulty rating (1-5 stars, inverse of accuracy)
+        if q_data['accuracy'] < 20:
+            q_data['difficulty'] = 5  # Very hard
+        elif q_data['accuracy'] < 40:
+            q_data['difficulty'] = 4  # Hard
+        elif q_data['accuracy'] < 60:
+            q_data['difficulty'] = 3  # Medium
+        elif q_data['accuracy'] < 80:
+            q_data['difficulty'] = 2  # Easy
+        else:
+            q_data['difficulty'] = 1  # Very easy
+
+    # Convert to list and sort by question ID
+    question_list = list(questions.values())
+    question_list.sort(key=lambda x: x['id'])
+    return question_list
+
+
+def index_entry(question):
+    """A question as the explorer index lists it: trial scores and pass counts by mode -> model"""
+    results = {}
+    for r in sorted(question['responses'], key=lambda r: r['trial']):
+        cell = results.setdefault(r['mode'], {}).setdefault(r['model'], {'trials': [], 'passed': 0})
+        cell['trials'].append({'trial': r['trial'], 'score': r['score']})
+        cell['passed'] += r['score']
+
+    return {
+        'id': question['id'],
+        'question': question['question'],
+        'expected_answer': question['expected_answer'],
+        'accuracy': question['accuracy'],
+        'difficulty': question['difficulty'],
+        'results': results
     }
 
-# Convert to list format sorted by no-search accuracy
-model_list = []
-for model, modes in models.items():
-    model_list.append({
-        'model': model,
-        'no_search': modes.get('NO SEARCH', {}),
-        'with_search': modes.get('WITH SEARCH', {})
-    })
-
-# Sort by no-search accuracy
-model_list.sort(key=lambda x: x.get('no_search', {}).get('accuracy', 0), reverse=True)
-
-# Save summary
-with open('docs/data/summary.json', 'w') as f:
-    json.dump(model_list, f, indent=2)
-
-print(f"✓ Converted summary data: {len(model_list)} models")
-
-# Convert detailed CSV to JSON
-detailed_data = []
-with open('twinpeaks_v1_detailed_results.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        detailed_data.append({
-            'question_id': row['question_id'],
-            'question': row['question'],
-            'expected_answer': row['expected_answer'],
-            'category': row['category'],
-            'model': row['model'],
-            'mode': row['mode'],
-            'trial': int(row['trial']),
-            'response': row['response'],
-            'score': int(row['score']),
-            'reasoning': row['reasoning'],
-            'latency': float(row['latency']) if row['latency'] else 0
-        })
 
-# Organize by question
-questions = {}
-for row in detailed_data:
-    q_id = row['question_id']
-    if q_id not in questions:
-        questions[q_id] = {
-            'id': q_id,
-            'question': row['question'],
-            'expected_answer': row['expected_answer'],
-            'responses': []
-        }
-    questions[q_id]['responses'].append({
-        'model': row['model'],
-        'mode': row['mode'],
-        'trial': row['trial'],
-        'response': row['response'],
-        'score': row['score'],
-        'reasoning': row['reasoning'],
-        'latency': row['latency']
-    })
-
-# Calculate difficulty for each question (lower accuracy = harder)
-for q_id, q_data in questions.items():
-    total_score = sum(r['score'] for r in q_data['responses'])
-    total_trials = len(q_data['responses'])
-    q_data['accuracy'] = (total_score / total_trials * 100) if total_trials > 0 else 0
-
-    # Difficulty rating (1-5 stars, inverse of accuracy)
-    if q_data['accuracy'] < 20:
-        q_data['difficulty'] = 5  # Very hard
-    elif q_data['accuracy'] < 40:
-        q_data['difficulty'] = 4  # Hard
-    elif q_data['accuracy'] < 60:
-        q_data['difficulty'] = 3  # Medium
-    elif q_data['accuracy'] < 80:
-        q_data['difficulty'] = 2  # Easy
-    else:
-        q_data['difficulty'] = 1  # Very easy
-
-# Convert to list and sort by question ID
-question_list = list(questions.values())
-question_list.sort(key=lambda x: x['id'])
-
-# Save detailed data
-with open('docs/data/detailed.json', 'w', encoding='utf-8') as f:
-    json.dump(question_list, f, indent=2, ensure_ascii=False)
-
-print(f"✓ Converted detailed data: {len(question_list)} questions")
-print(f"✓ Total responses: {len(detailed_data)}")
-print("\n✅ Data conversion complete!")
+def build_index(question_list):
+    """The explorer index: sorted model columns per mode, then the questions"""
+    entries = [index_entry(q) for q in question_list]
+    models = {}
+    for entry in entries:
+        for mode, cells in entry['results'].items():
+            models.setdefault(mode, set()).update(cells)
+
+    return {
+        'models': {mode: sorted(names) for mode, names in sorted(models.items())},
+        'questions': entries
+    }
+
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_hash(payload):
+    return hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+
+
+def load_manifest(data_dir=DATA_DIR):
+    """Hashes from the previous build, {} if there was none"""
+    try:
+        with open(os.path.join(data_dir, MANIFEST), 'r') as f:
+            return json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def compressed_siblings(path):
+    siblings = [(path + '.gz', lambda payload: gzip.compress(payload, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        siblings.append((path + '.br', lambda payload: brotli.compress(payload)))
+    return siblings
+
+
+def write_siblings(path, payload, missing_only=False):
+    for sibling, compressor in compressed_siblings(path):
+        if missing_only and os.path.exists(sibling):
+            continue
+        with open(sibling, 'wb') as f:
+            f.write(compressor(payload))
+
+
+def write_file(path, payload, compress=False):
+    with open(path, 'wb') as f:
+        f.write(payload)
+    if compress:
+        write_siblings(path, payload)
+
+
+def is_current(path, digest, previous):
+    """The file on disk already holds this content, going by the last manifest"""
+    return previous == digest and os.path.exists(path)
+
+
+def remove_file(path):
+    for name in (path, path + '.gz', path + '.br'):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def write_web_data(model_list, question_list, data_dir=DATA_DIR, compress=False, force=False):
+    """Write the site data, skipping files whose hash matches the last manifest; returns (written, unchanged)"""
+    shard_dir = os.path.join(data_dir, 'questions')
+    os.makedirs(shard_dir, exist_ok=True)
+    previous = {} if force else load_manifest(data_dir)
+
+    files = {
+        'summary.json': encode(model_list),
+        'questions.json': encode(build_index(question_list)),
+    }
+    for question in question_list:
+        files[f"questions/{question['id']}.json"] = encode(question)
+
+    hashes = {}
+    written = unchanged = 0
+    for name, payload in files.items():
+        digest = content_hash(payload)
+        hashes[name] = digest
+        path = os.path.join(data_dir, name)
+        if is_current(path, digest, previous.get(name)):
+            unchanged += 1
+            if compress:
+                # Unchanged content still gets the siblings a fresh clone doesn't have
+                write_siblings(path, payload, missing_only=True)
+            continue
+        write_file(path, payload, compress)
+        written += 1
+
+    # Shards of questions no longer in the results
+    for name in os.listdir(shard_dir):
+        if name.endswith('.json') and f"questions/{name}" not in files:
+            remove_file(os.path.join(shard_dir, name))
+
+    # The manifest goes last so an interrupted build is redone next time
+    with open(os.path.join(data_dir, MANIFEST), 'w') as f:
+        json.dump({'files': hashes}, f, indent=2, sort_keys=True)
+
+    return written, unchanged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the website data from the exported results')
+    parser.add_argument('--force', action='store_true', help='Rewrite every file, ignoring the previous manifest')
+    parser.add_argument('--compress', action='store_true',
+                        help='Also write precompressed .gz/.br copies, for hosts that serve them (not GitHub Pages)')
+    args = parser.parse_args()
+
+    model_list = load_summary()
+    print(f"✓ Converted summary data: {len(model_list)} models")
+
+    question_list = load_questions()
+    written, unchanged = write_web_data(model_list, question_list, compress=args.compress, force=args.force)
+
+    print(f"✓ Converted detailed data: {len(question_list)} questions ({SHARD_DIR}/<id>.json)")
+    print(f"✓ Total responses: {sum(len(q['responses']) for q in question_list)}")
+    print(f"✓ Files written: {written}, unchanged: {unchanged} ({DATA_DIR}/{MANIFEST})")
+    if args.compress and brotli is None:
+        print("⚠️  brotli not installed, only .gz copies written (pip install brotli)")
+    print("\n✅ Data conversion complete!")
@@ -3,6 +3,8 @@ import json
 from collections import defaultdict, Counter
 import anthropic
 import os
+
+import columnar
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -32,12 +34,37 @@ class FailurePatternDiscovery:
         
         return normalized
         
+    def load_parquet(self, path):
+        """Rows of a benchmark Parquet export, normalized like CSV rows"""
+        table = columnar.read_table(path, columns=[
+            'question_id', 'question', 'expected_answer', 'category', 'model', 'mode',
+            'trial', 'response', 'score', 'reasoning'
+        ])
+        rows = []
+        for row in table.to_pylist():
+            rows.append({
+                'question_id': row['question_id'],
+                'question': row['question'],
+                'expected': row['expected_answer'],
+                'category': row['category'],
+                'model': row['model'],
+                'mode': row['mode'],
+                'trial': row['trial'],
+                'response': row['response'] or '',
+                'pass_fail': 'PASS' if row['score'] == 1 else 'FAIL',
+                'judge_reasoning': row['reasoning'] or ''
+            })
+        return rows
+        
     def load_data(self):
         """Load all CSV files"""
         print("📂 Loading results from all files...")
         
         for csv_file in self.csv_files:
             print(f"  Loading {csv_file}...")
+            if csv_file.endswith('.parquet'):
+                self.data.extend(self.load_parquet(csv_file))
+                continue
             with open(csv_file, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 raw_data = list(reader)
@@ -399,6 +426,7 @@ if __name__ == "__main__":
         print("Usage: python3 discover_failure_patterns.py <file1.csv> [file2.csv] ...")
         print("\nExample:")
         print("  python3 discover_failure_patterns.py results_detailed_*.csv")
+        print("  python3 discover_failure_patterns.py results_detailed_*.parquet")
         sys.exit(1)
     
     csv_files = sys.argv[1:]
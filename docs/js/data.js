@@ -0,0 +1,24 @@
+// TwinPeaks Bench - Data file URLs
+
+// data/manifest.json maps each data file to a hash of its content. Files are
+// requested as data/<file>?v=<hash>, so a rebuild only invalidates the cached
+// copies of files whose content changed.
+let manifestRequest = null;
+
+function loadManifest() {
+    if (!manifestRequest) {
+        manifestRequest = fetch('data/manifest.json', { cache: 'no-cache' })
+            .then(response => response.ok ? response.json() : { files: {} })
+            .then(manifest => manifest.files || {})
+            // Without a manifest, files are fetched unversioned
+            .catch(() => ({}));
+    }
+    return manifestRequest;
+}
+
+// URL of a file under data/, e.g. dataUrl('questions/Q01.json')
+async function dataUrl(name) {
+    const files = await loadManifest();
+    const hash = files[name];
+    return hash ? `data/${name}?v=${hash}` : `data/${name}`;
+}
@@ -1,8 +1,13 @@
 // TwinPeaks Bench - Question Explorer JavaScript
 
+// Index of questions with trial scores grouped mode -> model -> trials;
+// full responses live in one shard per question
 let questionsData = [];
+let modelsByMode = {};
 let currentMode = 'NO SEARCH';
 let models = [];
+const shardCache = new Map();
+let modalRequest = 0;
 
 // Load data when page loads
 document.addEventListener('DOMContentLoaded', async () => {
@@ -12,28 +17,38 @@ document.addEventListener('DOMContentLoaded', async () => {
     setupEventListeners();
 });
 
-// Load data from JSON
+// Load the question index from JSON
 async function loadData() {
     try {
-        const response = await fetch('data/detailed.json');
-        questionsData = await response.json();
+        const response = await fetch(await dataUrl('questions.json'));
+        const index = await response.json();
+        questionsData = index.questions;
+        modelsByMode = index.models;
         console.log('Loaded questions:', questionsData.length);
     } catch (error) {
         console.error('Error loading data:', error);
     }
 }
 
-// Extract unique models from data
-function extractModels() {
-    const modelSet = new Set();
-    questionsData.forEach(q => {
-        q.responses.forEach(r => {
-            if (r.mode === currentMode) {
-                modelSet.add(r.model);
+// Load (once) the shard holding a question's full responses
+function loadShard(questionId) {
+    if (!shardCache.has(questionId)) {
+        const shard = dataUrl(`questions/${questionId}.json`).then(url => fetch(url)).then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
             }
+            return response.json();
         });
-    });
-    models = Array.from(modelSet).sort();
+        // A failed fetch is retried on the next click
+        shard.catch(() => shardCache.delete(questionId));
+        shardCache.set(questionId, shard);
+    }
+    return shardCache.get(questionId);
+}
+
+// Model columns for the current mode (precomputed in the index)
+function extractModels() {
+    models = modelsByMode[currentMode] || [];
     console.log('Models:', models);
 }
 
@@ -65,6 +80,7 @@ function renderTable() {
     const tbody = document.createElement('tbody');
 
     questionsData.forEach(question => {
+        const modeResults = question.results[currentMode] || {};
         const row = document.createElement('tr');
 
         // Question cell
@@ -81,20 +97,22 @@ function renderTable() {
             const trialsContainer = document.createElement('div');
             trialsContainer.className = 'trials-container';
 
-            // Get responses for this model and mode
-            const responses = question.responses.filter(r =>
-                r.model === model && r.mode === currentMode
-            ).sort((a, b) => a.trial - b.trial);
+            // Trial scores for this model and mode, already in trial order
+            const results = modeResults[model];
+            const mode = currentMode;
 
             // Create boxes for each trial (should be 3)
-            responses.forEach(response => {
-                const box = document.createElement('div');
-                box.className = 'trial-box';
-                box.classList.add(response.score === 1 ? 'correct' : 'incorrect');
-                box.title = `Trial ${response.trial} - Click to view`;
-                box.addEventListener('click', () => showModal(question, response));
-                trialsContainer.appendChild(box);
-            });
+            if (results) {
+                trialsContainer.title = `${results.passed}/${results.trials.length} correct`;
+                results.trials.forEach(trial => {
+                    const box = document.createElement('div');
+                    box.className = 'trial-box';
+                    box.classList.add(trial.score === 1 ? 'correct' : 'incorrect');
+                    box.title = `Trial ${trial.trial} - Click to view`;
+                    box.addEventListener('click', () => showModal(question, model, mode, trial));
+                    trialsContainer.appendChild(box);
+                });
+            }
 
             cell.appendChild(trialsContainer);
             row.appendChild(cell);
@@ -106,11 +124,33 @@ function renderTable() {
     table.appendChild(tbody);
 }
 
-// Show modal with response details
-function showModal(question, response) {
+// Show modal with response details, fetching the question's shard first
+async function showModal(question, model, mode, trial) {
     const modal = document.getElementById('response-modal');
     const modalBody = document.getElementById('modal-body');
 
+    modalBody.innerHTML = '<div class="modal-meta">Loading response...</div>';
+    modal.classList.add('show');
+    const request = ++modalRequest;
+
+    let response;
+    try {
+        const shard = await loadShard(question.id);
+        response = shard.responses.find(r =>
+            r.model === model && r.mode === mode && r.trial === trial.trial
+        );
+    } catch (error) {
+        console.error('Error loading responses:', error);
+    }
+    // Another box was clicked while this shard was loading
+    if (request !== modalRequest) {
+        return;
+    }
+    if (!response) {
+        modalBody.innerHTML = '<div class="modal-meta">Could not load this response.</div>';
+        return;
+    }
+
     const isCorrect = response.score === 1;
     const resultClass = isCorrect ? 'correct' : 'incorrect';
     const resultText = isCorrect ? '✅ Correct' : '❌ Incorrect';
@@ -144,8 +184,6 @@ function showModal(question, response) {
             </div>
         ` : ''}
     `;
-
-    modal.classList.add('show');
 }
 
 // Setup event listeners
@@ -16,7 +16,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 // Load data from JSON
 async function loadData() {
     try {
-        const response = await fetch('data/summary.json');
+        const response = await fetch(await dataUrl('summary.json'));
         modelsData = await response.json();
     } catch (error) {
         console.error('Error loading data:', error);
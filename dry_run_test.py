@@ -1,14 +1,11 @@
-import anthropic
-import openai
-from google import generativeai as genai
 import json
-import os
 from datetime import datetime
 from dotenv import load_dotenv
 import time
 from eval_logger import EvalLogger
+from rate_limiter import AdaptiveRateLimiter
+from providers import load_registry, build_adapters, generate
 import csv
-import sqlite3
 import statistics
 
 load_dotenv()
@@ -17,86 +14,18 @@ class DryRunBenchmark:
     def __init__(self):
         self.logger = EvalLogger()
         
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        openai_key = os.getenv('OPENAI_API_KEY')
-        google_key = os.getenv('GOOGLE_API_KEY')
-        
-        self.clients = {}
-        
-        if anthropic_key:
-            self.clients['anthropic'] = anthropic.Anthropic(api_key=anthropic_key)
-        if openai_key:
-            self.clients['openai'] = openai.OpenAI(api_key=openai_key)
-        if google_key:
-            genai.configure(api_key=google_key)
-            self.clients['google'] = True
-        
+        self.registry = load_registry()
+        self.rate_limiter = AdaptiveRateLimiter(self.registry.rate_limits())
+        self.adapters = build_adapters(self.registry, rate_limiter=self.rate_limiter)
         self.all_responses = []
         self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     def call_model(self, model_name, question, use_search=False):
-        try:
-            if model_name == "Claude Sonnet 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "Claude Opus 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "GPT-5.2":
-                response = self.clients['openai'].chat.completions.create(
-                    model="gpt-5.2",
-                    messages=[{"role": "user", "content": question}],
-                    max_completion_tokens=500
-                )
-                return response.choices[0].message.content, None
-            
-            elif model_name == "Gemini 3":
-                if use_search:
-                    model = genai.GenerativeModel(
-                        'gemini-3-pro-preview',
-                        tools='google_search'
-                    )
-                else:
-                    model = genai.GenerativeModel('gemini-3-pro-preview')
-                
-                response = model.generate_content(question)
-                return response.text, None
-            
-        except Exception as e:
-            return None, str(e)
-        
-        return None, "Unknown model"
-    
+        return generate(self.registry, self.adapters, model_name, question, use_search=use_search)
+
     def judge_response(self, question, expected_answer, response):
-        if 'anthropic' not in self.clients:
+        judge = self.registry.judge
+        if judge.provider not in self.adapters:
             return None, "No judge available"
         
         judge_prompt = f"""You are evaluating an AI's answer to a question.
@@ -115,14 +44,14 @@ Respond with ONLY a JSON object:
 
 Score 1 if correct, 0 if incorrect."""
 
+        self.rate_limiter.acquire(judge.provider)
+        judge_text, error = self.adapters[judge.provider].generate(judge, judge_prompt)
+        if error:
+            return 0, error
+        self.rate_limiter.record_success(judge.provider)
+
         try:
-            judge_response = self.clients['anthropic'].messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                messages=[{"role": "user", "content": judge_prompt}]
-            )
-            
-            judge_text = judge_response.content[0].text.strip()
+            judge_text = judge_text.strip()
             
             if judge_text.startswith('```'):
                 judge_text = judge_text.split('```')[1]
@@ -165,11 +94,13 @@ Score 1 if correct, 0 if incorrect."""
             for trial in range(num_trials):
                 print(f"    Trial {trial+1}/{num_trials}...", end=" ", flush=True)
                 
+                throttle = self.rate_limiter.acquire(self.registry.models[model_name].provider)
                 start_time = time.time()
                 response, error = self.call_model(model_name, question, use_search=use_search)
                 latency = time.time() - start_time
                 
                 if response:
+                    self.rate_limiter.record_success(self.registry.models[model_name].provider)
                     score, reasoning = self.judge_response(question, expected, response)
                     
                     self.logger.log_model_response(
@@ -177,19 +108,12 @@ Score 1 if correct, 0 if incorrect."""
                         model_name=model_name,
                         response=response,
                         error=None,
-                        latency=latency
+                        latency=latency,
+                        throttle=throttle,
+                        score=score,
+                        reasoning=reasoning
                     )
                     
-                    conn = sqlite3.connect('eval_history.db')
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        UPDATE model_responses 
-                        SET score = ?, reasoning = ?
-                        WHERE eval_id = ? AND model_name = ? AND response = ?
-                    ''', (score, reasoning, eval_id, model_name, response))
-                    conn.commit()
-                    conn.close()
-                    
                     self.all_responses.append({
                         'question_id': test_id,
                         'question': question,
@@ -214,7 +138,8 @@ Score 1 if correct, 0 if incorrect."""
                         model_name=model_name,
                         response=None,
                         error=error if error else "Unknown error",
-                        latency=latency
+                        latency=latency,
+                        throttle=throttle
                     )
                     
                     self.all_responses.append({
@@ -233,8 +158,6 @@ Score 1 if correct, 0 if incorrect."""
                     
                     print(f"❌")
                     model_results.append(0)
-                
-                time.sleep(0.5)
             
             results[model_name] = model_results
         
@@ -1,14 +1,103 @@
+import atexit
+import glob
+import hashlib
+import json
+import os
+import queue
+import re
 import sqlite3
+import threading
 from datetime import datetime
 
+from blob_store import encode_text, decode_text
+
+# Rows written before the open transaction is committed
+FLUSH_ROWS = 50
+# Longest a written row waits for its commit, in seconds
+FLUSH_INTERVAL = 0.5
+# How long a writer waits on another process's lock before "database is locked"
+BUSY_TIMEOUT_MS = 30000
+
+# Responses the write-behind ResultWriter holds before submit() blocks (back-pressure)
+WRITER_QUEUE_SIZE = 1000
+# Most queued responses written in one executemany transaction
+WRITER_BATCH_ROWS = 200
+
+# Bumped whenever init_database gains a migration step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 8
+
+# runs.kind: a full benchmark, or a rerun of a few questions (left out of ResultsStore.latest_run)
+RUN_KIND_BENCHMARK = 'benchmark'
+RUN_KIND_RERUN = 'rerun'
+# rerun_single_question.py names its runs (and, before run manifests, its eval_names) "RERUN <question id>"
+RERUN_EVAL_NAME_PREFIX = 'RERUN '
+
+# Before the runs/cells/trials tables, run identity was packed into evaluations.eval_name:
+# "TwinPeaks Bench V1 (WITH SEARCH) - RUN_20260104_192334", "... (GEMINI NO SEARCH) - RUN_..."
+LEGACY_EVAL_NAME = re.compile(r'^(?P<bench>.*) \((?P<mode>[A-Z ]*(?:NO|WITH) SEARCH)\) - RUN_(?P<run_id>\w+)$')
+
+# pass@1 scores a question by its first finished trial (lowest trial number with a
+# response; errors score 0), the same definition stats.compute_stats uses
+FIRST_TRIAL_SCORE_SQL = '''(
+    SELECT COALESCE(fr.score, 0) FROM trials ft
+    JOIN model_responses fr ON fr.id = ft.response_id
+    WHERE ft.cell_id = {cell_id}
+    ORDER BY ft.trial LIMIT 1
+)'''
+
+# A blob (in a DELETE FROM blobs) that neither the response nor the reasoning of any row uses
+BLOB_UNREFERENCED_SQL = '''NOT EXISTS (SELECT 1 FROM model_responses WHERE response_hash = blobs.hash)
+    AND NOT EXISTS (SELECT 1 FROM model_responses WHERE reasoning_hash = blobs.hash)'''
+
+# Eval sets used to recover question IDs for legacy rows, matched on prompt text
+EVAL_SET_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eval_set*.json')
+
+
+def legacy_question_ids(pattern=EVAL_SET_GLOB):
+    """Map prompt text -> question ID across the eval sets on disk"""
+    mapping = {}
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, 'r') as f:
+                test_cases = json.load(f).get('test_cases', [])
+        except (OSError, ValueError):
+            continue
+        for test_case in test_cases:
+            if 'prompt' in test_case and 'id' in test_case:
+                mapping.setdefault(test_case['prompt'].strip(), test_case['id'])
+    return mapping
+
 class EvalLogger:
-    def __init__(self, db_path="eval_history.db"):
+    """Logs to one long-lived WAL connection, committing in batches.
+
+    Writes join an open transaction that is committed every FLUSH_ROWS rows
+    or FLUSH_INTERVAL seconds, whichever comes first. flush() commits now.
+    Using the logger as a context manager (or reaching interpreter exit)
+    flushes and closes it.
+    """
+    def __init__(self, db_path="eval_history.db", flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL):
         self.db_path = db_path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.pending_rows = 0
+        self.lock = threading.RLock()
+        self.closed = threading.Event()
+
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        # WAL keeps the database consistent at NORMAL; only the last unsynced commits are at risk
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # Response/reasoning text lives in compressed blobs; the responses view decodes it with this
+        self.conn.create_function('blob_text', 2, decode_text, deterministic=True)
         self.init_database()
+
+        self.flusher = threading.Thread(target=self._flush_loop, name="eval-logger-flush", daemon=True)
+        self.flusher.start()
+        atexit.register(self.close)
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS evaluations (
@@ -29,64 +118,947 @@ class EvalLogger:
                 response TEXT,
                 error TEXT,
                 latency_seconds REAL,
+                throttle_seconds REAL,
+                score INTEGER,
+                reasoning TEXT,
+                score_tier TEXT,
+                response_hash TEXT,
+                reasoning_hash TEXT,
+                FOREIGN KEY (eval_id) REFERENCES evaluations (id)
+            )
+        ''')
+        
+        # Content-addressed response/reasoning text: one compressed copy per distinct text
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        # Run manifest: runs -> cells (mode, question, model) -> trials, each trial with its
+        # status, so an interrupted run can be resumed under the same run ID
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                eval_name TEXT,
+                eval_file TEXT,
+                num_trials INTEGER,
+                models TEXT,
+                modes TEXT,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'benchmark'
+            )
+        ''')
+        
+        # One cell per (run, mode, question, model); its trials are the repeated attempts
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cells (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                eval_id INTEGER NOT NULL,
+                UNIQUE (run_id, mode, question_id, model_name),
+                FOREIGN KEY (run_id) REFERENCES runs (run_id),
                 FOREIGN KEY (eval_id) REFERENCES evaluations (id)
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # trial is 1-based, seq is the run order used when resuming
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cell_id INTEGER NOT NULL,
+                trial INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                response_id INTEGER,
+                updated_at TEXT,
+                UNIQUE (cell_id, trial),
+                FOREIGN KEY (cell_id) REFERENCES cells (id),
+                FOREIGN KEY (response_id) REFERENCES model_responses (id)
+            )
+        ''')
+        
+        # Running per-question counts for each run, kept current by the triggers below so
+        # leaderboards (get_leaderboard) never rescan responses, even mid-run.
+        # trials/successes/errors count finished trials; first_trial_score (the score of the
+        # first finished trial, see FIRST_TRIAL_SCORE_SQL) feeds pass@1
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS aggregates (
+                run_id TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                trials INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                first_trial_score INTEGER,
+                PRIMARY KEY (run_id, model_name, mode, question_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        self._create_aggregate_triggers(cursor)
+        
+        # Columns added after the original schema; older databases get them here
+        self.ensure_column(cursor, 'model_responses', 'throttle_seconds', 'REAL')
+        # score/reasoning used to be added by hand with ALTER TABLE; databases created
+        # before that have no scores at all until this runs
+        self.ensure_column(cursor, 'model_responses', 'score', 'INTEGER')
+        self.ensure_column(cursor, 'model_responses', 'reasoning', 'TEXT')
+        self.ensure_column(cursor, 'model_responses', 'score_tier', 'TEXT')
+        self.ensure_column(cursor, 'model_responses', 'response_hash', 'TEXT')
+        self.ensure_column(cursor, 'model_responses', 'reasoning_hash', 'TEXT')
+        self.ensure_column(cursor, 'runs', 'kind', f"TEXT NOT NULL DEFAULT '{RUN_KIND_BENCHMARK}'")
+        
+        # The UNIQUE constraints above already index (run_id, mode, ...) and (cell_id, trial)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cells_model_mode ON cells (model_name, mode, question_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cells_question ON cells (question_id, mode)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cells_eval ON cells (eval_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trials_response ON trials (response_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_model_responses_eval ON model_responses (eval_id, model_name)')
+        # Blob reference checks when a superseded response is deleted
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_model_responses_response_hash ON model_responses (response_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_model_responses_reasoning_hash ON model_responses (reasoning_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_eval_name ON evaluations (eval_name)')
+        
+        # model_responses with the text decoded; rows from before the blob table
+        # (or written by older code) still have it inline. TEMP, because blob_text()
+        # only exists on this connection
+        cursor.execute('''
+            CREATE TEMP VIEW IF NOT EXISTS responses AS
+            SELECT r.id, r.eval_id, r.model_name,
+                   COALESCE(blob_text(rb.codec, rb.data), r.response) AS response,
+                   r.error, r.latency_seconds, r.throttle_seconds, r.score,
+                   COALESCE(blob_text(qb.codec, qb.data), r.reasoning) AS reasoning,
+                   r.score_tier
+            FROM model_responses r
+            LEFT JOIN blobs rb ON rb.hash = r.response_hash
+            LEFT JOIN blobs qb ON qb.hash = r.reasoning_hash
+        ''')
+        
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.migrate(cursor, version)
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        # Created after the migrations, so their bulk rewrites of model_responses don't fire the index triggers
+        self._create_search_index(cursor)
+        self._create_search_triggers(cursor)
+        
+        self.conn.commit()
         print(f"✓ Database initialized: {self.db_path}")
     
-    def log_evaluation(self, question, expected_answer, category="general", eval_name="manual_test"):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def migrate(self, cursor, version):
+        """One-shot upgrade of a database written at an older `version` of the schema"""
+        if version < 1:
+            self._migrate_run_tables(cursor)
+        if version < 2:
+            moved = self._move_text_to_blobs(cursor)
+            if moved:
+                print(f"✓ Moved {moved} responses into compressed blob storage")
+        if version < 3:
+            self._rebuild_aggregates(cursor)
+        if version < 5:
+            # pass@1 moved from the trial-1 score to the first finished trial's
+            cursor.execute('DROP TRIGGER IF EXISTS aggregates_trial_insert')
+            cursor.execute('DROP TRIGGER IF EXISTS aggregates_trial_update')
+            self._create_aggregate_triggers(cursor)
+            self._rebuild_aggregates(cursor)
+        if version < 6:
+            # Versions 4-5 indexed a persistent view that called blob_text(), so plain sqlite3
+            # connections could neither write model_responses nor read the index
+            for trigger in ('response_search_insert', 'response_search_delete', 'response_search_update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute('DROP TABLE IF EXISTS response_search')
+            cursor.execute('DROP VIEW IF EXISTS response_text')
+            self._create_search_index(cursor)
+            self._fill_search_index(cursor)
+        if version < 7:
+            cursor.execute('UPDATE runs SET kind = ? WHERE eval_name LIKE ?',
+                           (RUN_KIND_RERUN, RERUN_EVAL_NAME_PREFIX + '%'))
+        if version < 8:
+            # Superseded responses used to leave their blobs behind
+            pruned = self._prune_blobs(cursor)
+            if pruned:
+                print(f"✓ Removed {pruned} blobs no response uses any more")
+    
+    def _create_aggregate_triggers(self, cursor):
+        first_trial_score = FIRST_TRIAL_SCORE_SQL.format(cell_id='NEW.cell_id')
         
+        # A trial gaining (or swapping) its response moves the counts of its question.
+        # Superseded responses are deleted only after the trial update, so OLD's score is still readable
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS aggregates_trial_insert AFTER INSERT ON trials
+            WHEN NEW.response_id IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO aggregates (run_id, model_name, mode, question_id)
+                SELECT run_id, model_name, mode, question_id FROM cells WHERE id = NEW.cell_id;
+                UPDATE aggregates SET
+                    trials = trials + 1,
+                    successes = successes + COALESCE((SELECT COALESCE(score, 0) = 1 FROM model_responses WHERE id = NEW.response_id), 0),
+                    errors = errors + COALESCE((SELECT error IS NOT NULL FROM model_responses WHERE id = NEW.response_id), 0),
+                    first_trial_score = {first_trial_score}
+                WHERE (run_id, model_name, mode, question_id) =
+                      (SELECT run_id, model_name, mode, question_id FROM cells WHERE id = NEW.cell_id);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS aggregates_trial_update AFTER UPDATE OF response_id ON trials
+            WHEN NEW.response_id IS NOT OLD.response_id
+            BEGIN
+                INSERT OR IGNORE INTO aggregates (run_id, model_name, mode, question_id)
+                SELECT run_id, model_name, mode, question_id FROM cells WHERE id = NEW.cell_id;
+                UPDATE aggregates SET
+                    trials = trials + (NEW.response_id IS NOT NULL) - (OLD.response_id IS NOT NULL),
+                    successes = successes
+                        + COALESCE((SELECT COALESCE(score, 0) = 1 FROM model_responses WHERE id = NEW.response_id), 0)
+                        - COALESCE((SELECT COALESCE(score, 0) = 1 FROM model_responses WHERE id = OLD.response_id), 0),
+                    errors = errors
+                        + COALESCE((SELECT error IS NOT NULL FROM model_responses WHERE id = NEW.response_id), 0)
+                        - COALESCE((SELECT error IS NOT NULL FROM model_responses WHERE id = OLD.response_id), 0),
+                    first_trial_score = {first_trial_score}
+                WHERE (run_id, model_name, mode, question_id) =
+                      (SELECT run_id, model_name, mode, question_id FROM cells WHERE id = NEW.cell_id);
+            END
+        ''')
+    
+    def _create_search_index(self, cursor):
+        """Full-text index over response and judge reasoning text (searched with search.py)"""
+        # The index stores its own copy of the decoded text, so it can be read (snippets
+        # included) from any connection, not just ones with blob_text() registered
         cursor.execute('''
-            INSERT INTO evaluations (timestamp, question, expected_answer, category, eval_name)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.now().isoformat(), question, expected_answer, category, eval_name))
+            CREATE VIRTUAL TABLE IF NOT EXISTS response_search USING fts5(
+                response, reasoning,
+                tokenize='porter unicode61'
+            )
+        ''')
         
-        eval_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return eval_id
+        # Kept in sync with model_responses (rowid = response id). These triggers need no
+        # blob_text(), so they fire on any connection: deletes, and rows with inline text
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS response_search_delete AFTER DELETE ON model_responses
+            BEGIN
+                DELETE FROM response_search WHERE rowid = OLD.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS response_search_insert_inline AFTER INSERT ON model_responses
+            WHEN NEW.response_hash IS NULL AND NEW.reasoning_hash IS NULL
+            BEGIN
+                INSERT INTO response_search (rowid, response, reasoning) VALUES (NEW.id, NEW.response, NEW.reasoning);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS response_search_update_inline
+            AFTER UPDATE OF response, reasoning, response_hash, reasoning_hash ON model_responses
+            WHEN NEW.response_hash IS NULL AND NEW.reasoning_hash IS NULL
+            BEGIN
+                DELETE FROM response_search WHERE rowid = OLD.id;
+                INSERT INTO response_search (rowid, response, reasoning) VALUES (NEW.id, NEW.response, NEW.reasoning);
+            END
+        ''')
     
-    def log_model_response(self, eval_id, model_name, response, error=None, latency=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _create_search_triggers(self, cursor):
+        """Index rows whose text is in blobs; TEMP triggers, as only this connection can decode them.
         
+        Blob-backed rows written over a plain sqlite3 connection are indexed by rebuild_search_index().
+        """
+        new_text = '''
+                    COALESCE((SELECT blob_text(codec, data) FROM blobs WHERE hash = NEW.response_hash), NEW.response),
+                    COALESCE((SELECT blob_text(codec, data) FROM blobs WHERE hash = NEW.reasoning_hash), NEW.reasoning)'''
+        cursor.execute(f'''
+            CREATE TEMP TRIGGER IF NOT EXISTS response_search_insert_blob AFTER INSERT ON main.model_responses
+            WHEN NEW.response_hash IS NOT NULL OR NEW.reasoning_hash IS NOT NULL
+            BEGIN
+                INSERT INTO response_search (rowid, response, reasoning) VALUES (NEW.id, {new_text});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TEMP TRIGGER IF NOT EXISTS response_search_update_blob
+            AFTER UPDATE OF response, reasoning, response_hash, reasoning_hash ON main.model_responses
+            WHEN NEW.response_hash IS NOT NULL OR NEW.reasoning_hash IS NOT NULL
+            BEGIN
+                DELETE FROM response_search WHERE rowid = OLD.id;
+                INSERT INTO response_search (rowid, response, reasoning) VALUES (NEW.id, {new_text});
+            END
+        ''')
+    
+    def _fill_search_index(self, cursor):
+        cursor.execute('DELETE FROM response_search')
         cursor.execute('''
-            INSERT INTO model_responses 
-            (eval_id, model_name, response, error, latency_seconds)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (eval_id, model_name, response, error, latency))
+            INSERT INTO response_search (rowid, response, reasoning)
+            SELECT id, response, reasoning FROM responses
+        ''')
+    
+    def rebuild_search_index(self):
+        """Re-index every response, e.g. after rows were written without EvalLogger"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            self._fill_search_index(cursor)
+            self._wrote()
+    
+    def _migrate_run_tables(self, cursor):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'run_cells'")
+        if cursor.fetchone():
+            # The first manifest kept (question, model, trial) rows in a single table
+            cursor.execute('''
+                INSERT OR IGNORE INTO cells (run_id, mode, question_id, model_name, eval_id)
+                SELECT run_id, mode, question_id, model_name, MIN(eval_id)
+                FROM run_cells
+                GROUP BY run_id, mode, question_id, model_name
+            ''')
+            cursor.execute('''
+                INSERT OR IGNORE INTO trials (cell_id, trial, seq, status, response_id, updated_at)
+                SELECT c.id, rc.trial + 1, rc.seq, rc.status, rc.response_id, rc.updated_at
+                FROM run_cells rc
+                JOIN cells c ON c.run_id = rc.run_id AND c.mode = rc.mode
+                            AND c.question_id = rc.question_id AND c.model_name = rc.model_name
+            ''')
+            cursor.execute('DROP TABLE run_cells')
         
-        conn.commit()
-        conn.close()
+        imported = self._import_legacy_runs(cursor)
+        if imported:
+            print(f"✓ Migrated {imported} legacy responses into runs/cells/trials")
     
-    def get_stats(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _move_text_to_blobs(self, cursor, chunk=500):
+        """Replace inline response/reasoning text with blob hashes"""
+        moved = 0
+        while True:
+            cursor.execute('''
+                SELECT id, response, reasoning FROM model_responses
+                WHERE (response IS NOT NULL AND response_hash IS NULL)
+                   OR (reasoning IS NOT NULL AND reasoning_hash IS NULL)
+                LIMIT ?
+            ''', (chunk,))
+            rows = cursor.fetchall()
+            if not rows:
+                return moved
+            
+            updates = []
+            for row_id, response, reasoning in rows:
+                response_hash, reasoning_hash = self._store_blobs(cursor, [response, reasoning])
+                updates.append((response_hash, reasoning_hash, row_id))
+            cursor.executemany('''
+                UPDATE model_responses
+                SET response_hash = ?, reasoning_hash = ?, response = NULL, reasoning = NULL
+                WHERE id = ?
+            ''', updates)
+            moved += len(rows)
+    
+    def rebuild_aggregates(self, run_id=None):
+        """Recompute aggregates from trials (one run, or all); the triggers keep them current after that"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            self._rebuild_aggregates(cursor, run_id)
+            self._wrote()
+    
+    def _rebuild_aggregates(self, cursor, run_id=None):
+        where = 'WHERE c.run_id = ?' if run_id else ''
+        params = (run_id,) if run_id else ()
+        cursor.execute(f'DELETE FROM aggregates {"WHERE run_id = ?" if run_id else ""}', params)
+        cursor.execute(f'''
+            INSERT INTO aggregates (run_id, model_name, mode, question_id, trials, successes, errors, first_trial_score)
+            SELECT c.run_id, c.model_name, c.mode, c.question_id,
+                   COUNT(*),
+                   SUM(COALESCE(r.score, 0) = 1),
+                   SUM(r.error IS NOT NULL),
+                   {FIRST_TRIAL_SCORE_SQL.format(cell_id='c.id')}
+            FROM cells c
+            JOIN trials t ON t.cell_id = c.id
+            JOIN model_responses r ON r.id = t.response_id
+            {where}
+            GROUP BY c.id
+        ''', params)
+    
+    def get_leaderboard(self, run_id):
+        """Per (model, mode) pass@1, pass@k and accuracy for one run, read from aggregates.
         
-        cursor.execute('SELECT COUNT(*) FROM evaluations')
-        total_evals = cursor.fetchone()[0]
+        Counts finished trials only, so a run still in flight shows its numbers so far.
+        pass@1 uses each question's first finished trial, as stats.compute_stats does.
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute('''
+                SELECT model_name, mode,
+                       COUNT(*) AS questions,
+                       SUM(trials) AS trials,
+                       SUM(successes) AS successes,
+                       SUM(errors) AS errors,
+                       AVG(first_trial_score) * 100 AS pass_at_1,
+                       AVG(successes > 0) * 100 AS pass_at_k,
+                       SUM(successes) * 100.0 / SUM(trials) AS accuracy
+                FROM aggregates
+                WHERE run_id = ? AND trials > 0
+                GROUP BY model_name, mode
+            ''', (run_id,))
+            rows = [dict(row) for row in cursor.fetchall()]
+            
+            return rows
+    
+    def _store_blobs(self, cursor, texts):
+        """Store each text once (by content hash); returns the hashes, None for None"""
+        hashes = []
+        new_blobs = {}
+        for text in texts:
+            if text is None:
+                hashes.append(None)
+                continue
+            key, codec, data = encode_text(text)
+            hashes.append(key)
+            new_blobs[key] = (key, codec, len(data), data)
+        
+        cursor.executemany(
+            'INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)',
+            list(new_blobs.values())
+        )
+        return hashes
+    
+    def _delete_responses(self, cursor, response_ids):
+        """Delete superseded responses, and the blobs no other response still uses"""
+        hashes = set()
+        for response_id in response_ids:
+            cursor.execute('SELECT response_hash, reasoning_hash FROM model_responses WHERE id = ?', (response_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                hashes.update(key for key in row if key is not None)
+        cursor.executemany('DELETE FROM model_responses WHERE id = ?', [(response_id,) for response_id in response_ids])
+        cursor.executemany(f'DELETE FROM blobs WHERE hash = ? AND {BLOB_UNREFERENCED_SQL}', [(key,) for key in hashes])
+    
+    def _prune_blobs(self, cursor):
+        cursor.execute(f'DELETE FROM blobs WHERE {BLOB_UNREFERENCED_SQL}')
+        return cursor.rowcount
+    
+    def prune_blobs(self):
+        """Delete every blob no response references; returns how many went.
+        
+        Superseded responses clean up after themselves, so this only finds
+        blobs orphaned by hand-made deletes.
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            pruned = self._prune_blobs(cursor)
+            self._wrote()
+            return pruned
+    
+    def import_legacy_runs(self):
+        """Link responses logged under packed eval_names into runs/cells/trials.
         
+        Runs once automatically when an old database is opened; call it again to
+        pick up rows written since by scripts that only log eval_name. Responses
+        already linked to a trial are skipped, so re-running is safe.
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            imported = self._import_legacy_runs(cursor)
+            self._wrote(imported)
+            return imported
+    
+    def _import_legacy_runs(self, cursor):
         cursor.execute('''
-            SELECT model_name, 
-                   COUNT(*) as total_responses,
-                   AVG(latency_seconds) as avg_latency
-            FROM model_responses
-            GROUP BY model_name
+            SELECT e.id, e.timestamp, e.question, e.eval_name, r.id, r.model_name,
+                   COALESCE(r.response_hash, r.response), r.error
+            FROM model_responses r
+            JOIN evaluations e ON e.id = r.eval_id
+            WHERE NOT EXISTS (SELECT 1 FROM trials t WHERE t.response_id = r.id)
+            ORDER BY r.id
         ''')
+        rows = cursor.fetchall()
+        
+        question_ids = None
+        run_status = {}
+        imported = 0
+        
+        for eval_id, timestamp, question, eval_name, response_id, model_name, response, error in rows:
+            match = LEGACY_EVAL_NAME.match(eval_name or '')
+            if not match:
+                continue
+            run_id = match.group('run_id')
+            mode = 'WITH SEARCH' if 'WITH SEARCH' in match.group('mode') else 'NO SEARCH'
+            
+            if run_id not in run_status:
+                kind = RUN_KIND_RERUN if match.group('bench').startswith(RERUN_EVAL_NAME_PREFIX) else RUN_KIND_BENCHMARK
+                cursor.execute('''
+                    INSERT OR IGNORE INTO runs (run_id, eval_name, num_trials, models, modes, status, started_at, updated_at, kind)
+                    VALUES (?, ?, 0, '[]', '[]', 'legacy', ?, ?, ?)
+                ''', (run_id, match.group('bench'), timestamp, timestamp, kind))
+                cursor.execute('SELECT status FROM runs WHERE run_id = ?', (run_id,))
+                run_status[run_id] = cursor.fetchone()[0]
+            # A run with a manifest links its own responses; an unlinked one is mid-write or superseded
+            if run_status[run_id] != 'legacy':
+                continue
+            
+            if question_ids is None:
+                question_ids = legacy_question_ids()
+            question_id = question_ids.get(question.strip())
+            if question_id is None:
+                question_id = 'legacy_' + hashlib.sha256(question.strip().encode('utf-8')).hexdigest()[:12]
+            
+            cursor.execute('''
+                INSERT OR IGNORE INTO cells (run_id, mode, question_id, model_name, eval_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (run_id, mode, question_id, model_name, eval_id))
+            cursor.execute(
+                'SELECT id FROM cells WHERE run_id = ? AND mode = ? AND question_id = ? AND model_name = ?',
+                (run_id, mode, question_id, model_name)
+            )
+            cell_id = cursor.fetchone()[0]
+            
+            # Trials were never stored; insertion order within a cell is the trial order
+            cursor.execute('SELECT COALESCE(MAX(trial), 0) FROM trials WHERE cell_id = ?', (cell_id,))
+            trial = cursor.fetchone()[0] + 1
+            cursor.execute('''
+                INSERT INTO trials (cell_id, trial, seq, status, response_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (cell_id, trial, response_id, 'done' if response and not error else 'error', response_id, timestamp))
+            imported += 1
         
-        model_stats = cursor.fetchall()
-        conn.close()
+        for run_id, status in run_status.items():
+            if status != 'legacy':
+                continue
+            cursor.execute('''
+                SELECT c.model_name, c.mode, MAX(t.trial)
+                FROM cells c JOIN trials t ON t.cell_id = c.id
+                WHERE c.run_id = ?
+                GROUP BY c.model_name, c.mode
+                ORDER BY MIN(t.seq)
+            ''', (run_id,))
+            summary = cursor.fetchall()
+            models = list(dict.fromkeys(row[0] for row in summary))
+            modes = [mode for mode in ('NO SEARCH', 'WITH SEARCH') if mode in {row[1] for row in summary}]
+            cursor.execute('''
+                UPDATE runs SET num_trials = ?, models = ?, modes = ?, updated_at = ? WHERE run_id = ?
+            ''', (max((row[2] for row in summary), default=0), json.dumps(models), json.dumps(modes),
+                  datetime.now().isoformat(), run_id))
         
+        return imported
+    
+    def _wrote(self, rows=1):
+        """Count rows written in the open transaction; commits once FLUSH_ROWS is reached"""
+        self.pending_rows += rows
+        if self.pending_rows >= self.flush_rows:
+            self.conn.commit()
+            self.pending_rows = 0
+    
+    def _flush_loop(self):
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        with self.lock:
+            if self.pending_rows and self.conn is not None:
+                self.conn.commit()
+                self.pending_rows = 0
+    
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        with self.lock:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def ensure_column(self, cursor, table, column, column_type):
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+    
+    def log_evaluation(self, question, expected_answer, category="general", eval_name="manual_test"):
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO evaluations (timestamp, question, expected_answer, category, eval_name)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (datetime.now().isoformat(), question, expected_answer, category, eval_name))
+            
+            eval_id = cursor.lastrowid
+            self._wrote()
+            return eval_id
+    
+    def log_model_response(self, eval_id, model_name, response, error=None, latency=None, throttle=None,
+                           tier=None, score=None, reasoning=None):
+        """Insert one response with its verdict; returns the new row id"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            response_hash, reasoning_hash = self._store_blobs(cursor, [response, reasoning])
+            cursor.execute('''
+                INSERT INTO model_responses 
+                (eval_id, model_name, response_hash, error, latency_seconds, throttle_seconds, score_tier, score, reasoning_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (eval_id, model_name, response_hash, error, latency, throttle, tier, score, reasoning_hash))
+            
+            response_id = cursor.lastrowid
+            self._wrote()
+            return response_id
+    
+    def create_run(self, run_id, eval_name, eval_file, num_trials, models, modes, kind=RUN_KIND_BENCHMARK):
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            now = datetime.now().isoformat()
+            cursor.execute('''
+                INSERT OR IGNORE INTO runs
+                (run_id, eval_name, eval_file, num_trials, models, modes, status, started_at, updated_at, kind)
+                VALUES (?, ?, ?, ?, ?, ?, 'running', ?, ?, ?)
+            ''', (run_id, eval_name, eval_file, num_trials, json.dumps(models), json.dumps(modes), now, now, kind))
+            
+            self._wrote()
+    
+    def get_run(self, run_id):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute('SELECT * FROM runs WHERE run_id = ?', (run_id,))
+            row = cursor.fetchone()
+            
+            if row is None:
+                return None
+            run = dict(row)
+            run['models'] = json.loads(run['models'])
+            run['modes'] = json.loads(run['modes'])
+            return run
+    
+    def set_run_status(self, run_id, status):
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute(
+                'UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?',
+                (status, datetime.now().isoformat(), run_id)
+            )
+            
+            self._wrote()
+    
+    def plan_trials(self, run_id, mode, trials):
+        """Record the planned trials of one mode: [(question_id, model_name, trial, eval_id), ...] in run order"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.executemany('''
+                INSERT OR IGNORE INTO cells (run_id, mode, question_id, model_name, eval_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (run_id, mode, question_id, model_name, eval_id)
+                for question_id, model_name, trial, eval_id in trials
+            ])
+            cursor.executemany('''
+                INSERT OR IGNORE INTO trials (cell_id, trial, seq)
+                SELECT id, ?, ? FROM cells
+                WHERE run_id = ? AND mode = ? AND question_id = ? AND model_name = ?
+            ''', [
+                (trial, seq, run_id, mode, question_id, model_name)
+                for seq, (question_id, model_name, trial, eval_id) in enumerate(trials)
+            ])
+            
+            self._wrote(len(trials))
+    
+    def get_run_trials(self, run_id, mode):
+        """Planned trials of one mode in run order, joined with their question and latest response"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute('''
+                SELECT c.question_id, c.model_name, t.trial, c.eval_id, t.status, t.response_id,
+                       e.question, e.expected_answer, e.category,
+                       r.response, r.error, r.score, r.reasoning, r.latency_seconds, r.score_tier
+                FROM cells c
+                JOIN trials t ON t.cell_id = c.id
+                JOIN evaluations e ON e.id = c.eval_id
+                LEFT JOIN responses r ON r.id = t.response_id
+                WHERE c.run_id = ? AND c.mode = ?
+                ORDER BY t.seq
+            ''', (run_id, mode))
+            rows = [dict(row) for row in cursor.fetchall()]
+            
+            return rows
+    
+    def get_eval_id(self, run_id, mode, question_id):
+        """The evaluation row a run logged for one question, or None"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute(
+                'SELECT eval_id FROM cells WHERE run_id = ? AND mode = ? AND question_id = ? LIMIT 1',
+                (run_id, mode, question_id)
+            )
+            row = cursor.fetchone()
+            
+            return row[0] if row else None
+    
+    def get_trial_status(self, run_id, mode, question_id, model_name, trial):
+        """Returns (status, response_id) of a planned trial, or (None, None)"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                SELECT t.status, t.response_id FROM cells c JOIN trials t ON t.cell_id = c.id
+                WHERE c.run_id = ? AND c.mode = ? AND c.question_id = ? AND c.model_name = ? AND t.trial = ?
+            ''', (run_id, mode, question_id, model_name, trial))
+            row = cursor.fetchone()
+            
+            return row if row else (None, None)
+    
+    def count_unfinished_trials(self, run_id):
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                SELECT COUNT(*) FROM cells c JOIN trials t ON t.cell_id = c.id
+                WHERE c.run_id = ? AND t.status != 'done'
+            ''', (run_id,))
+            count = cursor.fetchone()[0]
+            
+            return count
+    
+    def complete_trial(self, run_id, mode, question_id, model_name, trial, response_id, status):
+        """Point a trial at its response; a response from an earlier (failed) attempt is replaced"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                SELECT t.id, t.response_id FROM cells c JOIN trials t ON t.cell_id = c.id
+                WHERE c.run_id = ? AND c.mode = ? AND c.question_id = ? AND c.model_name = ? AND t.trial = ?
+            ''', (run_id, mode, question_id, model_name, trial))
+            row = cursor.fetchone()
+            if row is None:
+                return
+            trial_id, old_response_id = row
+            
+            cursor.execute(
+                'UPDATE trials SET status = ?, response_id = ?, updated_at = ? WHERE id = ?',
+                (status, response_id, datetime.now().isoformat(), trial_id)
+            )
+            # Deleted only after the update, so the aggregates trigger can still read the old score
+            if old_response_id is not None and old_response_id != response_id:
+                self._delete_responses(cursor, [old_response_id])
+            
+            self._wrote()
+    
+    def write_responses(self, batch):
+        """Insert [(response, trial), ...] in one transaction and point each trial at its row.
+        
+        response holds log_model_response's keyword arguments; trial is
+        (run_id, mode, question_id, model_name, trial, status) or None.
+        Row ids are reserved up front under BEGIN IMMEDIATE so the inserts
+        can go through executemany and still be linked to their trials.
+        """
+        with self.lock:
+            self.conn.commit()
+            self.pending_rows = 0
+            cursor = self.conn.cursor()
+            
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                # AUTOINCREMENT never hands out a deleted id again; neither should we
+                cursor.execute('''
+                    SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'model_responses'), 0),
+                               COALESCE((SELECT MAX(id) FROM model_responses), 0))
+                ''')
+                first_id = cursor.fetchone()[0] + 1
+                
+                texts = []
+                for response, _ in batch:
+                    texts += [response['response'], response.get('reasoning')]
+                hashes = self._store_blobs(cursor, texts)
+                
+                response_rows = []
+                trial_rows = []
+                now = datetime.now().isoformat()
+                for index, (response, trial) in enumerate(batch):
+                    response_id = first_id + index
+                    response_rows.append((
+                        response_id, response['eval_id'], response['model_name'], hashes[2 * index],
+                        response.get('error'), response.get('latency'), response.get('throttle'),
+                        response.get('tier'), response.get('score'), hashes[2 * index + 1]
+                    ))
+                    if trial is not None:
+                        run_id, mode, question_id, model_name, trial_number, status = trial
+                        trial_rows.append((status, response_id, now, run_id, mode, question_id, model_name, trial_number))
+                
+                cursor.executemany('''
+                    INSERT INTO model_responses 
+                    (id, eval_id, model_name, response_hash, error, latency_seconds, throttle_seconds, score_tier, score, reasoning_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', response_rows)
+                
+                # A response from an earlier (failed) attempt at the same trial is replaced
+                superseded = []
+                for row in trial_rows:
+                    cursor.execute('''
+                        SELECT t.response_id FROM cells c JOIN trials t ON t.cell_id = c.id
+                        WHERE c.run_id = ? AND c.mode = ? AND c.question_id = ? AND c.model_name = ? AND t.trial = ?
+                    ''', row[3:])
+                    found = cursor.fetchone()
+                    if found and found[0] is not None and found[0] != row[1]:
+                        superseded.append(found[0])
+                cursor.executemany('''
+                    UPDATE trials SET status = ?, response_id = ?, updated_at = ?
+                    WHERE trial = ? AND cell_id = (
+                        SELECT id FROM cells WHERE run_id = ? AND mode = ? AND question_id = ? AND model_name = ?
+                    )
+                ''', [row[:3] + (row[7],) + row[3:7] for row in trial_rows])
+                # After the update, so the aggregates trigger can still read the old score
+                self._delete_responses(cursor, superseded)
+                
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+    
+    def get_stats(self):
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM evaluations')
+            total_evals = cursor.fetchone()[0]
+            
+            cursor.execute('''
+                SELECT model_name, 
+                       COUNT(*) as total_responses,
+                       AVG(latency_seconds) as avg_latency
+                FROM model_responses
+                GROUP BY model_name
+            ''')
+            
+            model_stats = cursor.fetchall()
+            
+            return {
+                'total_evaluations': total_evals,
+                'model_stats': model_stats
+            }
+
+# Tells the writer thread to exit once everything queued before it is written
+_STOP = object()
+
+class ResultWriter:
+    """Write-behind sink that takes response inserts off the caller's path.
+    
+    submit() only queues; one writer thread drains the queue and hands up to
+    WRITER_BATCH_ROWS responses at a time to EvalLogger.write_responses. With
+    an event_log set, each batch's events are appended (and fsynced) there
+    first, so the JSONL log is never behind the database. When
+    WRITER_QUEUE_SIZE responses are waiting, submit() blocks until the writer
+    catches up. flush() waits until everything queued so far is committed;
+    close() does the same and stops the thread (also at interpreter exit, so
+    a Ctrl-C still writes what was queued).
+    """
+    def __init__(self, logger, max_queue=WRITER_QUEUE_SIZE, batch_rows=WRITER_BATCH_ROWS, event_log=None):
+        self.logger = logger
+        self.event_log = event_log
+        self.batch_rows = batch_rows
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_depth = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.failed_rows = 0
+        self.closed = False
+        
+        self.thread = threading.Thread(target=self._write_loop, name="eval-result-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def submit(self, response, trial=None, event=None, block=True):
+        """Queue one response (log_model_response kwargs), the trial it completes and its log event.
+        
+        With block=False a full queue returns False instead of waiting.
+        """
+        try:
+            self.queue.put((response, trial, event), block=block)
+        except queue.Full:
+            return False
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+    
+    def depth(self):
+        return self.queue.qsize()
+    
+    def stats(self):
         return {
-            'total_evaluations': total_evals,
-            'model_stats': model_stats
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'queue_size': self.queue.maxsize,
+            'rows_written': self.rows_written,
+            'batches': self.batches,
+            'failed_rows': self.failed_rows,
         }
+    
+    def _write_loop(self):
+        while True:
+            item = self.queue.get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_rows:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if batch:
+                try:
+                    events = [event for _, _, event in batch if event is not None]
+                    if self.event_log is not None and events:
+                        self.event_log.append_many(events)
+                    self.logger.write_responses([(response, trial) for response, trial, _ in batch])
+                    self.rows_written += len(batch)
+                    self.batches += 1
+                except Exception as e:
+                    # The trials stay unfinished in the manifest, so --resume redoes them
+                    self.failed_rows += len(batch)
+                    print(f"❌ Result writer failed to save {len(batch)} responses: {e}")
+                for _ in batch:
+                    self.queue.task_done()
+            
+            if item is _STOP:
+                self.queue.task_done()
+                return
+    
+    def flush(self):
+        self.queue.join()
+    
+    def set_event_log(self, event_log):
+        """Switch logs between runs; everything queued so far goes to the old one"""
+        self.flush()
+        self.event_log = event_log
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join()
 
 if __name__ == "__main__":
-    logger = EvalLogger()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Create or upgrade the eval history database")
+    parser.add_argument('--db', default="eval_history.db")
+    parser.add_argument('--import-legacy', action='store_true',
+                        help="Link responses logged only under a packed eval_name into runs/cells/trials")
+    args = parser.parse_args()
+    
+    logger = EvalLogger(args.db)
+    if args.import_legacy:
+        print(f"✓ Linked {logger.import_legacy_runs()} legacy responses")
+    logger.close()
     print("✓ Eval logger ready!")
@@ -7,7 +7,7 @@ from datetime import datetime
 import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
-import time
+from rate_limiter import AdaptiveRateLimiter
 
 # Load environment variables
 load_dotenv()
@@ -34,40 +34,51 @@ class LLMEvaluator:
         genai.configure(api_key=google_key)
         self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
         
+        self.rate_limiter = AdaptiveRateLimiter()
+        
         print("✓ All API clients initialized successfully!")
         
     def call_claude(self, prompt, model="claude-sonnet-4-20250514"):
         """Call Claude API"""
         try:
+            self.rate_limiter.acquire('anthropic')
             response = self.anthropic_client.messages.create(
                 model=model,
                 max_tokens=1000,
                 messages=[{"role": "user", "content": prompt}]
             )
+            self.rate_limiter.record_success('anthropic')
             return response.content[0].text
         except Exception as e:
+            self.rate_limiter.record_error('anthropic', e)
             print(f"Error calling Claude: {e}")
             return f"ERROR: {str(e)}"
     
     def call_chatgpt(self, prompt, model="gpt-4o-mini"):
         """Call ChatGPT API"""
         try:
+            self.rate_limiter.acquire('openai')
             response = self.openai_client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1000
             )
+            self.rate_limiter.record_success('openai')
             return response.choices[0].message.content
         except Exception as e:
+            self.rate_limiter.record_error('openai', e)
             print(f"Error calling ChatGPT: {e}")
             return f"ERROR: {str(e)}"
     
     def call_gemini(self, prompt):
         """Call Gemini API"""
         try:
+            self.rate_limiter.acquire('google')
             response = self.gemini_model.generate_content(prompt)
+            self.rate_limiter.record_success('google')
             return response.text
         except Exception as e:
+            self.rate_limiter.record_error('google', e)
             print(f"Error calling Gemini: {e}")
             return f"ERROR: {str(e)}"
     
@@ -185,17 +196,14 @@ or
             if 'claude' in models_to_test:
                 print(f"\n  Testing Claude on {test_id}...")
                 responses['claude'] = self.call_claude(prompt)
-                time.sleep(0.5)  # Rate limiting
             
             if 'chatgpt' in models_to_test:
                 print(f"  Testing ChatGPT on {test_id}...")
                 responses['chatgpt'] = self.call_chatgpt(prompt)
-                time.sleep(0.5)
             
             if 'gemini' in models_to_test:
                 print(f"  Testing Gemini on {test_id}...")
                 responses['gemini'] = self.call_gemini(prompt)
-                time.sleep(0.5)
             
             # Evaluate each response
             for model_name, response in responses.items():
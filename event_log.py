@@ -0,0 +1,223 @@
+"""
+Append-only JSONL event log: the crash-safe record of a benchmark run.
+
+Every finished trial is appended to run_logs/<run_id>.jsonl and fsynced
+before its row goes to SQLite, so a crash or hang loses nothing that was
+scored. One JSON object per line:
+
+    {"event": "run_started", "run_id": ..., "eval_name": ..., "models": [...], ...}
+    {"event": "trial", "run_id": ..., "mode": ..., "question_id": ..., "model": ..., "trial": 1, ...}
+    {"event": "run_finished", "run_id": ..., "status": "complete", ...}
+
+(run_resumed takes the place of run_started when a run is resumed.)
+
+Replaying a log rebuilds what the crash lost, into the database or a CSV:
+
+    python event_log.py run_logs/20260104_130836.jsonl
+    python event_log.py run_logs/*.jsonl --csv recovered.csv
+
+Replays are idempotent. A trial that is already done in the database is
+skipped, and so is an errored one whose log entry is an error too.
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+from datetime import datetime
+
+EVENT_LOG_DIR = "run_logs"
+
+DETAILED_CSV_HEADER = [
+    'Question ID', 'Question', 'Expected Answer', 'Category', 'Model', 'Mode', 'Trial',
+    'Model Response', 'Score (0/1)', 'Pass/Fail', 'Judge Reasoning', 'Latency (s)', 'Scored By'
+]
+
+
+class EventLog:
+    """One run's log file, opened for appending; every append is fsynced"""
+
+    def __init__(self, run_id, log_dir=EVENT_LOG_DIR):
+        os.makedirs(log_dir, exist_ok=True)
+        self.run_id = run_id
+        self.path = os.path.join(log_dir, f"{run_id}.jsonl")
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+        # A crash mid-append can leave a torn last line; start the next event on a fresh one
+        if self.file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self.file.write('\n')
+
+    def append(self, event):
+        self.append_many([event])
+
+    def append_many(self, events):
+        """Write events as one sequential append and fsync once"""
+        lines = ''.join(
+            json.dumps(dict(event, run_id=self.run_id, logged_at=datetime.now().isoformat())) + '\n'
+            for event in events
+        )
+        with self.lock:
+            self.file.write(lines)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def read_events(path):
+    """Events in file order; a torn last line (crash mid-write) is skipped"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                print(f"⚠️  {path}:{line_number}: skipping unreadable line")
+    return events
+
+
+def trial_key(event):
+    return (event['run_id'], event['mode'], event['question_id'], event['model'], event['trial'])
+
+
+def best_trials(events):
+    """The event that should stand for each trial: the last success, else the last error"""
+    best = {}
+    for event in events:
+        if event.get('event') != 'trial':
+            continue
+        key = trial_key(event)
+        if event.get('response') or key not in best or not best[key].get('response'):
+            best[key] = event
+    return best
+
+
+def ingest_into_db(paths, logger):
+    """Replay event logs into the database; returns (trials written, trials already there)"""
+    events = [event for path in paths for event in read_events(path)]
+    trials = best_trials(events)
+
+    headers = {}
+    finished = {}
+    for event in events:
+        if event.get('event') in ('run_started', 'run_resumed'):
+            headers.setdefault(event['run_id'], event)
+        elif event.get('event') == 'run_finished':
+            finished[event['run_id']] = event['status']
+
+    written = skipped = 0
+    for run_id in dict.fromkeys(key[0] for key in trials):
+        run_trials = [(key, event) for key, event in trials.items() if key[0] == run_id]
+        header = headers.get(run_id, {})
+        eval_name = header.get('eval_name') or 'benchmark'
+
+        created = logger.get_run(run_id) is None
+        if created:
+            logger.create_run(
+                run_id, eval_name, header.get('eval_file'),
+                header.get('num_trials') or max(key[4] for key, _ in run_trials),
+                header.get('models') or list(dict.fromkeys(event['model'] for _, event in run_trials)),
+                header.get('modes') or list(dict.fromkeys(event['mode'] for _, event in run_trials))
+            )
+
+        # Plan any trial the database has never heard of, under the runner's eval_name scheme
+        eval_ids = {}
+        for mode in dict.fromkeys(key[1] for key, _ in run_trials):
+            planned = []
+            for (_, trial_mode, question_id, model_name, trial), event in run_trials:
+                if trial_mode != mode:
+                    continue
+                if (mode, question_id) not in eval_ids:
+                    eval_ids[mode, question_id] = logger.get_eval_id(run_id, mode, question_id) or logger.log_evaluation(
+                        question=event['question'],
+                        expected_answer=event['expected_answer'],
+                        category=event.get('category', 'general'),
+                        eval_name=f"{eval_name} ({mode}) - RUN_{run_id}"
+                    )
+                planned.append((question_id, model_name, trial, eval_ids[mode, question_id]))
+            logger.plan_trials(run_id, mode, planned)
+
+        batch = []
+        for key, event in run_trials:
+            status, response_id = logger.get_trial_status(*key)
+            if status == 'done' or (response_id is not None and not event.get('response')):
+                skipped += 1
+                continue
+            batch.append(({
+                'eval_id': eval_ids[key[1], key[2]],
+                'model_name': event['model'],
+                'response': event.get('response'),
+                'error': event.get('error'),
+                'latency': event.get('latency'),
+                'throttle': event.get('throttle'),
+                'tier': event.get('tier'),
+                'score': event.get('score'),
+                'reasoning': event.get('reasoning')
+            }, key + ('done' if event.get('response') else 'error',)))
+        if batch:
+            logger.write_responses(batch)
+            written += len(batch)
+
+        status = finished.get(run_id, 'incomplete' if created else None)
+        if status and logger.count_unfinished_trials(run_id):
+            status = 'incomplete'
+        if status:
+            logger.set_run_status(run_id, status)
+
+    logger.flush()
+    return written, skipped
+
+
+def export_csv(paths, filename):
+    """Write the logged trials in the runner's detailed CSV format; returns the row count"""
+    trials = best_trials(event for path in paths for event in read_events(path))
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(DETAILED_CSV_HEADER)
+        for event in trials.values():
+            response = event.get('response') or f"ERROR: {event.get('error') or 'Unknown error'}"
+            writer.writerow([
+                event['question_id'],
+                event['question'],
+                event['expected_answer'],
+                event.get('category', 'general'),
+                event['model'],
+                event['mode'],
+                event['trial'],
+                response,
+                event.get('score'),
+                'PASS' if event.get('score') == 1 else 'FAIL',
+                event.get('reasoning'),
+                f"{event.get('latency') or 0.0:.2f}",
+                event.get('tier')
+            ])
+
+    return len(trials)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay run event logs into SQLite or a CSV")
+    parser.add_argument('logs', nargs='+', help="run_logs/<run_id>.jsonl files")
+    parser.add_argument('--db', default="eval_history.db")
+    parser.add_argument('--csv', metavar='FILE', help="Write a detailed CSV instead of ingesting into the database")
+    args = parser.parse_args()
+
+    if args.csv:
+        rows = export_csv(args.logs, args.csv)
+        print(f"📋 Exported {rows} trials to {args.csv}")
+    else:
+        from eval_logger import EvalLogger
+
+        with EvalLogger(args.db) as logger:
+            written, skipped = ingest_into_db(args.logs, logger)
+        print(f"✓ Ingested {written} trials ({skipped} already in {args.db})")
@@ -1,58 +1,27 @@
-import sqlite3
 import csv
 from datetime import datetime
+from results_store import ResultsStore, MODE_LABELS
 
 def export_latest_eval():
-    conn = sqlite3.connect('eval_history.db')
-    cursor = conn.cursor()
+    store = ResultsStore()
     
-    # Get the most recent evaluation run
-    cursor.execute('''
-        SELECT DISTINCT eval_name, timestamp
-        FROM evaluations
-        ORDER BY timestamp DESC
-        LIMIT 1
-    ''')
-    
-    latest = cursor.fetchone()
-    if not latest:
+    # The most recent run; its last mode is the eval it finished with
+    run = store.latest_run()
+    if not run:
         print("No evaluations found in database")
+        store.close()
         return
     
-    eval_name, timestamp = latest
+    mode = run['modes'][-1] if run['modes'] else None
     print(f"\n📊 Exporting latest evaluation:")
-    print(f"   Name: {eval_name}")
-    print(f"   Date: {timestamp}")
+    print(f"   Run: {run['run_id']} ({MODE_LABELS.get(mode, mode)})")
+    print(f"   Date: {run['started_at']}")
     print("-" * 70)
     
-    # Get all responses from the latest eval
-    cursor.execute('''
-        SELECT 
-            e.id,
-            e.question,
-            e.expected_answer,
-            e.category,
-            mr.model_name,
-            mr.response,
-            mr.score,
-            mr.reasoning,
-            mr.error,
-            mr.latency_seconds
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE e.eval_name = ?
-        ORDER BY e.id, mr.model_name, mr.id
-    ''', (eval_name,))
-    
-    responses = cursor.fetchall()
-    
-    if not responses:
-        print("No responses found for this evaluation")
-        return
-    
-    # Export to CSV
+    # Export to CSV, streaming rows straight from the database
     export_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"exported_eval_results_{export_timestamp}.csv"
+    exported = 0
     
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -70,55 +39,41 @@ def export_latest_eval():
             'Latency (s)'
         ])
         
-        for row in responses:
-            eval_id, question, expected, category, model, response, score, reasoning, error, latency = row
-            
+        for trial in store.iter_trials(run_ids=[run['run_id']], modes=[mode]):
+            score = trial.score
             pass_fail = "PASS" if score == 1 else "FAIL" if score == 0 else "N/A"
-            response_text = response if response else f"ERROR: {error}"
-            latency_str = f"{latency:.2f}" if latency else "N/A"
+            response_text = trial.response if trial.response else f"ERROR: {trial.error}"
+            latency_str = f"{trial.latency_seconds:.2f}" if trial.latency_seconds else "N/A"
             
             writer.writerow([
-                eval_id,
-                question,
-                expected,
-                category,
-                model,
+                trial.eval_id,
+                trial.question,
+                trial.expected_answer,
+                trial.category,
+                trial.model_name,
                 response_text,
                 score if score is not None else "N/A",
                 pass_fail,
-                reasoning if reasoning else "",
-                error if error else "",
+                trial.reasoning if trial.reasoning else "",
+                trial.error if trial.error else "",
                 latency_str
             ])
+            exported += 1
     
-    conn.close()
+    if not exported:
+        print("No responses found for this evaluation")
+        store.close()
+        return
     
-    print(f"\n✅ Exported {len(responses)} responses to: {filename}")
+    print(f"\n✅ Exported {exported} responses to: {filename}")
     
     # Show summary
     print("\n📈 SUMMARY:")
     
-    conn = sqlite3.connect('eval_history.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT 
-            mr.model_name,
-            COUNT(*) as total,
-            SUM(CASE WHEN mr.score = 1 THEN 1 ELSE 0 END) as passed,
-            AVG(mr.score) * 100 as avg_score
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE e.eval_name = ? AND mr.score IS NOT NULL
-        GROUP BY mr.model_name
-    ''', (eval_name,))
-    
-    stats = cursor.fetchall()
-    
-    for model, total, passed, avg_score in stats:
-        print(f"   {model:25s}: {passed}/{total} passed ({avg_score:.1f}%)")
+    for row in store.stats(run_ids=[run['run_id']], modes=[mode]):
+        print(f"   {row['model_name']:25s}: {row['successes']}/{row['trials']} passed ({row['accuracy']:.1f}%)")
     
-    conn.close()
+    store.close()
     print("-" * 70)
 
 if __name__ == "__main__":
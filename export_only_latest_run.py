@@ -1,52 +1,25 @@
-import sqlite3
 import csv
 from datetime import datetime
+from results_store import ResultsStore, MODE_LABELS
 
 def export_latest_run():
-    conn = sqlite3.connect('eval_history.db')
-    cursor = conn.cursor()
+    store = ResultsStore()
     
-    # Get the most recent timestamp
-    cursor.execute('''
-        SELECT MAX(timestamp) 
-        FROM evaluations
-        WHERE eval_name LIKE '%NO SEARCH%' OR eval_name LIKE '%WITH SEARCH%'
-    ''')
-    
-    latest_timestamp = cursor.fetchone()[0]
+    # Get the most recent run
+    run = store.latest_run()
+    if not run:
+        print("No responses found")
+        store.close()
+        return
     
     print(f"\n📊 Exporting ONLY the latest benchmark run:")
-    print(f"   Timestamp: {latest_timestamp}")
+    print(f"   Run: {run['run_id']} (started {run['started_at']})")
     print("-" * 70)
     
-    # Get all responses from ONLY this timestamp
-    cursor.execute('''
-        SELECT 
-            e.question,
-            e.expected_answer,
-            e.category,
-            e.eval_name,
-            mr.model_name,
-            mr.response,
-            mr.score,
-            mr.reasoning,
-            mr.error,
-            mr.latency_seconds
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE e.timestamp = ?
-        ORDER BY e.eval_name, e.id, mr.model_name, mr.id
-    ''', (latest_timestamp,))
-    
-    responses = cursor.fetchall()
-    
-    if not responses:
-        print("No responses found")
-        return
-    
-    # Export to CSV
+    # Export to CSV, streaming rows straight from the database
     export_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"latest_run_only_{export_timestamp}.csv"
+    exported = 0
     
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -64,76 +37,53 @@ def export_latest_run():
             'Latency (s)'
         ])
         
-        for row in responses:
-            question, expected, category, eval_name, model, response, score, reasoning, error, latency = row
-            
-            if "NO SEARCH" in eval_name:
-                mode = "No Search"
-            elif "WITH SEARCH" in eval_name:
-                mode = "With Search"
-            else:
-                mode = "Unknown"
-            
+        for trial in store.iter_trials(run_ids=[run['run_id']], order='run'):
+            score = trial.score
             pass_fail = "PASS" if score == 1 else "FAIL" if score == 0 else "N/A"
-            response_text = response if response else f"ERROR: {error}" if error else "No response"
-            latency_str = f"{latency:.2f}" if latency else "N/A"
+            response_text = trial.response if trial.response else f"ERROR: {trial.error}" if trial.error else "No response"
+            latency_str = f"{trial.latency_seconds:.2f}" if trial.latency_seconds else "N/A"
             
             writer.writerow([
-                question,
-                expected,
-                category,
-                model,
-                mode,
+                trial.question,
+                trial.expected_answer,
+                trial.category,
+                trial.model_name,
+                MODE_LABELS.get(trial.mode, "Unknown"),
                 response_text,
                 score if score is not None else "N/A",
                 pass_fail,
-                reasoning if reasoning else "",
-                error if error else "",
+                trial.reasoning if trial.reasoning else "",
+                trial.error if trial.error else "",
                 latency_str
             ])
+            exported += 1
     
-    conn.close()
+    if not exported:
+        print("No responses found")
+        store.close()
+        return
     
-    print(f"\n✅ Exported {len(responses)} responses from latest run to: {filename}")
+    print(f"\n✅ Exported {exported} responses from latest run to: {filename}")
     
     # Detailed summary
     print("\n📈 DETAILED SUMMARY:")
     
-    conn = sqlite3.connect('eval_history.db')
-    cursor = conn.cursor()
-    
     # Count by mode and model
-    cursor.execute('''
-        SELECT 
-            e.eval_name,
-            mr.model_name,
-            COUNT(*) as total,
-            SUM(CASE WHEN mr.score = 1 THEN 1 ELSE 0 END) as passed,
-            SUM(CASE WHEN mr.score = 0 THEN 1 ELSE 0 END) as failed,
-            SUM(CASE WHEN mr.error IS NOT NULL THEN 1 ELSE 0 END) as errors,
-            AVG(CASE WHEN mr.score IS NOT NULL THEN mr.score END) * 100 as avg_score
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE e.timestamp = ?
-        GROUP BY e.eval_name, mr.model_name
-        ORDER BY e.eval_name, mr.model_name
-    ''', (latest_timestamp,))
-    
-    stats = cursor.fetchall()
+    stats = sorted(store.stats(run_ids=[run['run_id']]), key=lambda row: (row['mode'], row['model_name']))
     
     current_mode = None
-    for eval_name, model, total, passed, failed, errors, avg_score in stats:
-        mode = "No Search" if "NO SEARCH" in eval_name else "With Search"
+    for row in stats:
+        mode = MODE_LABELS.get(row['mode'], row['mode'])
         
         if mode != current_mode:
             print(f"\n  {mode}:")
             print("  " + "-" * 68)
             current_mode = mode
         
-        avg_display = f"{avg_score:.1f}%" if avg_score is not None else "N/A"
-        print(f"     {model:25s}: {passed} pass, {failed} fail, {errors} errors ({avg_display})")
+        failed = row['trials'] - row['successes'] - row['errors']
+        print(f"     {row['model_name']:25s}: {row['successes']} pass, {failed} fail, {row['errors']} errors ({row['accuracy']:.1f}%)")
     
-    conn.close()
+    store.close()
     print("\n" + "=" * 70)
 
 if __name__ == "__main__":
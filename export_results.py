@@ -0,0 +1,189 @@
+"""
+Export any run, or several runs spliced by a run spec, to detailed and summary files.
+
+    python export_results.py                                  # the latest run
+    python export_results.py --run 20260104_130836 --run 20260104_192334
+    python export_results.py --spec twinpeaks_v1.json --format csv --format json
+    python export_results.py --format parquet
+
+With several --run options, later runs win cells they share with earlier
+ones (--prefer complete picks the run that finished more of the cell's
+trials instead). See results_store for the spec format. Detailed rows are
+streamed from the database cursor to the file, so exports of any size run
+in constant memory. With pyarrow installed, a detailed Parquet file (see
+columnar) is written next to the CSVs by default.
+"""
+import argparse
+import csv
+import json
+import os
+
+from columnar import available as parquet_available, write_parquet
+from results_store import ResultsStore, PRECEDENCE, load_spec, spec_cells, spec_entries
+
+DEFAULT_FORMATS = ('csv', 'parquet') if parquet_available() else ('csv',)
+
+DETAILED_FIELDS = [
+    'question_id', 'question', 'expected_answer', 'category',
+    'model', 'mode', 'trial', 'response', 'score', 'reasoning', 'latency'
+]
+
+
+def detailed_row(trial):
+    return {
+        'question_id': trial.question_id,
+        'question': trial.question,
+        'expected_answer': trial.expected_answer,
+        'category': trial.category,
+        'model': trial.model_name,
+        'mode': trial.mode,
+        'trial': trial.trial,
+        'response': trial.response,
+        'score': trial.score if trial.score is not None else 0,
+        'reasoning': trial.reasoning,
+        'latency': trial.latency_seconds
+    }
+
+
+def summary_rows(stats, k):
+    return [{
+        'model': row['model_name'],
+        'mode': row['mode'],
+        'pass@1': round(row['pass_at_1'], 2),
+        f'pass@{k}': round(row['pass_at_k'], 2),
+        'accuracy': round(row['accuracy'], 2)
+    } for row in stats]
+
+
+def write_detailed_csv(rows, filename):
+    """Write detailed rows one at a time; returns the row count"""
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=DETAILED_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_detailed_json(rows, filename):
+    """Write a JSON array one element at a time; returns the row count"""
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for row in rows:
+            f.write((',\n' if count else '\n') + json.dumps(row, ensure_ascii=False))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def write_summary_csv(rows, filename, k):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['model', 'mode', 'pass@1', f'pass@{k}', 'accuracy'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_summary_json(rows, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+        f.write('\n')
+
+
+def export_spec(store, spec, prefix, formats=None, detailed_file=None, summary_file=None):
+    """Export one spec in each format; returns (trial count, compute_stats rows, k).
+
+    Files are <prefix>_detailed.<format> and <prefix>_summary.<format>
+    unless detailed_file/summary_file name the CSVs (the Parquet file then
+    takes detailed_file's name). Parquet has no summary file.
+    """
+    if formats is None:
+        formats = DEFAULT_FORMATS
+        if not parquet_available():
+            print("⚠️  pyarrow is not installed; skipping the Parquet export (pip install pyarrow)")
+
+    cells = spec_cells(spec)
+    runs = [store.get_run(entry['run_id']) for entry in spec_entries(spec)]
+    missing = [entry['run_id'] for entry, run in zip(spec_entries(spec), runs) if run is None]
+    if missing:
+        raise ValueError(f"Run(s) not in the database: {', '.join(missing)}")
+    k = max(run['num_trials'] or 1 for run in runs)
+
+    stats = store.stats(cells=cells)
+    summary = summary_rows(stats, k)
+
+    count = 0
+    for fmt in formats:
+        if fmt == 'csv':
+            detailed = detailed_file or f"{prefix}_detailed.csv"
+            count = write_detailed_csv((detailed_row(t) for t in store.iter_trials(cells=cells)), detailed)
+            summarized = summary_file or f"{prefix}_summary.csv"
+            write_summary_csv(summary, summarized, k)
+        elif fmt == 'json':
+            detailed = f"{prefix}_detailed.json"
+            count = write_detailed_json((detailed_row(t) for t in store.iter_trials(cells=cells)), detailed)
+            summarized = f"{prefix}_summary.json"
+            write_summary_json(summary, summarized)
+        elif fmt == 'parquet':
+            detailed = os.path.splitext(detailed_file)[0] + '.parquet' if detailed_file else f"{prefix}_detailed.parquet"
+            count = write_parquet(store.iter_trials(cells=cells), detailed)
+            print(f"✅ Exported {count} trials to {detailed}")
+            continue
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        print(f"✅ Exported {count} trials to {detailed} and the summary to {summarized}")
+
+    return count, stats, k
+
+
+def display_summary(stats, k, title):
+    print("\n" + "="*80)
+    print(title)
+    print("="*80)
+    print(f"\n{'Model':<25} {'Mode':<15} {'Pass@1':<10} {f'Pass@{k}':<10} {'Accuracy':<10}")
+    print("-"*80)
+
+    for row in stats:
+        print(f"{row['model_name']:<25} {row['mode']:<15} "
+              f"{row['pass_at_1']:>7.2f}%  "
+              f"{row['pass_at_k']:>7.2f}%  "
+              f"{row['accuracy']:>7.2f}%")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export runs to detailed and summary CSV/JSON (and detailed Parquet)")
+    parser.add_argument('--spec', metavar='FILE', help="JSON run spec (see results_store)")
+    parser.add_argument('--run', action='append', metavar='RUN_ID',
+                        help="Run to include (repeatable; later runs win shared cells)")
+    parser.add_argument('--prefer', choices=sorted(PRECEDENCE), help="Precedence rule for cells several runs share")
+    parser.add_argument('--format', action='append', choices=['csv', 'json', 'parquet'],
+                        help="Output format (repeatable; default: csv, plus parquet if pyarrow is installed)")
+    parser.add_argument('--output', metavar='PREFIX', help="Output file prefix (default: results_<run IDs>)")
+    parser.add_argument('--db', default="eval_history.db")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.spec:
+        spec = load_spec(args.spec)
+    elif args.run:
+        spec = {'runs': args.run}
+    else:
+        latest = store.latest_run()
+        if latest is None:
+            print("No runs found in database")
+            store.close()
+            raise SystemExit(1)
+        spec = {'runs': [latest['run_id']]}
+    if args.prefer:
+        spec['precedence'] = args.prefer
+
+    run_ids = [entry['run_id'] for entry in spec_entries(spec)]
+    prefix = args.output or spec.get('name') or f"results_{'+'.join(run_ids)}"
+
+    print(f"\n📦 Exporting {', '.join(run_ids)} (precedence: {spec.get('precedence', 'latest')})")
+    count, stats, k = export_spec(store, spec, prefix, formats=args.format)
+    display_summary(stats, k, f"RESULTS: {', '.join(run_ids)}")
+    store.close()
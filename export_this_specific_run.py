@@ -1,80 +1,36 @@
-import sqlite3
 import csv
 from datetime import datetime
+from results_store import ResultsStore, MODE_LABELS
 
 def find_and_export_run():
-    conn = sqlite3.connect('eval_history.db')
-    cursor = conn.cursor()
+    store = ResultsStore()
     
     # Find runs that match these exact stats
     # Looking for: Sonnet No Search = 87.5% avg (7/8 correct across 5 trials)
     # This is distinctive enough to identify the run
+    candidates = store.stats(models=['Claude Sonnet 4.5'], modes=['NO SEARCH'], by_run=True)
+    matching = [row['run_id'] for row in candidates if abs(row['accuracy'] - 87.5) < 1]
     
-    cursor.execute('''
-        SELECT DISTINCT e.timestamp, e.eval_name
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE mr.model_name = 'Claude Sonnet 4.5'
-        AND e.eval_name LIKE '%NO SEARCH%'
-        GROUP BY e.timestamp, e.eval_name
-        HAVING ABS(AVG(mr.score) * 100 - 87.5) < 1
-        ORDER BY e.timestamp DESC
-        LIMIT 1
-    ''')
-    
-    result = cursor.fetchone()
-    
-    if not result:
+    if matching:
+        # Run IDs are start timestamps, so the largest is the most recent
+        run = store.get_run(max(matching))
+    else:
         print("❌ Could not find that specific run. Trying most recent...")
-        cursor.execute('''
-            SELECT timestamp FROM evaluations 
-            ORDER BY timestamp DESC LIMIT 1
-        ''')
-        result = cursor.fetchone()
-    
-    target_timestamp = result[0]
-    
-    print(f"\n📊 Exporting benchmark run from: {target_timestamp}")
-    print("=" * 70)
+        run = store.latest_run()
     
-    # Get all responses from this timestamp (both modes)
-    cursor.execute('''
-        SELECT 
-            e.question,
-            e.expected_answer,
-            e.category,
-            e.eval_name,
-            mr.model_name,
-            mr.response,
-            mr.score,
-            mr.reasoning,
-            mr.error,
-            mr.latency_seconds,
-            e.id
-        FROM evaluations e
-        JOIN model_responses mr ON e.id = mr.eval_id
-        WHERE e.timestamp = ?
-        ORDER BY e.id, mr.model_name, mr.id
-    ''', (target_timestamp,))
-    
-    responses = cursor.fetchall()
-    
-    if not responses:
+    if not run:
         print("No responses found")
+        store.close()
         return
     
-    # Count questions
-    cursor.execute('''
-        SELECT COUNT(DISTINCT id) FROM evaluations WHERE timestamp = ?
-    ''', (target_timestamp,))
-    num_questions = cursor.fetchone()[0]
+    print(f"\n📊 Exporting benchmark run from: {run['started_at']} (run {run['run_id']})")
+    print("=" * 70)
     
-    # Export to CSV
+    # Export to CSV, streaming rows straight from the database
     export_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"benchmark_results_{export_timestamp}.csv"
-    
-    # Track for trial numbering
-    trial_counter = {}
+    exported = 0
+    questions = set()
     
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -94,88 +50,52 @@ def find_and_export_run():
             'Latency (s)'
         ])
         
-        for row in responses:
-            question, expected, category, eval_name, model, response, score, reasoning, error, latency, eval_id = row
-            
-            # Determine mode
-            if "NO SEARCH" in eval_name:
-                mode = "No Search"
-            elif "WITH SEARCH" in eval_name:
-                mode = "With Search"
-            else:
-                mode = "Unknown"
-            
-            # Track trial number
-            key = (eval_id, model, mode)
-            if key not in trial_counter:
-                trial_counter[key] = 0
-            trial_counter[key] += 1
-            trial_num = trial_counter[key]
-            
+        for trial in store.iter_trials(run_ids=[run['run_id']]):
+            score = trial.score
             pass_fail = "PASS" if score == 1 else "FAIL" if score == 0 else "N/A"
-            response_text = response if response else f"ERROR: {error}" if error else "No response"
-            latency_str = f"{latency:.2f}" if latency else "N/A"
-            
-            # Generate question ID
-            question_id = f"q{eval_id}"
+            response_text = trial.response if trial.response else f"ERROR: {trial.error}" if trial.error else "No response"
+            latency_str = f"{trial.latency_seconds:.2f}" if trial.latency_seconds else "N/A"
             
             writer.writerow([
-                question_id,
-                question,
-                expected,
-                category,
-                model,
-                mode,
-                trial_num,
+                trial.question_id,
+                trial.question,
+                trial.expected_answer,
+                trial.category,
+                trial.model_name,
+                MODE_LABELS.get(trial.mode, "Unknown"),
+                trial.trial,
                 response_text,
                 score if score is not None else "N/A",
                 pass_fail,
-                reasoning if reasoning else "",
-                error if error else "",
+                trial.reasoning if trial.reasoning else "",
+                trial.error if trial.error else "",
                 latency_str
             ])
+            exported += 1
+            questions.add(trial.question_id)
     
-    print(f"✅ Exported {len(responses)} responses to: {filename}")
-    print(f"   Questions: {num_questions // 2}")  # Divide by 2 because we have 2 modes
-    print(f"   Trials per question: ~5")
+    if not exported:
+        print("No responses found")
+        store.close()
+        return
+    
+    print(f"✅ Exported {exported} responses to: {filename}")
+    print(f"   Questions: {len(questions)}")
+    print(f"   Trials per question: {run['num_trials']}")
     
     # Show summary matching the terminal output
     print("\n📈 VERIFICATION - SHOULD MATCH YOUR TERMINAL OUTPUT:")
     print("=" * 70)
     
-    models = ["Claude Sonnet 4.5", "Claude Opus 4.5", "GPT-5.2", "Gemini 3"]
+    stats = {(row['model_name'], row['mode']): row for row in store.stats(run_ids=[run['run_id']])}
     
-    for model in models:
-        for mode_suffix in [" (NO SEARCH)", " (WITH SEARCH)"]:
-            mode_display = "No Search" if "NO SEARCH" in mode_suffix else "With Search"
-            
-            # Get stats for this model/mode combo
-            cursor.execute('''
-                SELECT 
-                    COUNT(DISTINCT e.id) as num_questions,
-                    SUM(CASE WHEN mr.score = 1 AND mr.id IN (
-                        SELECT MIN(mr2.id) FROM model_responses mr2 
-                        JOIN evaluations e2 ON mr2.eval_id = e2.id
-                        WHERE e2.timestamp = ? AND e2.eval_name LIKE ? AND mr2.model_name = ?
-                        GROUP BY e2.id
-                    ) THEN 1 ELSE 0 END) as pass_at_1,
-                    AVG(mr.score) * 100 as avg_score
-                FROM evaluations e
-                JOIN model_responses mr ON e.id = mr.eval_id
-                WHERE e.timestamp = ?
-                AND e.eval_name LIKE ?
-                AND mr.model_name = ?
-            ''', (target_timestamp, f'%{mode_suffix}', model, target_timestamp, f'%{mode_suffix}', model))
-            
-            result = cursor.fetchone()
-            if result and result[0]:
-                num_q, pass1, avg = result
-                pass1_pct = (pass1 / num_q * 100) if num_q else 0
-                avg_display = avg if avg is not None else 0
-                
-                print(f"{model:20s} {mode_display:15s}  Pass@1: {pass1_pct:>5.1f}%  Avg: {avg_display:>5.1f}%")
+    for model in run['models']:
+        for mode in ['NO SEARCH', 'WITH SEARCH']:
+            row = stats.get((model, mode))
+            if row:
+                print(f"{model:20s} {MODE_LABELS[mode]:15s}  Pass@1: {row['pass_at_1']:>5.1f}%  Avg: {row['accuracy']:>5.1f}%")
     
-    conn.close()
+    store.close()
     print("\n" + "=" * 70)
 
 if __name__ == "__main__":
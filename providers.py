@@ -0,0 +1,400 @@
+"""
+Provider adapters driven by the declarative model registry (model_registry.json).
+
+Each provider (anthropic/openai/google) gets one adapter holding one SDK
+client, and that client holds one pooled, keep-alive HTTP connection pool.
+Models are plain registry entries, so adding a model is a config change:
+
+    registry = load_registry()
+    adapters = build_adapters(registry)
+    spec = registry.models["GPT-5.2"]
+    text, error = adapters[spec.provider].generate(spec, "Who is Judy?", use_search=True)
+
+or, by display name, generate(registry, adapters, "GPT-5.2", "Who is Judy?").
+
+Concurrency is capped per provider ("concurrency" in its registry entry),
+shared by its models and the judge. A model or the judge can set a narrower
+"concurrency" of its own.
+"""
+import json
+import os
+import time
+
+from call_timeout import TimeoutExecutor, CallTimeoutError
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_registry.json')
+
+# In-flight calls allowed for a provider whose registry entry sets no concurrency
+DEFAULT_PROVIDER_CONCURRENCY = 1
+
+
+class ModelSpec:
+    def __init__(self, name, config, provider_config=None):
+        provider_config = provider_config or {}
+        self.name = name
+        self.provider = config['provider']
+        self.model_id = config['model_id']
+        self.max_tokens = config.get('max_tokens')
+        self.timeout = config.get('timeout', 120)
+        # Optional cap below the provider's; None means only the provider cap applies
+        self.concurrency = config.get('concurrency')
+        self.search_tools = config.get('search_tools', [])
+        # Retry policy defaults to the provider's, models can override it
+        self.retries = config.get('retries', provider_config.get('retries', 1))
+        self.retry_on = config.get('retry_on', provider_config.get('retry_on', []))
+
+    def __repr__(self):
+        return f"ModelSpec({self.name!r}, {self.provider}/{self.model_id})"
+
+
+class ModelRegistry:
+    def __init__(self, data):
+        self.providers = data['providers']
+        self.models = {
+            name: ModelSpec(name, config, self.providers.get(config['provider']))
+            for name, config in data['models'].items()
+        }
+        judge = data['judge']
+        self.judge = ModelSpec(judge['name'], judge, self.providers.get(judge['provider']))
+
+    def provider_concurrency(self):
+        return {
+            provider: config.get('concurrency', DEFAULT_PROVIDER_CONCURRENCY)
+            for provider, config in self.providers.items()
+        }
+
+    def concurrency(self, spec):
+        """Calls a model (or the judge) can have in flight: its own cap within its provider's"""
+        limit = self.provider_concurrency().get(spec.provider, DEFAULT_PROVIDER_CONCURRENCY)
+        return min(spec.concurrency, limit) if spec.concurrency else limit
+
+    def rate_limits(self):
+        return {
+            provider: config['rate_limit']
+            for provider, config in self.providers.items()
+            if 'rate_limit' in config
+        }
+
+
+def load_registry(path=REGISTRY_FILE):
+    with open(path, 'r') as f:
+        return ModelRegistry(json.load(f))
+
+
+class ProviderAdapter:
+    name = None
+    # Whether submit_batch/batch_status/batch_results are implemented (no-search runs only)
+    supports_batch = False
+
+    def __init__(self, api_key, config, timeout_executor=None, rate_limiter=None):
+        self.config = config
+        self.timeout_executor = timeout_executor or TimeoutExecutor()
+        self.rate_limiter = rate_limiter
+        self.client = self.build_client(api_key, config)
+
+    def build_client(self, api_key, config):
+        raise NotImplementedError
+
+    def create(self, spec, prompt, use_search=False):
+        """Raw SDK call; returns the provider's response object"""
+        raise NotImplementedError
+
+    def extract_text(self, response):
+        raise NotImplementedError
+
+    def submit_batch(self, requests):
+        """Submit [(custom_id, spec, prompt), ...] as one batch job; returns the batch id"""
+        raise NotImplementedError
+
+    def batch_status(self, batch_id):
+        """Returns (finished, progress) for a submitted batch"""
+        raise NotImplementedError
+
+    def batch_results(self, batch_id):
+        """Returns {custom_id: (text, error)} for a finished batch"""
+        raise NotImplementedError
+
+    def search_evidence(self, response):
+        """Descriptions of the searches a response shows were made ([] if none)"""
+        return []
+
+    def generate(self, spec, prompt, use_search=False):
+        """Call the model with the spec's timeout and retry policy; returns (text, error)"""
+        text, error, _ = self.generate_response(spec, prompt, use_search)
+        return text, error
+
+    def generate_response(self, spec, prompt, use_search=False):
+        """generate(), also returning the provider's last response object (None if no call succeeded)"""
+        error_msg = None
+        response = None
+
+        for attempt in range(spec.retries):
+            last_attempt = attempt == spec.retries - 1
+            try:
+                response = self.timeout_executor.run(self.create, spec.timeout, spec, prompt, use_search)
+            except CallTimeoutError:
+                return None, f"{spec.name} API call timed out after {spec.timeout} seconds", response
+            except Exception as e:
+                error_msg = str(e)
+                rate_limited = self.rate_limiter is not None and self.rate_limiter.record_error(self.name, e)
+
+                if last_attempt:
+                    if spec.retries > 1:
+                        return None, f"{spec.name} error after {spec.retries} attempts: {error_msg[:200]}", response
+                    return None, error_msg, response
+                if rate_limited:
+                    # Wait on the backed-off bucket (honours retry-after) before retrying
+                    self.rate_limiter.acquire(self.name)
+                    continue
+                if any(marker in error_msg for marker in spec.retry_on):
+                    time.sleep(min(2 ** attempt, 8))
+                    continue
+                return None, error_msg, response
+
+            text = self.extract_text(response)
+            if text:
+                return text, None, response
+
+            # No text back (e.g. Gemini stopping on a function call) - try again
+            error_msg = f"{spec.name} returned no text"
+            if not last_attempt:
+                time.sleep(1)
+
+        return None, f"{error_msg} after {spec.retries} attempts", response
+
+
+def _http_client(config):
+    """One pooled, keep-alive HTTP client per provider; reused for every call"""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=config.get('max_connections', 32),
+        max_keepalive_connections=config.get('max_connections', 32),
+        keepalive_expiry=config.get('keepalive_expiry', 60)
+    )
+    return httpx.Client(limits=limits, timeout=httpx.Timeout(600, connect=10))
+
+
+class AnthropicAdapter(ProviderAdapter):
+    name = 'anthropic'
+    supports_batch = True
+
+    def build_client(self, api_key, config):
+        import anthropic
+
+        # Retries live in generate() so the rate limiter sees every 429
+        return anthropic.Anthropic(api_key=api_key, http_client=_http_client(config), max_retries=0)
+
+    def request_params(self, spec, prompt, use_search=False):
+        params = {
+            'model': spec.model_id,
+            'max_tokens': spec.max_tokens,
+            'messages': [{"role": "user", "content": prompt}],
+        }
+        if use_search and spec.search_tools:
+            params['tools'] = spec.search_tools
+        return params
+
+    def create(self, spec, prompt, use_search=False):
+        return self.client.messages.create(**self.request_params(spec, prompt, use_search))
+
+    def extract_text(self, response):
+        text_parts = [block.text for block in response.content if hasattr(block, 'text')]
+        return ' '.join(text_parts)
+
+    def search_evidence(self, response):
+        return [
+            f"Tool: {block.name}" for block in response.content
+            if getattr(block, 'type', None) in ('tool_use', 'server_tool_use')
+        ]
+
+    def submit_batch(self, requests):
+        batch = self.client.beta.messages.batches.create(requests=[
+            {'custom_id': custom_id, 'params': self.request_params(spec, prompt)}
+            for custom_id, spec, prompt in requests
+        ])
+        return batch.id
+
+    def batch_status(self, batch_id):
+        batch = self.client.beta.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        done = counts.succeeded + counts.errored + counts.canceled + counts.expired
+        return batch.processing_status == 'ended', f"{done}/{done + counts.processing} done"
+
+    def batch_results(self, batch_id):
+        results = {}
+        for entry in self.client.beta.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == 'succeeded':
+                text = self.extract_text(result.message)
+                results[entry.custom_id] = (text, None) if text else (None, "Batch request returned no text")
+            elif result.type == 'errored':
+                results[entry.custom_id] = (None, f"Batch request errored: {result.error.error.message}")
+            else:
+                results[entry.custom_id] = (None, f"Batch request {result.type}")
+        return results
+
+
+class OpenAIAdapter(ProviderAdapter):
+    name = 'openai'
+    supports_batch = True
+
+    def build_client(self, api_key, config):
+        import openai
+
+        return openai.OpenAI(api_key=api_key, http_client=_http_client(config), max_retries=0)
+
+    def chat_params(self, spec, prompt):
+        return {
+            'model': spec.model_id,
+            'messages': [{"role": "user", "content": prompt}],
+            'max_completion_tokens': spec.max_tokens,
+        }
+
+    def create(self, spec, prompt, use_search=False):
+        # Web search is only available through the Responses API
+        if use_search and spec.search_tools:
+            return self.client.responses.create(
+                model=spec.model_id,
+                tools=spec.search_tools,
+                tool_choice="auto",
+                input=prompt
+            )
+        return self.client.chat.completions.create(**self.chat_params(spec, prompt))
+
+    def extract_text(self, response):
+        if hasattr(response, 'output_text'):
+            return response.output_text
+        return response.choices[0].message.content
+
+    def search_evidence(self, response):
+        # Only Responses API output lists the web_search_call items
+        calls = [item for item in getattr(response, 'output', None) or [] if getattr(item, 'type', None) == 'web_search_call']
+        return [f"Web search calls: {len(calls)}"] if calls else []
+
+    def submit_batch(self, requests):
+        lines = [
+            json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self.chat_params(spec, prompt),
+            })
+            for custom_id, spec, prompt in requests
+        ]
+        batch_file = self.client.files.create(
+            file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+            purpose='batch'
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        return batch.id
+
+    def batch_status(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        finished = batch.status in ('completed', 'failed', 'expired', 'cancelled')
+        counts = batch.request_counts
+        if counts and counts.total:
+            return finished, f"{counts.completed + counts.failed}/{counts.total} done"
+        return finished, batch.status
+
+    def batch_results(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+
+        # Successes land in the output file, failed requests in the error file
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    error = entry.get('error') or response.get('body', {}).get('error')
+                    results[entry['custom_id']] = (None, f"Batch request errored: {error}")
+                    continue
+                text = response['body']['choices'][0]['message']['content']
+                results[entry['custom_id']] = (text, None) if text else (None, "Batch request returned no text")
+
+        return results
+
+
+class GoogleAdapter(ProviderAdapter):
+    name = 'google'
+
+    def build_client(self, api_key, config):
+        # google-genai keeps its own pooled HTTP client per Client instance
+        from google import genai
+
+        return genai.Client(api_key=api_key)
+
+    def create(self, spec, prompt, use_search=False):
+        config = {}
+        if use_search and spec.search_tools:
+            config['tools'] = spec.search_tools
+        if spec.max_tokens:
+            config['max_output_tokens'] = spec.max_tokens
+        if config:
+            return self.client.models.generate_content(model=spec.model_id, contents=prompt, config=config)
+        return self.client.models.generate_content(model=spec.model_id, contents=prompt)
+
+    def extract_text(self, response):
+        return response.text if hasattr(response, 'text') else None
+
+    def search_evidence(self, response):
+        candidates = getattr(response, 'candidates', None) or []
+        metadata = getattr(candidates[0], 'grounding_metadata', None) if candidates else None
+        if not metadata:
+            return []
+        evidence = []
+        if getattr(metadata, 'web_search_queries', None):
+            evidence.append(f"Search queries executed: {len(metadata.web_search_queries)}")
+        if getattr(metadata, 'grounding_chunks', None):
+            evidence.append(f"Grounding chunks (sources): {len(metadata.grounding_chunks)}")
+        return evidence or ["Grounding metadata present"]
+
+
+ADAPTERS = {
+    'anthropic': AnthropicAdapter,
+    'openai': OpenAIAdapter,
+    'google': GoogleAdapter,
+}
+
+
+def build_adapters(registry, timeout_executor=None, rate_limiter=None, providers=None):
+    """One adapter per provider that has an API key set (optionally limited to `providers`)"""
+    timeout_executor = timeout_executor or TimeoutExecutor()
+    adapters = {}
+
+    for provider, config in registry.providers.items():
+        if providers is not None and provider not in providers:
+            continue
+        api_key = os.getenv(config['api_key_env'])
+        if api_key:
+            adapters[provider] = ADAPTERS[provider](api_key, config, timeout_executor, rate_limiter)
+
+    return adapters
+
+
+def generate(registry, adapters, model_name, prompt, use_search=False):
+    """Look a model up by display name and call it through its provider's adapter"""
+    text, error, _ = generate_response(registry, adapters, model_name, prompt, use_search)
+    return text, error
+
+
+def generate_response(registry, adapters, model_name, prompt, use_search=False):
+    """generate(), also returning the raw response (e.g. for adapter.search_evidence)"""
+    spec = registry.models.get(model_name)
+    if spec is None:
+        return None, "Unknown model", None
+
+    adapter = adapters.get(spec.provider)
+    if adapter is None:
+        return None, f"No {spec.provider} client configured", None
+
+    return adapter.generate_response(spec, prompt, use_search=use_search)
@@ -0,0 +1,147 @@
+"""
+Adaptive per-provider rate limiting for model API calls.
+
+Each provider (keyed like the model registry: anthropic/openai/google)
+gets a token bucket. The bucket's refill rate backs off multiplicatively on
+429/overload errors, honours retry-after headers, and creeps back up on
+successful calls.
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Starting requests/second and burst size per provider
+DEFAULT_RATES = {
+    'anthropic': {'rate': 2.0, 'burst': 4},
+    'openai': {'rate': 2.0, 'burst': 4},
+    'google': {'rate': 1.0, 'burst': 2},
+}
+
+# Substrings that mark an error message as a rate limit / overload response
+RATE_LIMIT_MARKERS = [
+    "429",
+    "529",
+    "rate limit",
+    "rate_limit",
+    "overloaded",
+    "RESOURCE_EXHAUSTED",
+    "Too Many Requests",
+]
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, min_rate=0.05, max_rate=None, increase_step=0.05, backoff_factor=0.5):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+
+        self.tokens = float(burst)
+        # Refill clock; pushed into the future while a retry-after is in force
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.last_refill:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+    def reserve(self):
+        """Take one token and return how many seconds the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self.last_refill - now)
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after=None):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.last_refill = max(self.last_refill, now + retry_after)
+
+
+def is_rate_limit_error(error):
+    """True if an exception (or error string) is a 429/overload response"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if status in (429, 529):
+        return True
+    message = str(error)
+    return any(marker.lower() in message.lower() for marker in RATE_LIMIT_MARKERS)
+
+
+def retry_after_seconds(error):
+    """Read retry-after / retry-after-ms from an SDK exception's HTTP response"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, rates=None):
+        rates = rates if rates is not None else DEFAULT_RATES
+        self.buckets = {
+            provider: TokenBucket(config['rate'], config['burst'])
+            for provider, config in rates.items()
+        }
+        self.throttle_events = {provider: 0 for provider in self.buckets}
+
+    def _bucket(self, provider):
+        if provider not in self.buckets:
+            default = DEFAULT_RATES['anthropic']
+            self.buckets[provider] = TokenBucket(default['rate'], default['burst'])
+            self.throttle_events[provider] = 0
+        return self.buckets[provider]
+
+    def acquire(self, provider):
+        """Block until the provider's bucket allows a call; returns seconds spent waiting"""
+        wait = self._bucket(provider).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_success(self, provider):
+        self._bucket(provider).on_success()
+
+    def record_error(self, provider, error):
+        """Back off if the error was a rate limit; returns True when it was"""
+        if not is_rate_limit_error(error):
+            return False
+        self._bucket(provider).on_throttled(retry_after_seconds(error))
+        self.throttle_events[provider] += 1
+        return True
+
+    def current_rates(self):
+        return {provider: bucket.rate for provider, bucket in self.buckets.items()}
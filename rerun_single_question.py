@@ -1,120 +1,41 @@
-import anthropic
-import openai
-from google import generativeai as genai
 import json
-import os
 from datetime import datetime
 from dotenv import load_dotenv
 import time
-from eval_logger import EvalLogger
+from eval_logger import EvalLogger, RUN_KIND_RERUN
+from rate_limiter import AdaptiveRateLimiter
+from providers import load_registry, build_adapters, generate
 import csv
-import sqlite3
 
 load_dotenv()
 
+# Only the Claude models get search tools in WITH SEARCH mode, as in the original rerun
+# script, so reruns stay comparable with earlier ones; GPT-5.2 and Gemini 3 answer without
+# search in both modes (run_full_benchmark.py gives every model its search tools)
+SEARCH_MODELS = {"Claude Sonnet 4.5", "Claude Opus 4.5"}
+
 class SingleQuestionRerun:
+    """Rerun one question for every model in both modes, as its own 'rerun' run.
+
+    Reruns are recorded with kind 'rerun', so ResultsStore.latest_run() and the
+    export_latest*/export_only_latest_run scripts keep picking the last full run.
+    """
     def __init__(self, question_id):
         self.question_id = question_id
         self.logger = EvalLogger()
         
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        openai_key = os.getenv('OPENAI_API_KEY')
-        google_key = os.getenv('GOOGLE_API_KEY')
-        
-        self.clients = {}
-        
-        if anthropic_key:
-            self.clients['anthropic'] = anthropic.Anthropic(api_key=anthropic_key)
-        if openai_key:
-            self.clients['openai'] = openai.OpenAI(api_key=openai_key)
-        if google_key:
-            genai.configure(api_key=google_key)
-            self.clients['google'] = True
-        
+        self.registry = load_registry()
+        self.rate_limiter = AdaptiveRateLimiter(self.registry.rate_limits())
+        self.adapters = build_adapters(self.registry, rate_limiter=self.rate_limiter)
         self.all_responses = []
         self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     def call_model(self, model_name, question, use_search=False):
-        try:
-            if model_name == "Claude Sonnet 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "Claude Opus 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "GPT-5.2":
-                response = self.clients['openai'].chat.completions.create(
-                    model="gpt-5.2",
-                    messages=[{"role": "user", "content": question}],
-                    max_completion_tokens=500
-                )
-                return response.choices[0].message.content, None
-            
-            elif model_name == "Gemini 3":
-                model = genai.GenerativeModel('gemini-3-pro-preview')
-                
-                for attempt in range(3):
-                    try:
-                        response = model.generate_content(question)
-                        
-                        if hasattr(response, 'text') and response.text:
-                            return response.text, None
-                        else:
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, "Gemini returned no text after 3 attempts"
-                                
-                    except Exception as e:
-                        error_msg = str(e)
-                        
-                        if "finish_reason" in error_msg or "FunctionCall" in error_msg:
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, f"Gemini function call error: {error_msg[:100]}"
-                        else:
-                            return None, error_msg
-                
-                return None, "Gemini: Max retries reached"
-            
-        except Exception as e:
-            return None, str(e)
-        
-        return None, "Unknown model"
-    
+        return generate(self.registry, self.adapters, model_name, question, use_search=use_search)
+
     def judge_response(self, question, expected_answer, response):
-        if 'anthropic' not in self.clients:
+        judge = self.registry.judge
+        if judge.provider not in self.adapters:
             return None, "No judge available"
         
         judge_prompt = f"""You are evaluating an AI's answer to a question.
@@ -133,14 +54,14 @@ Respond with ONLY a JSON object:
 
 Score 1 if correct, 0 if incorrect."""
 
+        self.rate_limiter.acquire(judge.provider)
+        judge_text, error = self.adapters[judge.provider].generate(judge, judge_prompt)
+        if error:
+            return 0, error
+        self.rate_limiter.record_success(judge.provider)
+
         try:
-            judge_response = self.clients['anthropic'].messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                messages=[{"role": "user", "content": judge_prompt}]
-            )
-            
-            judge_text = judge_response.content[0].text.strip()
+            judge_text = judge_text.strip()
             
             if judge_text.startswith('```'):
                 judge_text = judge_text.split('```')[1]
@@ -188,6 +109,8 @@ Score 1 if correct, 0 if incorrect."""
         print("="*70)
         
         results = {}
+        self.logger.create_run(self.run_id, f"RERUN {self.question_id}", eval_file, num_trials,
+                               models, [mode_name for mode_name, _ in modes], kind=RUN_KIND_RERUN)
         
         for mode_name, use_search in modes:
             print(f"\n{'='*70}")
@@ -201,6 +124,11 @@ Score 1 if correct, 0 if incorrect."""
                 category=test_case.get('category', 'general'),
                 eval_name=eval_name
             )
+            self.logger.plan_trials(self.run_id, mode_name, [
+                (self.question_id, model_name, trial + 1, eval_id)
+                for model_name in models
+                for trial in range(num_trials)
+            ])
             
             for model_name in models:
                 print(f"\n  {model_name}:")
@@ -212,30 +140,27 @@ Score 1 if correct, 0 if incorrect."""
                 for trial in range(num_trials):
                     print(f"    Trial {trial+1}/{num_trials}...", end=" ", flush=True)
                     
+                    throttle = self.rate_limiter.acquire(self.registry.models[model_name].provider)
                     start_time = time.time()
-                    response, error = self.call_model(model_name, question, use_search=use_search)
+                    response, error = self.call_model(model_name, question, use_search=use_search and model_name in SEARCH_MODELS)
                     latency = time.time() - start_time
                     
                     if response:
+                        self.rate_limiter.record_success(self.registry.models[model_name].provider)
                         score, reasoning = self.judge_response(question, expected, response)
                         
-                        self.logger.log_model_response(
+                        response_id = self.logger.log_model_response(
                             eval_id=eval_id,
                             model_name=model_name,
                             response=response,
                             error=None,
-                            latency=latency
+                            latency=latency,
+                            throttle=throttle,
+                            score=score,
+                            reasoning=reasoning
                         )
-                        
-                        conn = sqlite3.connect('eval_history.db')
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            UPDATE model_responses 
-                            SET score = ?, reasoning = ?
-                            WHERE eval_id = ? AND model_name = ? AND response = ?
-                        ''', (score, reasoning, eval_id, model_name, response))
-                        conn.commit()
-                        conn.close()
+                        self.logger.complete_trial(self.run_id, mode_name, self.question_id, model_name, trial + 1,
+                                                   response_id, 'done')
                         
                         self.all_responses.append({
                             'question_id': self.question_id,
@@ -257,9 +182,12 @@ Score 1 if correct, 0 if incorrect."""
                     else:
                         print(f"❌ Error: {error[:50]}")
                         results[model_name][mode_name].append(0)
-                    
-                    time.sleep(0.5)
         
+        # Errored trials are not logged, so they leave the run incomplete
+        unfinished = self.logger.count_unfinished_trials(self.run_id)
+        self.logger.set_run_status(self.run_id, 'complete' if unfinished == 0 else 'incomplete')
+        # Commit the last partial batch now rather than on the flush timer
+        self.logger.flush()
         self.display_results(results, num_trials)
         self.export_results(results)
     
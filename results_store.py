@@ -0,0 +1,194 @@
+"""
+Read side of the eval history database, shared by the export and analysis scripts.
+
+ResultsStore answers the questions those scripts keep asking (the latest
+run, a run by ID, the trials matching a filter) from the run manifest
+(runs -> cells -> trials -> responses). Responses logged without one are
+imported into it when the store opens (EvalLogger.import_legacy_runs):
+
+    with ResultsStore() as store:
+        run = store.latest_run()
+        for trial in store.iter_trials(run_ids=[run['run_id']], modes=["WITH SEARCH"]):
+            print(trial.question_id, trial.model_name, trial.trial, trial.score)
+
+Trials are streamed from the cursor as Trial named tuples, so memory stays
+flat however large the history is. Each query shape is built as the same SQL
+text every time, so sqlite3's statement cache reuses the prepared statement.
+The filters are the ones compute_stats() takes.
+
+A run spec splices several runs into one result set, for example a run
+that hung and the continuation that finished it:
+
+    {"runs": ["20260104_130836", {"run_id": "20260104_192334", "modes": ["WITH SEARCH"]}],
+     "precedence": "latest"}
+
+Each entry is a run ID, or a dict that can also narrow it to some modes
+and leave out question IDs ("exclude"). Where more than one run has the
+same (mode, question, model) cell, the precedence rule picks one, in SQL:
+"latest" takes it from the run listed last, "complete" from the run that
+finished the most trials of it (the later run on a tie). Pass
+spec_cells(spec) as `cells` to iter_trials() or stats().
+"""
+import json
+from collections import namedtuple
+
+from eval_logger import EvalLogger, RUN_KIND_RERUN
+from stats import build_filter, compute_stats
+
+MODE_LABELS = {'NO SEARCH': 'No Search', 'WITH SEARCH': 'With Search'}
+
+Trial = namedtuple('Trial', [
+    'run_id', 'mode', 'question_id', 'model_name', 'trial', 'status', 'eval_id',
+    'question', 'expected_answer', 'category',
+    'response_id', 'response', 'error', 'score', 'reasoning',
+    'latency_seconds', 'throttle_seconds', 'score_tier'
+])
+
+# iter_trials(order=...): by question (the published CSV order) or the order the run executed
+TRIAL_ORDERS = {
+    'question': 'c.question_id, c.model_name, c.mode, t.trial',
+    'run': 'c.run_id, c.mode, t.seq',
+}
+
+# Rows fetched from SQLite per round trip while streaming
+FETCH_ROWS = 500
+
+# Run spec precedence rules, as the ORDER BY that ranks competing copies of a cell
+PRECEDENCE = {
+    'latest': 'priority DESC',
+    'complete': 'done DESC, priority DESC',
+}
+
+
+def load_spec(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def spec_entries(spec):
+    """The spec's runs as dicts with run_id, modes and exclude, in precedence order"""
+    entries = []
+    for entry in spec['runs']:
+        if isinstance(entry, str):
+            entry = {'run_id': entry}
+        entries.append({
+            'run_id': entry['run_id'],
+            'modes': list(entry.get('modes') or []),
+            'exclude': list(entry.get('exclude') or []),
+        })
+    return entries
+
+
+def spec_cells(spec):
+    """(sql, params) selecting the ids of the cells a run spec resolves to"""
+    precedence = spec.get('precedence', 'latest')
+    if precedence not in PRECEDENCE:
+        raise ValueError(f"Unknown precedence {precedence!r}; use one of {', '.join(sorted(PRECEDENCE))}")
+
+    candidates = []
+    params = []
+    for priority, entry in enumerate(spec_entries(spec)):
+        where = 'c.run_id = ?'
+        params.append(entry['run_id'])
+        if entry['modes']:
+            where += f" AND c.mode IN ({', '.join('?' for _ in entry['modes'])})"
+            params.extend(entry['modes'])
+        if entry['exclude']:
+            where += f" AND c.question_id NOT IN ({', '.join('?' for _ in entry['exclude'])})"
+            params.extend(entry['exclude'])
+        candidates.append(f'''
+                SELECT c.id AS cell_id, c.mode, c.question_id, c.model_name, {priority} AS priority,
+                       (SELECT COUNT(*) FROM trials t WHERE t.cell_id = c.id AND t.status = 'done') AS done
+                FROM cells c
+                WHERE {where}''')
+
+    sql = f'''
+        SELECT cell_id FROM (
+            SELECT cell_id,
+                   ROW_NUMBER() OVER (PARTITION BY mode, question_id, model_name ORDER BY {PRECEDENCE[precedence]}) AS pick
+            FROM ({' UNION ALL '.join(candidates)}
+            )
+        )
+        WHERE pick = 1'''
+    return sql, params
+
+
+class ResultsStore:
+    """Typed, streaming queries over one eval history database"""
+
+    def __init__(self, db_path="eval_history.db", logger=None):
+        # Opening through EvalLogger upgrades old databases and registers blob_text()
+        self.owns_logger = logger is None
+        self.logger = logger if logger is not None else EvalLogger(db_path)
+        self.conn = self.logger.conn
+
+        # Rows logged under a packed eval_name only (older scripts and databases) join
+        # the run manifest here, so latest_run() and the filters see their runs too
+        imported = self.logger.import_legacy_runs()
+        if imported:
+            print(f"✓ Imported {imported} responses logged without a run manifest")
+
+    def list_runs(self):
+        """Every run, newest first"""
+        for (run_id,) in self.conn.execute('SELECT run_id FROM runs ORDER BY started_at DESC'):
+            yield self.logger.get_run(run_id)
+
+    def latest_run(self, include_reruns=False):
+        """The most recently started run, or None; single-question reruns only with include_reruns"""
+        where = '' if include_reruns else 'WHERE kind != ?'
+        params = () if include_reruns else (RUN_KIND_RERUN,)
+        row = self.conn.execute(f'SELECT run_id FROM runs {where} ORDER BY started_at DESC LIMIT 1', params).fetchone()
+        return self.logger.get_run(row[0]) if row else None
+
+    def get_run(self, run_id):
+        return self.logger.get_run(run_id)
+
+    def iter_trials(self, run_ids=None, models=None, modes=None, slices=None, cells=None,
+                    finished_only=True, with_text=True, order='question'):
+        """Stream Trial rows matching the filters.
+
+        finished_only=False also yields planned trials that have no response
+        yet (their response fields are None). with_text=False skips decoding
+        the response and reasoning blobs, for callers that only need scores.
+        """
+        where, params = build_filter(run_ids, models, modes, slices, cells)
+        join = 'JOIN' if finished_only else 'LEFT JOIN'
+        source = 'responses' if with_text else 'model_responses'
+        text = 'r.response, r.error, r.score, r.reasoning' if with_text else 'NULL, r.error, r.score, NULL'
+
+        cursor = self.conn.cursor()
+        cursor.arraysize = FETCH_ROWS
+        cursor.execute(f'''
+            SELECT c.run_id, c.mode, c.question_id, c.model_name, t.trial, t.status, c.eval_id,
+                   e.question, e.expected_answer, e.category,
+                   t.response_id, {text},
+                   r.latency_seconds, r.throttle_seconds, r.score_tier
+            FROM cells c
+            JOIN trials t ON t.cell_id = c.id
+            JOIN evaluations e ON e.id = c.eval_id
+            {join} {source} r ON r.id = t.response_id
+            {where}
+            ORDER BY {TRIAL_ORDERS[order]}
+        ''', params)
+
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                return
+            for row in rows:
+                yield Trial._make(row)
+
+    def stats(self, run_ids=None, models=None, modes=None, slices=None, cells=None, by_run=False):
+        """compute_stats() over this database"""
+        return compute_stats(self.conn, run_ids=run_ids, models=models, modes=modes, slices=slices, cells=cells,
+                             by_run=by_run)
+
+    def close(self):
+        if self.owns_logger:
+            self.logger.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,230 +1,37 @@
-import anthropic
-import openai
-from google import genai  # New google-genai library for Gemini 3
-from google.genai import types as genai_types
+import argparse
+import asyncio
 import json
 import os
+import sys
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 import time
-from eval_logger import EvalLogger
+from eval_logger import EvalLogger, ResultWriter
+from event_log import EventLog
+from results_store import ResultsStore
+import columnar
+from rate_limiter import AdaptiveRateLimiter
+from providers import load_registry, build_adapters, generate
 import csv
-import sqlite3
-import statistics
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-import signal
+from concurrent.futures import ThreadPoolExecutor
+from call_timeout import TimeoutExecutor
+from cache import ResponseCache, JudgeCache, DEFAULT_MAX_ENTRIES, prompt_hash
+from scoring import (fast_path_score, fast_path_regressions, history_case, load_history, untested_answers,
+                     HISTORY_FILE, TIER_FAST_PATH, TIER_JUDGE_CACHE, TIER_JUDGE, TIER_ERROR)
 
 load_dotenv()
 
-class BenchmarkRunner:
-    def __init__(self):
-        self.logger = EvalLogger()
+# Upper bound on threads used to enforce call timeouts, shared by all providers
+TIMEOUT_POOL_SIZE = 32
 
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        openai_key = os.getenv('OPENAI_API_KEY')
-        google_key = os.getenv('GOOGLE_API_KEY')
+# Capacity of the queues between the generation, judge and persistence stages
+PIPELINE_QUEUE_SIZE = 16
 
-        self.clients = {}
+# Seconds between status checks on a submitted provider batch (--batch)
+BATCH_POLL_INTERVAL = 30
 
-        if anthropic_key:
-            self.clients['anthropic'] = anthropic.Anthropic(api_key=anthropic_key)
-        if openai_key:
-            self.clients['openai'] = openai.OpenAI(api_key=openai_key)
-        if google_key:
-            # Use new google-genai client for Gemini 3
-            self.clients['google'] = genai.Client(api_key=google_key)
-
-        self.all_responses = []
-        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    def call_model(self, model_name, question, use_search=False):
-        try:
-            if model_name == "Claude Sonnet 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-sonnet-4-5-20250929",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "Claude Opus 4.5":
-                if use_search:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}],
-                        tools=[{"type": "web_search_20250305", "name": "web_search"}]
-                    )
-                else:
-                    response = self.clients['anthropic'].messages.create(
-                        model="claude-opus-4-5-20251101",
-                        max_tokens=500,
-                        messages=[{"role": "user", "content": question}]
-                    )
-                text_parts = [block.text for block in response.content if hasattr(block, 'text')]
-                return ' '.join(text_parts), None
-            
-            elif model_name == "GPT-5.1":
-                # GPT-5.1 with optional web search using Responses API
-                if use_search:
-                    response = self.clients['openai'].responses.create(
-                        model="gpt-5.1",
-                        tools=[{"type": "web_search"}],
-                        tool_choice="auto",
-                        input=question
-                    )
-                    return response.output_text, None
-                else:
-                    response = self.clients['openai'].chat.completions.create(
-                        model="gpt-5.1",
-                        messages=[{"role": "user", "content": question}],
-                        max_completion_tokens=500
-                    )
-                    return response.choices[0].message.content, None
-
-            elif model_name == "GPT-5.2":
-                # GPT-5.2 with optional web search using Responses API
-                if use_search:
-                    response = self.clients['openai'].responses.create(
-                        model="gpt-5.2",
-                        tools=[{"type": "web_search"}],
-                        tool_choice="auto",
-                        input=question
-                    )
-                    return response.output_text, None
-                else:
-                    response = self.clients['openai'].chat.completions.create(
-                        model="gpt-5.2",
-                        messages=[{"role": "user", "content": question}],
-                        max_completion_tokens=500
-                    )
-                    return response.choices[0].message.content, None
-
-            elif model_name == "Gemini 3":
-                # Gemini 3 with google_search support using new google-genai library
-                # Try up to 3 times to handle intermittent errors with 120s timeout
-                for attempt in range(3):
-                    try:
-                        def call_gemini():
-                            if use_search:
-                                return self.clients['google'].models.generate_content(
-                                    model='gemini-3-pro-preview',
-                                    contents=question,
-                                    config={'tools': [{'google_search': {}}]}
-                                )
-                            else:
-                                return self.clients['google'].models.generate_content(
-                                    model='gemini-3-pro-preview',
-                                    contents=question
-                                )
-
-                        # Execute with 120-second timeout
-                        with ThreadPoolExecutor(max_workers=1) as executor:
-                            future = executor.submit(call_gemini)
-                            try:
-                                response = future.result(timeout=120)
-                            except TimeoutError:
-                                return None, "Gemini API call timed out after 120 seconds"
-
-                        # Check if we got text back
-                        if hasattr(response, 'text') and response.text:
-                            return response.text, None
-                        else:
-                            # No text - try again
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, "Gemini returned no text after 3 attempts"
-
-                    except Exception as e:
-                        error_msg = str(e)
-
-                        # If it's a retriable error, try again
-                        if "finish_reason" in error_msg or "FunctionCall" in error_msg:
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, f"Gemini error: {error_msg[:100]}"
-                        else:
-                            # Other error - return immediately
-                            return None, error_msg
-
-                return None, "Gemini: Max retries reached"
-
-            elif model_name == "Gemini 3 Flash":
-                # Gemini 3 Flash with google_search support using new google-genai library
-                # Try up to 3 times to handle intermittent errors with 120s timeout
-                for attempt in range(3):
-                    try:
-                        def call_gemini_flash():
-                            if use_search:
-                                return self.clients['google'].models.generate_content(
-                                    model='gemini-3-flash-preview',
-                                    contents=question,
-                                    config={'tools': [{'google_search': {}}]}
-                                )
-                            else:
-                                return self.clients['google'].models.generate_content(
-                                    model='gemini-3-flash-preview',
-                                    contents=question
-                                )
-
-                        # Execute with 120-second timeout
-                        with ThreadPoolExecutor(max_workers=1) as executor:
-                            future = executor.submit(call_gemini_flash)
-                            try:
-                                response = future.result(timeout=120)
-                            except TimeoutError:
-                                return None, "Gemini Flash API call timed out after 120 seconds"
-
-                        # Check if we got text back
-                        if hasattr(response, 'text') and response.text:
-                            return response.text, None
-                        else:
-                            # No text - try again
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, "Gemini Flash returned no text after 3 attempts"
-
-                    except Exception as e:
-                        error_msg = str(e)
-
-                        # If it's a retriable error, try again
-                        if "finish_reason" in error_msg or "FunctionCall" in error_msg:
-                            if attempt < 2:
-                                time.sleep(1)
-                                continue
-                            else:
-                                return None, f"Gemini Flash error: {error_msg[:100]}"
-                        else:
-                            # Other error - return immediately
-                            return None, error_msg
-
-                return None, "Gemini Flash: Max retries reached"
-            
-        except Exception as e:
-            return None, str(e)
-        
-        return None, "Unknown model"
-    
-    def judge_response(self, question, expected_answer, response):
-        if 'anthropic' not in self.clients:
-            return None, "No judge available"
-        
-        judge_prompt = f"""You are evaluating an AI's answer to a question.
+JUDGE_PROMPT = """You are evaluating an AI's answer to a question.
 
 QUESTION: {question}
 
@@ -240,14 +47,163 @@ Respond with ONLY a JSON object:
 
 Score 1 if correct, 0 if incorrect."""
 
+MODE_LABELS = {"NO SEARCH": "No Search", "WITH SEARCH": "With Search"}
+
+
+def leaderboard_stats(logger, run_id, models, modes, num_trials):
+    """Pass@1, Pass@N and Accuracy per model and mode, read from the run's aggregates"""
+    leaderboard = {(row['model_name'], row['mode']): row for row in logger.get_leaderboard(run_id)}
+
+    stats = {}
+    for model in models:
+        for mode in modes:
+            row = leaderboard.get((model, mode))
+            if row is None:
+                continue
+            stats.setdefault(model, {})[MODE_LABELS[mode]] = {
+                'pass@1': row['pass_at_1'] or 0,
+                f'pass@{num_trials}': row['pass_at_k'],
+                'accuracy': row['accuracy']
+            }
+
+    return stats
+
+class BenchmarkRunner:
+    def __init__(self, registry_file=None, response_cache=None, judge_cache=None, fast_path=True):
+        self.logger = EvalLogger()
+        # Responses are written behind the pipeline by their own thread
+        self.writer = ResultWriter(self.logger)
+
+        # Models, providers, timeouts, concurrency and rate limits all come from the registry
+        self.registry = load_registry(registry_file) if registry_file else load_registry()
+        self.rate_limiter = AdaptiveRateLimiter(self.registry.rate_limits())
+        self.timeout_executor = TimeoutExecutor(max_workers=TIMEOUT_POOL_SIZE)
+        self.adapters = build_adapters(self.registry, self.timeout_executor, self.rate_limiter)
+
+        # In-flight calls per provider, shared by its generation and judge workers
+        self.provider_slots = {
+            provider: threading.BoundedSemaphore(limit)
+            for provider, limit in self.registry.provider_concurrency().items()
+        }
+
+        # Generations already paid for are reused (same model, mode, prompt, params and trial)
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+
+        # Verdicts are reused for identical answers; editing the judge prompt or model invalidates them
+        self.judge_cache = judge_cache if judge_cache is not None else JudgeCache()
+        judge = self.registry.judge
+        self.judge_version = prompt_hash(f"{judge.provider}/{judge.model_id}/{judge.max_tokens}\n{JUDGE_PROMPT}")
+
+        # Local scoring is checked against each run's eval set in execute_run (check_fast_path)
+        self.fast_path_requested = fast_path
+        self.fast_path = False
+
+        self.all_responses = []
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Set by resume_benchmark: modes already in the run manifest are resumed, not re-planned
+        self.resuming = False
+    
+    def fast_path_history(self, test_cases):
+        """Judged (row, test_case) pairs for the fast path replay: the v1 results plus
+        the judge's verdicts on this eval set's questions in the history database"""
+        history = []
+        try:
+            history.extend(load_history())
+        except FileNotFoundError:
+            print(f"⚠️  {HISTORY_FILE} not found; replaying only the judge verdicts in {self.logger.db_path}")
+
+        known_cases = {test_case['id']: test_case for test_case in test_cases}
+        for trial in ResultsStore(logger=self.logger).iter_trials():
+            # Rows the fast path scored itself would only check it against itself
+            if trial.question_id not in known_cases or trial.score not in (0, 1):
+                continue
+            if trial.score_tier in (TIER_FAST_PATH, TIER_ERROR):
+                continue
+            row = {
+                'question_id': trial.question_id,
+                'question': trial.question,
+                'expected_answer': trial.expected_answer,
+                'model': trial.model_name,
+                'mode': trial.mode,
+                'trial': trial.trial,
+                'response': trial.response,
+                'score': trial.score
+            }
+            history.append((row, history_case(row, known_cases)))
+        return history
+
+    def scored_cases(self, eval_data, modes):
+        """Test cases this run scores against: the eval file's, plus those a resumed run logged"""
+        test_cases = list(eval_data['test_cases'])
+        if self.resuming:
+            known_cases = {test_case['id']: test_case for test_case in test_cases}
+            logged = set()
+            for mode in modes:
+                for row in self.logger.get_run_trials(self.run_id, mode):
+                    if (row['question_id'], row['expected_answer']) not in logged:
+                        logged.add((row['question_id'], row['expected_answer']))
+                        test_cases.append(history_case(row, known_cases))
+        return test_cases
+
+    def check_fast_path(self, test_cases):
+        """True if judged history covers this eval set's expected answers and the fast path agrees with all of it"""
+        if not test_cases:
+            print("⚠️  Fast path off: no eval file to check it against; every response goes to the judge")
+            return False
+
+        history = self.fast_path_history(test_cases)
+        untested = untested_answers(test_cases, history)
+        if untested:
+            print(f"⚠️  Fast path off: no judged history for the expected answers of {', '.join(untested)}; "
+                  f"every response goes to the judge")
+            return False
+
+        accepted, disagreements = fast_path_regressions(history)
+        if disagreements:
+            print(f"⚠️  Fast path off: it accepts {len(disagreements)} of {accepted} historical responses the judge "
+                  f"failed (python scoring.py); every response goes to the judge")
+            return False
+
+        print(f"🎯 Fast path on: replayed {len(history)} judged responses, it agrees on all {accepted} it accepts")
+        return True
+
+    def call_model(self, model_name, question, use_search=False):
+        return generate(self.registry, self.adapters, model_name, question, use_search=use_search)
+    
+    def score_response(self, test_case, response):
+        """Tiered scoring: local fast path, then cached verdicts, then the LLM judge.
+
+        Returns (score, reasoning, tier), tier being the one that decided.
+        """
+        fast_path = fast_path_score(response, test_case) if self.fast_path else None
+        if fast_path is not None:
+            return fast_path[0], fast_path[1], TIER_FAST_PATH
+
+        question, expected_answer = test_case['prompt'], test_case['expected_answer']
+        cached = self.judge_cache.get(question, expected_answer, response, self.judge_version)
+        if cached is not None:
+            return cached[0], cached[1], TIER_JUDGE_CACHE
+
+        score, reasoning = self.judge_response(question, expected_answer, response)
+        return score, reasoning, TIER_JUDGE
+
+    def judge_response(self, question, expected_answer, response):
+        """Ask the LLM judge; verdicts that parse are stored in the judge cache"""
+        judge = self.registry.judge
+        if judge.provider not in self.adapters:
+            return None, "No judge available"
+        
+        judge_prompt = JUDGE_PROMPT.format(question=question, expected_answer=expected_answer, response=response)
+
+        with self.provider_slots[judge.provider]:
+            self.rate_limiter.acquire(judge.provider)
+            judge_text, error = self.adapters[judge.provider].generate(judge, judge_prompt)
+        if error:
+            return 0, error
+        self.rate_limiter.record_success(judge.provider)
+
         try:
-            judge_response = self.clients['anthropic'].messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                messages=[{"role": "user", "content": judge_prompt}]
-            )
-            
-            judge_text = judge_response.content[0].text.strip()
+            judge_text = judge_text.strip()
             
             if judge_text.startswith('```'):
                 judge_text = judge_text.split('```')[1]
@@ -256,199 +212,486 @@ Score 1 if correct, 0 if incorrect."""
                 judge_text = judge_text.strip()
             
             result = json.loads(judge_text)
-            return result['score'], result['reasoning']
+            score, reasoning = result['score'], result['reasoning']
             
         except Exception as e:
             return 0, str(e)
+        
+        self.judge_cache.put(question, expected_answer, response, self.judge_version, score, reasoning)
+        return score, reasoning
     
-    def run_single_mode(self, eval_data, models, num_trials, use_search=False, start_from_question=None):
+    def run_single_mode(self, eval_data, models, num_trials, use_search=False, start_from_question=None, batch=False):
         mode_name = "WITH SEARCH" if use_search else "NO SEARCH"
         test_cases = eval_data['test_cases']
 
+        # Skip questions before start_from_question if specified
+        if start_from_question:
+            test_cases = [tc for tc in test_cases if tc['id'] >= start_from_question]
+
         print(f"\n{'='*70}")
         print(f"MODE: {mode_name}")
         print(f"{'='*70}\n")
 
+        planned = self.logger.get_run_trials(self.run_id, mode_name) if self.resuming else []
+        if planned:
+            cells, eval_ids, finished = self.resume_plan(eval_data, planned, mode_name)
+        else:
+            # One evaluation row per question, logged up front so every trial has an eval_id
+            eval_name = f"{eval_data.get('eval_name', 'benchmark')} ({mode_name}) - RUN_{self.run_id}"
+            eval_ids = {}
+            for test_case in test_cases:
+                eval_ids[test_case['id']] = self.logger.log_evaluation(
+                    question=test_case['prompt'],
+                    expected_answer=test_case['expected_answer'],
+                    category=test_case.get('category', 'general'),
+                    eval_name=eval_name
+                )
+
+            cells = [
+                (test_case, model_name, trial)
+                for test_case in test_cases
+                for model_name in models
+                for trial in range(num_trials)
+            ]
+            self.logger.plan_trials(self.run_id, mode_name, [
+                (test_case['id'], model_name, trial + 1, eval_ids[test_case['id']])
+                for test_case, model_name, trial in cells
+            ])
+            finished = {}
+
+        pending = [index for index in range(len(cells)) if index not in finished]
+        if finished:
+            print(f"Resuming: {len(finished)} trials already done, {len(pending)} to run")
+        print(f"Running {len(pending)} trials concurrently...\n")
+
+        # Batch APIs have no search tools, so --batch only applies to the no-search half
+        batch_providers = set()
+        if batch and not use_search:
+            batch_providers = {
+                provider for provider, adapter in self.adapters.items() if adapter.supports_batch
+            }
+
+        records = [finished.get(index) for index in range(len(cells))]
+        if pending:
+            executed = asyncio.run(self.run_cells_async(
+                [cells[index] for index in pending], eval_ids, num_trials, use_search, batch_providers
+            ))
+            for index, record in zip(pending, executed):
+                records[index] = record
+
+        # Records are in plan order (question -> model -> trial), same as a serial run
         results = {}
+        for (test_case, model_name, trial), record in zip(cells, records):
+            results.setdefault(test_case['id'], {}).setdefault(model_name, []).append(record['score'])
+            self.all_responses.append(record)
 
-        for test_case in test_cases:
-            # Skip questions before start_from_question if specified
-            if start_from_question and test_case['id'] < start_from_question:
-                continue
-            test_id = test_case['id']
-            question = test_case['prompt']
-            expected = test_case['expected_answer']
-            
-            print(f"\n📝 Testing: {test_id}")
-            print(f"Question: {question[:80]}...")
-            print("-" * 70)
-            
-            eval_name = f"{eval_data.get('eval_name', 'benchmark')} ({mode_name}) - RUN_{self.run_id}"
-            eval_id = self.logger.log_evaluation(
-                question=question,
-                expected_answer=expected,
-                category=test_case.get('category', 'general'),
-                eval_name=eval_name
-            )
-            
-            results[test_id] = {}
-            
-            for model_name in models:
-                print(f"\n  {model_name}:")
-                model_results = []
-                
-                for trial in range(num_trials):
-                    print(f"    Trial {trial+1}/{num_trials}...", end=" ", flush=True)
-                    
-                    start_time = time.time()
-                    response, error = self.call_model(model_name, question, use_search=use_search)
-                    latency = time.time() - start_time
-                    
-                    if response:
-                        score, reasoning = self.judge_response(question, expected, response)
-                        
-                        self.logger.log_model_response(
-                            eval_id=eval_id,
-                            model_name=model_name,
-                            response=response,
-                            error=None,
-                            latency=latency
-                        )
-                        
-                        conn = sqlite3.connect('eval_history.db')
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            UPDATE model_responses 
-                            SET score = ?, reasoning = ?
-                            WHERE eval_id = ? AND model_name = ? AND response = ?
-                        ''', (score, reasoning, eval_id, model_name, response))
-                        conn.commit()
-                        conn.close()
-                        
-                        self.all_responses.append({
-                            'question_id': test_id,
-                            'question': question,
-                            'expected_answer': expected,
-                            'category': test_case.get('category', 'general'),
-                            'model': model_name,
-                            'mode': mode_name,
-                            'trial': trial + 1,
-                            'response': response,
-                            'score': score,
-                            'reasoning': reasoning,
-                            'latency': latency
-                        })
-                        
-                        model_results.append(score)
-                        status = "✅" if score == 1 else "❌"
-                        print(f"{status}")
-                        
-                    else:
-                        self.logger.log_model_response(
-                            eval_id=eval_id,
-                            model_name=model_name,
-                            response=None,
-                            error=error if error else "Unknown error",
-                            latency=latency
-                        )
-                        
-                        self.all_responses.append({
-                            'question_id': test_id,
-                            'question': question,
-                            'expected_answer': expected,
-                            'category': test_case.get('category', 'general'),
-                            'model': model_name,
-                            'mode': mode_name,
-                            'trial': trial + 1,
-                            'response': f"ERROR: {error if error else 'Unknown error'}",
-                            'score': 0,
-                            'reasoning': 'API Error',
-                            'latency': latency
-                        })
-                        
-                        print(f"❌")
-                        model_results.append(0)
-                    
-                    time.sleep(0.5)
-                
-                results[test_id][model_name] = model_results
-        
         return results
-    
-    def calculate_stats(self, results_no_search, results_with_search, num_trials):
-        """Calculate Pass@1, Pass@5, and Accuracy"""
 
-        stats = {}
+    def resume_plan(self, eval_data, planned, mode_name):
+        """Rebuild a mode's cells from the run manifest.
+
+        Returns (cells, eval_ids, finished) where finished maps the index of
+        every cell that already has a scored response to its record.
+        """
+        known_cases = {test_case['id']: test_case for test_case in eval_data['test_cases']}
+        test_cases = {}
+        cells = []
+        eval_ids = {}
+        finished = {}
+
+        for index, row in enumerate(planned):
+            question_id = row['question_id']
+            if question_id not in test_cases:
+                # The logged question is what the run was planned with, even if the eval file changed since
+                test_case = dict(known_cases.get(question_id, {}))
+                test_case.update(
+                    id=question_id,
+                    prompt=row['question'],
+                    expected_answer=row['expected_answer'],
+                    category=row['category']
+                )
+                test_cases[question_id] = test_case
+                eval_ids[question_id] = row['eval_id']
+
+            test_case = test_cases[question_id]
+            cells.append((test_case, row['model_name'], row['trial'] - 1))
+
+            if row['status'] == 'done':
+                finished[index] = {
+                    'question_id': question_id,
+                    'question': test_case['prompt'],
+                    'expected_answer': test_case['expected_answer'],
+                    'category': test_case.get('category', 'general'),
+                    'model': row['model_name'],
+                    'mode': mode_name,
+                    'trial': row['trial'],
+                    'response': row['response'],
+                    'score': row['score'],
+                    'reasoning': row['reasoning'],
+                    'latency': row['latency_seconds'] or 0.0,
+                    'tier': row['score_tier'],
+                    # Scored by an earlier session; kept for the results, left out of this session's tier counts
+                    'resumed': True
+                }
+
+        return cells, eval_ids, finished
+
+    async def run_cells_async(self, cells, eval_ids, num_trials, use_search=False, batch_providers=()):
+        """Run cells through a generation -> judge -> persistence pipeline.
+
+        Each stage has its own workers, connected by bounded queues, so judge
+        calls overlap with the next generations and a slow stage applies
+        back-pressure instead of piling up work in memory. Cells of providers
+        in batch_providers are generated through one batch job per provider
+        instead of live calls.
+        """
+        records = [None] * len(cells)
+
+        # Generation: one queue per model, with a worker per concurrency slot;
+        # the provider slots bound what all of a provider's workers run at once
+        models = {
+            model_name: self.registry.models[model_name]
+            for _, model_name, _ in cells
+            if self.registry.models[model_name].provider not in batch_providers
+        }
+        generation_queues = {model_name: asyncio.Queue() for model_name in models}
+        batch_cells = {}
+        for index, (test_case, model_name, trial) in enumerate(cells):
+            cell = {
+                'index': index,
+                'test_case': test_case,
+                'model_name': model_name,
+                'trial': trial,
+                'eval_id': eval_ids[test_case['id']],
+            }
+            if model_name in models:
+                generation_queues[model_name].put_nowait(cell)
+            else:
+                batch_cells.setdefault(self.registry.models[model_name].provider, []).append(cell)
+        judge_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        persist_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+        # Blocking SDK calls run on a pool sized to the worker counts, not the
+        # default executor (which is capped by CPU count)
+        judge_concurrency = self.registry.concurrency(self.registry.judge)
+        max_workers = sum(self.registry.concurrency(spec) for spec in models.values()) + judge_concurrency + len(batch_cells)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            generation_workers = [
+                asyncio.ensure_future(self.generation_worker(
+                    executor, spec, generation_queues[model_name], judge_queue, persist_queue, use_search
+                ))
+                for model_name, spec in models.items()
+                for _ in range(self.registry.concurrency(spec))
+            ]
+            generation_workers += [
+                asyncio.ensure_future(self.batch_worker(
+                    executor, provider, provider_cells, judge_queue, persist_queue
+                ))
+                for provider, provider_cells in batch_cells.items()
+            ]
+            judge_workers = [
+                asyncio.ensure_future(self.judge_worker(executor, judge_queue, persist_queue))
+                for _ in range(judge_concurrency)
+            ]
+            persist_worker = asyncio.ensure_future(
+                self.persist_worker(persist_queue, records, num_trials, use_search)
+            )
+
+            async def close_stage(workers, downstream, num_downstream_workers):
+                await asyncio.gather(*workers)
+                for _ in range(num_downstream_workers):
+                    await downstream.put(None)
+
+            # Any worker failure propagates here; asyncio.run cancels the rest
+            await asyncio.gather(
+                *generation_workers,
+                *judge_workers,
+                persist_worker,
+                close_stage(generation_workers, judge_queue, len(judge_workers)),
+                close_stage(judge_workers, persist_queue, 1)
+            )
+
+        return records
 
-        # Get models list from whichever result set has data
-        if results_no_search:
-            models = list(next(iter(results_no_search.values())).keys())
-        elif results_with_search:
-            models = list(next(iter(results_with_search.values())).keys())
+    def generate_cell(self, cell, use_search=False):
+        """Live call for a cell, holding a provider slot; returns (response, error, throttle, latency)"""
+        provider = self.registry.models[cell['model_name']].provider
+        with self.provider_slots[provider]:
+            # Time spent waiting on the provider's rate limiter is logged next to latency
+            throttle = self.rate_limiter.acquire(provider)
+            start_time = time.time()
+            response, error = self.call_model(cell['model_name'], cell['test_case']['prompt'], use_search)
+            return response, error, throttle, time.time() - start_time
+
+    async def generation_worker(self, executor, spec, queue, judge_queue, persist_queue, use_search=False):
+        loop = asyncio.get_running_loop()
+        provider = spec.provider
+
+        while not queue.empty():
+            cell = queue.get_nowait()
+
+            # Cache hits skip the rate limiter as well as the call
+            if self.lookup_cached(cell, use_search):
+                await self.route_generated(cell, judge_queue, persist_queue)
+                continue
+
+            response, error, cell['throttle'], cell['latency'] = await loop.run_in_executor(
+                executor, self.generate_cell, cell, use_search
+            )
+            cell['response'] = response
+            cell['error'] = error
+
+            if response:
+                self.rate_limiter.record_success(provider)
+                self.response_cache.put(
+                    spec, cell['test_case']['prompt'], response, use_search, cell['trial'], cell['latency']
+                )
+            await self.route_generated(cell, judge_queue, persist_queue)
+
+    async def batch_worker(self, executor, provider, cells, judge_queue, persist_queue):
+        """Generate all of a provider's cells as one batch job, then feed them to the judge stage"""
+        loop = asyncio.get_running_loop()
+        adapter = self.adapters[provider]
+        start_time = time.time()
+
+        pending = []
+        for cell in cells:
+            if self.lookup_cached(cell, use_search=False):
+                await self.route_generated(cell, judge_queue, persist_queue)
+            else:
+                pending.append(cell)
+        if not pending:
+            return
+        cells = pending
+
+        requests = [
+            (str(cell['index']), self.registry.models[cell['model_name']], cell['test_case']['prompt'])
+            for cell in cells
+        ]
+        results = {}
+        batch_error = f"No result in {provider} batch"
+        try:
+            batch_id = await loop.run_in_executor(executor, adapter.submit_batch, requests)
+            print(f"  📦 {provider}: submitted batch {batch_id} ({len(requests)} requests)")
+            while True:
+                finished, progress = await loop.run_in_executor(executor, adapter.batch_status, batch_id)
+                if finished:
+                    break
+                print(f"  📦 {provider}: batch {batch_id} {progress}")
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+            results = await loop.run_in_executor(executor, adapter.batch_results, batch_id)
+            print(f"  📦 {provider}: batch {batch_id} finished, {len(results)} results")
+        except Exception as e:
+            batch_error = f"{provider} batch failed: {str(e)[:200]}"
+            print(f"  ⚠️  {batch_error}")
+
+        # Batch turnaround is the only latency there is; no client-side throttling applies
+        latency = time.time() - start_time
+        for cell in cells:
+            cell['response'], cell['error'] = results.get(str(cell['index']), (None, batch_error))
+            cell['latency'] = latency
+            cell['throttle'] = 0.0
+            self.response_cache.put(
+                self.registry.models[cell['model_name']], cell['test_case']['prompt'],
+                cell['response'], False, cell['trial'], latency
+            )
+            await self.route_generated(cell, judge_queue, persist_queue)
+
+    def lookup_cached(self, cell, use_search=False):
+        """Fill a cell from the response cache; returns False on a miss"""
+        spec = self.registry.models[cell['model_name']]
+        cached = self.response_cache.get(spec, cell['test_case']['prompt'], use_search, cell['trial'])
+        if cached is None:
+            return False
+
+        cell['response'] = cached['response']
+        cell['error'] = None
+        cell['latency'] = cached['latency'] or 0.0
+        cell['throttle'] = 0.0
+        cell['cached'] = True
+        return True
+
+    async def route_generated(self, cell, judge_queue, persist_queue):
+        if cell['response']:
+            await judge_queue.put(cell)
         else:
-            return stats  # No results at all
-
-        for model in models:
-            stats[model] = {}
-
-            for mode_name, results in [("No Search", results_no_search), ("With Search", results_with_search)]:
-                # Skip if this mode has no results
-                if not results:
-                    continue
-                pass1_scores = []
-                passN_scores = []
-                all_trial_scores = []
-                
-                for test_id, test_results in results.items():
-                    scores = test_results[model]
-                    
-                    pass1_scores.append(scores[0] if scores else 0)
-                    passN_scores.append(1 if any(scores) else 0)
-                    all_trial_scores.extend(scores)
-                
-                pass1_mean = statistics.mean(pass1_scores) * 100 if pass1_scores else 0
-                passN_mean = statistics.mean(passN_scores) * 100 if passN_scores else 0
-                accuracy = statistics.mean(all_trial_scores) * 100 if all_trial_scores else 0
-                
-                stats[model][mode_name] = {
-                    'pass@1': pass1_mean,
-                    f'pass@{num_trials}': passN_mean,
-                    'accuracy': accuracy
-                }
-        
-        return stats
+            # Nothing to judge - failed generations go straight to persistence
+            cell['score'], cell['reasoning'], cell['tier'] = 0, 'API Error', TIER_ERROR
+            await persist_queue.put(cell)
+
+    async def judge_worker(self, executor, judge_queue, persist_queue):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            cell = await judge_queue.get()
+            if cell is None:
+                return
+
+            cell['score'], cell['reasoning'], cell['tier'] = await loop.run_in_executor(
+                executor, self.score_response, cell['test_case'], cell['response']
+            )
+            await persist_queue.put(cell)
+
+    async def persist_worker(self, persist_queue, records, num_trials, use_search=False):
+        """Single consumer: records are only touched from here, rows are queued for the result writer"""
+        loop = asyncio.get_running_loop()
+        mode_name = "WITH SEARCH" if use_search else "NO SEARCH"
+
+        while True:
+            cell = await persist_queue.get()
+            if cell is None:
+                return
+
+            test_case = cell['test_case']
+            model_name = cell['model_name']
+            response = cell['response']
+            score = cell['score']
+            reasoning = cell['reasoning']
+            latency = cell['latency']
+            throttle = cell['throttle']
+            tier = cell['tier']
+
+            row = {
+                'eval_id': cell['eval_id'],
+                'model_name': model_name,
+                'response': response,
+                'error': None,
+                'latency': latency,
+                'throttle': throttle,
+                'tier': tier,
+                'score': score,
+                'reasoning': reasoning
+            }
+            if not response:
+                row['error'] = cell['error'] if cell['error'] else "Unknown error"
+                response = f"ERROR: {row['error']}"
+
+            record = {
+                'question_id': test_case['id'],
+                'question': test_case['prompt'],
+                'expected_answer': test_case['expected_answer'],
+                'category': test_case.get('category', 'general'),
+                'model': model_name,
+                'mode': mode_name,
+                'trial': cell['trial'] + 1,
+                'response': response,
+                'score': score,
+                'reasoning': reasoning,
+                'latency': latency,
+                'tier': tier
+            }
+            records[cell['index']] = record
+
+            # Errored cells stay unfinished in the manifest, so --resume retries them
+            trial = (
+                self.run_id, mode_name, test_case['id'], model_name, cell['trial'] + 1,
+                'done' if cell['response'] else 'error'
+            )
+            event = dict(record, event='trial', response=cell['response'], error=row['error'], throttle=throttle)
+            if not self.writer.submit(row, trial, event, block=False):
+                # Writer is behind: wait for queue space off the event loop
+                await loop.run_in_executor(None, self.writer.submit, row, trial, event)
+
+            status = "✅" if score == 1 else "❌"
+            throttled = f", throttled {throttle:.1f}s" if throttle >= 0.1 else ""
+            cached = ", cached" if cell.get('cached') else ""
+            print(f"  {status} {test_case['id']} | {model_name:<18} | Trial {cell['trial']+1}/{num_trials} ({latency:.1f}s{throttled}{cached})")
     
-    def run_benchmark(self, eval_file='eval_set.json', num_trials=3, start_from_question=None, search_mode_only=False):
+    def calculate_stats(self, models, modes, num_trials):
+        return leaderboard_stats(self.logger, self.run_id, models, modes, num_trials)
+    
+    def run_benchmark(self, eval_file='eval_set.json', num_trials=3, start_from_question=None, search_mode_only=False, batch=False):
         with open(eval_file, 'r') as f:
             eval_data = json.load(f)
 
-        test_cases = eval_data['test_cases']
-        models = ["Claude Sonnet 4.5", "Claude Opus 4.5", "GPT-5.1", "GPT-5.2", "Gemini 3", "Gemini 3 Flash"]
+        models = list(self.registry.models)
+        modes = ["WITH SEARCH"] if search_mode_only else ["NO SEARCH", "WITH SEARCH"]
+        self.logger.create_run(self.run_id, eval_data.get('eval_name', 'benchmark'), eval_file, num_trials, models, modes)
 
         print("\n" + "="*70)
         print(f"BENCHMARK: {eval_data.get('eval_name', 'Unnamed')}")
         print(f"RUN ID: {self.run_id}")
         print("="*70)
-        print(f"Questions: {len(test_cases)}")
-        print(f"Models: {len(models)}")
-        print(f"Trials per model: {num_trials}")
+        print(f"Questions: {len(eval_data['test_cases'])}")
         if start_from_question:
             print(f"Starting from: {start_from_question}")
-        if search_mode_only:
+
+        return self.execute_run(eval_data, models, num_trials, modes, start_from_question, batch)
+
+    def resume_benchmark(self, run_id, batch=False):
+        """Re-run only the missing or errored cells of an earlier run, under its original run ID"""
+        run = self.logger.get_run(run_id)
+        if run is None:
+            print(f"❌ No run manifest for RUN_{run_id}")
+            return None
+
+        missing_models = [model for model in run['models'] if model not in self.registry.models]
+        if missing_models:
+            print(f"❌ Models no longer in the registry: {', '.join(missing_models)}")
+            return None
+
+        eval_data = {'test_cases': []}
+        if run['eval_file'] and os.path.exists(run['eval_file']):
+            with open(run['eval_file'], 'r') as f:
+                eval_data = json.load(f)
+        # Modes never reached are planned from the eval file under the run's original name
+        eval_data['eval_name'] = run['eval_name']
+
+        self.run_id = run_id
+        self.resuming = True
+
+        print("\n" + "="*70)
+        print(f"RESUMING BENCHMARK: {run['eval_name']}")
+        print(f"RUN ID: {self.run_id} (started {run['started_at']}, status {run['status']})")
+        print("="*70)
+        print(f"Unfinished trials: {self.logger.count_unfinished_trials(run_id)}")
+
+        return self.execute_run(eval_data, run['models'], run['num_trials'], run['modes'], batch=batch)
+
+    def execute_run(self, eval_data, models, num_trials, modes, start_from_question=None, batch=False):
+        # Every finished trial is appended to run_logs/<run_id>.jsonl before it reaches the database
+        self.event_log = EventLog(self.run_id)
+        self.writer.set_event_log(self.event_log)
+        self.event_log.append(dict(self.logger.get_run(self.run_id), event='run_resumed' if self.resuming else 'run_started'))
+
+        print(f"Models: {len(models)}")
+        print(f"Trials per model: {num_trials}")
+        providers = sorted({self.registry.models[name].provider for name in models} | {self.registry.judge.provider})
+        print(f"Concurrency: " + ", ".join(f"{provider}={self.registry.provider_concurrency()[provider]}" for provider in providers))
+        if modes == ["WITH SEARCH"]:
             print(f"Modes: With Search ONLY")
         else:
             print(f"Modes: No Search + With Search")
+        if batch:
+            batch_providers = sorted(p for p, adapter in self.adapters.items() if adapter.supports_batch)
+            print(f"Batch API (No Search): {', '.join(batch_providers) or 'none available'}")
+        if self.fast_path_requested:
+            self.fast_path = self.check_fast_path(self.scored_cases(eval_data, modes))
         print("="*70)
 
         results_no_search = {}
         results_with_search = {}
 
-        if not search_mode_only:
-            results_no_search = self.run_single_mode(eval_data, models, num_trials, use_search=False, start_from_question=start_from_question)
-
-        results_with_search = self.run_single_mode(eval_data, models, num_trials, use_search=True, start_from_question=start_from_question)
+        if "NO SEARCH" in modes:
+            results_no_search = self.run_single_mode(eval_data, models, num_trials, use_search=False, start_from_question=start_from_question, batch=batch)
+
+        if "WITH SEARCH" in modes:
+            results_with_search = self.run_single_mode(eval_data, models, num_trials, use_search=True, start_from_question=start_from_question)
+
+        self.writer.flush()
+        unfinished = self.logger.count_unfinished_trials(self.run_id)
+        self.logger.set_run_status(self.run_id, 'complete' if unfinished == 0 else 'incomplete')
+        # Commit the last partial batch now rather than on the flush timer
+        self.logger.flush()
+        self.event_log.append({
+            'event': 'run_finished',
+            'status': 'complete' if unfinished == 0 else 'incomplete',
+            'unfinished': unfinished
+        })
+        if unfinished:
+            print(f"\n⚠️  {unfinished} trials failed; retry them with --resume {self.run_id}")
         
-        stats = self.calculate_stats(results_no_search, results_with_search, num_trials)
+        stats = self.calculate_stats(models, modes, num_trials)
         self.display_results(stats, num_trials)
         self.export_all(eval_data.get('eval_name', 'benchmark'), stats, num_trials)
         
@@ -476,6 +719,41 @@ Score 1 if correct, 0 if incorrect."""
                 
                 print(f"{model:<20} {mode:<15} {acc:>6.1f}%      {pass1:>6.1f}%      {passN:>6.1f}%")
         
+        timeout_stats = self.timeout_executor.stats()
+        print(f"\n⌛ TIMEOUTS:")
+        print(f"   Calls abandoned after timeout: {timeout_stats['timeouts']}")
+        print(f"   Hung worker threads still running: {timeout_stats['hung_threads']} (pool size {timeout_stats['threads']}/{TIMEOUT_POOL_SIZE})")
+        
+        print(f"\n⏱️  RATE LIMITING:")
+        for provider, rate in self.rate_limiter.current_rates().items():
+            throttled = self.rate_limiter.throttle_events[provider]
+            print(f"   {provider:<10}: {throttled} rate-limit responses, settled at {rate:.2f} req/s")
+        
+        tiers = {}
+        for resp in self.all_responses:
+            if not resp.get('resumed'):
+                tiers[resp['tier']] = tiers.get(resp['tier'], 0) + 1
+        scored = sum(count for tier, count in tiers.items() if tier != TIER_ERROR)
+        if scored:
+            avoided = tiers.get(TIER_FAST_PATH, 0) + tiers.get(TIER_JUDGE_CACHE, 0)
+            print(f"\n🎯 SCORING TIERS (this session):")
+            for tier in (TIER_FAST_PATH, TIER_JUDGE_CACHE, TIER_JUDGE, TIER_ERROR):
+                print(f"   {tier:<12}: {tiers.get(tier, 0)}")
+            print(f"   Judge calls avoided: {avoided}/{scored} ({avoided / scored * 100:.1f}%)")
+        
+        writer_stats = self.writer.stats()
+        print(f"\n🗄️  RESULT WRITER:")
+        print(f"   {writer_stats['rows_written']} responses in {writer_stats['batches']} batches, "
+              f"peak queue depth {writer_stats['max_queue_depth']}/{writer_stats['queue_size']}")
+        if writer_stats['failed_rows']:
+            print(f"   ⚠️  {writer_stats['failed_rows']} responses failed to save")
+        
+        for label, cache in [("RESPONSE CACHE", self.response_cache), ("JUDGE CACHE", self.judge_cache)]:
+            if cache.enabled:
+                cache_stats = cache.stats()
+                print(f"\n💾 {label}:")
+                print(f"   {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['entries']} entries on disk)")
+        
         print("\n" + "="*70)
     
     def export_all(self, bench_name, stats, num_trials):
@@ -515,7 +793,8 @@ Score 1 if correct, 0 if incorrect."""
                 'Score (0/1)',
                 'Pass/Fail',
                 'Judge Reasoning',
-                'Latency (s)'
+                'Latency (s)',
+                'Scored By'
             ])
             
             for resp in self.all_responses:
@@ -531,14 +810,62 @@ Score 1 if correct, 0 if incorrect."""
                     resp['score'],
                     'PASS' if resp['score'] == 1 else 'FAIL',
                     resp['reasoning'],
-                    f"{resp['latency']:.2f}"
+                    f"{resp['latency']:.2f}",
+                    resp['tier']
                 ])
         
         print(f"📋 Detailed responses exported to: {detailed_file}")
+        
+        # Columnar copy for analysis scripts that only need scores (optional pyarrow)
+        if columnar.available():
+            parquet_file = f"results_detailed_{self.run_id}.parquet"
+            columnar.write_parquet(ResultsStore(logger=self.logger).iter_trials(run_ids=[self.run_id]), parquet_file)
+            print(f"🧱 Parquet copy exported to: {parquet_file}")
+        else:
+            print("⚠️  pyarrow is not installed; skipped the Parquet copy (pip install pyarrow)")
+        print(f"📝 Event log: {self.event_log.path}")
         print("\n" + "="*70)
         print(f"✅ All results exported with RUN_ID: {self.run_id}")
         print("="*70)
 
 if __name__ == "__main__":
-    runner = BenchmarkRunner()
-    runner.run_benchmark(num_trials=3)
+    parser = argparse.ArgumentParser(description="Run the TwinPeaks benchmark")
+    parser.add_argument('--eval-file', default='eval_set.json')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--batch', action='store_true',
+                        help="Generate the no-search half through the Anthropic/OpenAI batch APIs")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Re-run only the missing or errored trials of an earlier run")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Don't read or write the response and judge caches")
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help="Call every model and judge again and overwrite cached entries")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="Ignore cached responses older than this many hours")
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Evict least recently used responses beyond this many")
+    parser.add_argument('--no-fast-path', action='store_true',
+                        help="Send every response to the judge instead of scoring clear matches locally")
+    args = parser.parse_args()
+
+    response_cache = ResponseCache(
+        ttl=args.cache_ttl * 3600 if args.cache_ttl is not None else None,
+        max_entries=args.cache_max_entries,
+        enabled=not args.no_cache,
+        refresh=args.refresh_cache
+    )
+    judge_cache = JudgeCache(enabled=not args.no_cache, refresh=args.refresh_cache)
+    runner = BenchmarkRunner(response_cache=response_cache, judge_cache=judge_cache, fast_path=not args.no_fast_path)
+    try:
+        if args.resume:
+            runner.resume_benchmark(args.resume, batch=args.batch)
+        else:
+            runner.run_benchmark(eval_file=args.eval_file, num_trials=args.trials, batch=args.batch)
+    except KeyboardInterrupt:
+        # Everything already queued is still written, so --resume only redoes unfinished trials
+        print(f"\n⚠️  Interrupted; saving {runner.writer.depth()} queued responses...")
+        runner.writer.close()
+        runner.logger.set_run_status(runner.run_id, 'incomplete')
+        runner.logger.close()
+        print(f"   Resume with --resume {runner.run_id}")
+        sys.exit(130)
@@ -1,14 +1,12 @@
-import anthropic
-from google import generativeai as genai
 import json
-import os
 from datetime import datetime
 from dotenv import load_dotenv
 import time
 from eval_logger import EvalLogger
+from rate_limiter import AdaptiveRateLimiter
+from providers import load_registry, build_adapters
 import csv
-import sqlite3
-import statistics
+from run_full_benchmark import JUDGE_PROMPT, leaderboard_stats
 
 load_dotenv()
 
@@ -16,85 +14,34 @@ class GeminiBenchmark:
     def __init__(self):
         self.logger = EvalLogger()
         
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        google_key = os.getenv('GOOGLE_API_KEY')
-        
-        self.clients = {}
-        
-        if anthropic_key:
-            self.clients['anthropic'] = anthropic.Anthropic(api_key=anthropic_key)
-        if google_key:
-            genai.configure(api_key=google_key)
-            self.clients['google'] = True
-        
+        self.registry = load_registry()
+        self.rate_limiter = AdaptiveRateLimiter(self.registry.rate_limits())
+        self.adapters = build_adapters(self.registry, rate_limiter=self.rate_limiter, providers=['google', 'anthropic'])
         self.all_responses = []
         self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     def call_gemini(self, question):
-        """Call Gemini with retry logic for intermittent errors"""
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        
-        # Try up to 3 times to handle intermittent function call errors
-        for attempt in range(3):
-            try:
-                # Don't mention "search" - just ask the question directly
-                response = model.generate_content(question)
-                
-                # Check if we got text back
-                if hasattr(response, 'text') and response.text:
-                    return response.text, None
-                else:
-                    # No text - function call error likely
-                    if attempt < 2:  # Try again
-                        time.sleep(1)
-                        continue
-                    else:
-                        return None, "Gemini returned no text after 3 attempts"
-                        
-            except Exception as e:
-                error_msg = str(e)
-                
-                # If it's the function call error, try again
-                if "finish_reason" in error_msg or "FunctionCall" in error_msg:
-                    if attempt < 2:
-                        time.sleep(1)  # Brief pause before retry
-                        continue
-                    else:
-                        return None, f"Gemini function call error: {error_msg[:100]}"
-                else:
-                    # Other error - return immediately
-                    return None, error_msg
-        
-        return None, "Gemini: Max retries reached"
+        """Call Gemini; retries on function call errors come from the registry's retry policy"""
+        if 'google' not in self.adapters:
+            return None, "No google client configured"
+        # Don't mention "search" - just ask the question directly
+        return self.adapters['google'].generate(self.registry.models['Gemini 3'], question)
     
     def judge_response(self, question, expected_answer, response):
-        if 'anthropic' not in self.clients:
+        judge = self.registry.judge
+        if judge.provider not in self.adapters:
             return None, "No judge available"
         
-        judge_prompt = f"""You are evaluating an AI's answer to a question.
+        judge_prompt = JUDGE_PROMPT.format(question=question, expected_answer=expected_answer, response=response)
 
-QUESTION: {question}
-
-CORRECT ANSWER: {expected_answer}
-
-AI'S ANSWER:
-{response}
-
-Evaluate if the AI's answer is correct.
-
-Respond with ONLY a JSON object:
-{{"score": 0 or 1, "reasoning": "brief explanation"}}
-
-Score 1 if correct, 0 if incorrect."""
+        self.rate_limiter.acquire(judge.provider)
+        judge_text, error = self.adapters[judge.provider].generate(judge, judge_prompt)
+        if error:
+            return 0, error
+        self.rate_limiter.record_success(judge.provider)
 
         try:
-            judge_response = self.clients['anthropic'].messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                messages=[{"role": "user", "content": judge_prompt}]
-            )
-            
-            judge_text = judge_response.content[0].text.strip()
+            judge_text = judge_text.strip()
             
             if judge_text.startswith('```'):
                 judge_text = judge_text.split('```')[1]
@@ -124,54 +71,61 @@ Score 1 if correct, 0 if incorrect."""
         print(f"Total tests: {len(test_cases) * num_trials}")
         print("="*70)
         
+        # The run manifest: one evaluation row per question and the planned trials, up front
+        self.logger.create_run(self.run_id, eval_data.get('eval_name', 'benchmark'), eval_file, num_trials,
+                               ["Gemini 3"], ["NO SEARCH"])
+        eval_name = f"{eval_data.get('eval_name', 'benchmark')} (GEMINI NO SEARCH) - RUN_{self.run_id}"
+        eval_ids = {}
+        for test_case in test_cases:
+            eval_ids[test_case['id']] = self.logger.log_evaluation(
+                question=test_case['prompt'],
+                expected_answer=test_case['expected_answer'],
+                category=test_case.get('category', 'general'),
+                eval_name=eval_name
+            )
+        self.logger.plan_trials(self.run_id, "NO SEARCH", [
+            (test_case['id'], "Gemini 3", trial + 1, eval_ids[test_case['id']])
+            for test_case in test_cases
+            for trial in range(num_trials)
+        ])
+        
         results = {}
         
         for test_case in test_cases:
             test_id = test_case['id']
             question = test_case['prompt']
             expected = test_case['expected_answer']
+            eval_id = eval_ids[test_id]
             
             print(f"\n📝 Testing: {test_id}")
             print(f"Question: {question[:80]}...")
             print("-" * 70)
             
-            eval_name = f"{eval_data.get('eval_name', 'benchmark')} (GEMINI NO SEARCH) - RUN_{self.run_id}"
-            eval_id = self.logger.log_evaluation(
-                question=question,
-                expected_answer=expected,
-                category=test_case.get('category', 'general'),
-                eval_name=eval_name
-            )
-            
             model_results = []
             
             for trial in range(num_trials):
                 print(f"  Trial {trial+1}/{num_trials}...", end=" ", flush=True)
                 
+                throttle = self.rate_limiter.acquire('google')
                 start_time = time.time()
                 response, error = self.call_gemini(question)
                 latency = time.time() - start_time
                 
                 if response:
+                    self.rate_limiter.record_success('google')
                     score, reasoning = self.judge_response(question, expected, response)
                     
-                    self.logger.log_model_response(
+                    response_id = self.logger.log_model_response(
                         eval_id=eval_id,
                         model_name="Gemini 3",
                         response=response,
                         error=None,
-                        latency=latency
+                        latency=latency,
+                        throttle=throttle,
+                        score=score,
+                        reasoning=reasoning
                     )
-                    
-                    conn = sqlite3.connect('eval_history.db')
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        UPDATE model_responses 
-                        SET score = ?, reasoning = ?
-                        WHERE eval_id = ? AND model_name = ? AND response = ?
-                    ''', (score, reasoning, eval_id, "Gemini 3", response))
-                    conn.commit()
-                    conn.close()
+                    self.logger.complete_trial(self.run_id, "NO SEARCH", test_id, "Gemini 3", trial + 1, response_id, 'done')
                     
                     self.all_responses.append({
                         'question_id': test_id,
@@ -190,13 +144,15 @@ Score 1 if correct, 0 if incorrect."""
                     print(f"{status}")
                     
                 else:
-                    self.logger.log_model_response(
+                    response_id = self.logger.log_model_response(
                         eval_id=eval_id,
                         model_name="Gemini 3",
                         response=None,
                         error=error if error else "Unknown error",
-                        latency=latency
+                        latency=latency,
+                        throttle=throttle
                     )
+                    self.logger.complete_trial(self.run_id, "NO SEARCH", test_id, "Gemini 3", trial + 1, response_id, 'error')
                     
                     self.all_responses.append({
                         'question_id': test_id,
@@ -212,40 +168,34 @@ Score 1 if correct, 0 if incorrect."""
                     
                     print(f"❌")
                     model_results.append(0)
-                
-                time.sleep(0.5)
             
             results[test_id] = model_results
         
-        self.display_results(results, num_trials)
-        self.export_results(results, num_trials)
+        unfinished = self.logger.count_unfinished_trials(self.run_id)
+        self.logger.set_run_status(self.run_id, 'complete' if unfinished == 0 else 'incomplete')
+        # Commit the last partial batch now rather than on the flush timer
+        self.logger.flush()
+        metrics = self.calculate_stats(num_trials)
+        self.display_results(results, metrics, num_trials)
+        self.export_results(metrics, num_trials)
         
         return results
     
-    def display_results(self, results, num_trials):
+    def calculate_stats(self, num_trials):
+        """Accuracy, Pass@1 and Pass@N of the run, read from its aggregates"""
+        stats = leaderboard_stats(self.logger, self.run_id, ["Gemini 3"], ["NO SEARCH"], num_trials)
+        return stats.get("Gemini 3", {}).get("No Search", {'accuracy': 0, 'pass@1': 0, f'pass@{num_trials}': 0})
+    
+    def display_results(self, results, metrics, num_trials):
         print("\n\n" + "="*70)
         print("GEMINI 3 - RESULTS")
         print("="*70)
         
-        # Calculate overall metrics
-        all_pass1 = []
-        all_passN = []
-        all_scores = []
-        
-        for test_id, scores in results.items():
-            all_pass1.append(scores[0] if scores else 0)
-            all_passN.append(1 if any(scores) else 0)
-            all_scores.extend(scores)
-        
-        pass1 = statistics.mean(all_pass1) * 100 if all_pass1 else 0
-        passN = statistics.mean(all_passN) * 100 if all_passN else 0
-        accuracy = statistics.mean(all_scores) * 100 if all_scores else 0
-        
         print(f"\n📊 METRICS:")
         print("="*70)
-        print(f"Accuracy:  {accuracy:>6.1f}%")
-        print(f"Pass@1:    {pass1:>6.1f}%")
-        print(f"Pass@{num_trials}:    {passN:>6.1f}%")
+        print(f"Accuracy:  {metrics['accuracy']:>6.1f}%")
+        print(f"Pass@1:    {metrics['pass@1']:>6.1f}%")
+        print(f"Pass@{num_trials}:    {metrics[f'pass@{num_trials}']:>6.1f}%")
         print("="*70)
         
         print("\n📋 PER-QUESTION RESULTS:")
@@ -256,29 +206,17 @@ Score 1 if correct, 0 if incorrect."""
         
         print("\n" + "="*70)
     
-    def export_results(self, results, num_trials):
+    def export_results(self, metrics, num_trials):
         """Export results to CSV"""
         
         # Summary CSV
         summary_file = f"gemini_summary_{self.run_id}.csv"
         
-        all_pass1 = []
-        all_passN = []
-        all_scores = []
-        
-        for test_id, scores in results.items():
-            all_pass1.append(scores[0] if scores else 0)
-            all_passN.append(1 if any(scores) else 0)
-            all_scores.extend(scores)
-        
-        pass1 = statistics.mean(all_pass1) * 100 if all_pass1 else 0
-        passN = statistics.mean(all_passN) * 100 if all_passN else 0
-        accuracy = statistics.mean(all_scores) * 100 if all_scores else 0
-        
         with open(summary_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Model', 'Mode', 'Accuracy (%)', 'Pass@1 (%)', f'Pass@{num_trials} (%)'])
-            writer.writerow(['Gemini 3', 'No Search', f"{accuracy:.1f}", f"{pass1:.1f}", f"{passN:.1f}"])
+            writer.writerow(['Gemini 3', 'No Search', f"{metrics['accuracy']:.1f}", f"{metrics['pass@1']:.1f}",
+                             f"{metrics[f'pass@{num_trials}']:.1f}"])
         
         print(f"\n📊 Summary exported to: {summary_file}")
         
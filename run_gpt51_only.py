@@ -1,15 +1,12 @@
-import anthropic
-import openai
-from google import generativeai as genai
 import json
-import os
 from datetime import datetime
 from dotenv import load_dotenv
 import time
 from eval_logger import EvalLogger
+from rate_limiter import AdaptiveRateLimiter
+from providers import load_registry, build_adapters, generate
 import csv
-import sqlite3
-import statistics
+from run_full_benchmark import JUDGE_PROMPT, leaderboard_stats
 
 load_dotenv()
 
@@ -17,97 +14,30 @@ class BenchmarkRunner:
     def __init__(self):
         self.logger = EvalLogger()
 
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        openai_key = os.getenv('OPENAI_API_KEY')
-
-        self.clients = {}
-
-        if anthropic_key:
-            self.clients['anthropic'] = anthropic.Anthropic(api_key=anthropic_key)
-        if openai_key:
-            self.clients['openai'] = openai.OpenAI(api_key=openai_key)
-
+        self.registry = load_registry()
+        self.rate_limiter = AdaptiveRateLimiter(self.registry.rate_limits())
+        self.adapters = build_adapters(self.registry, rate_limiter=self.rate_limiter, providers=['openai', 'anthropic'])
         self.all_responses = []
         self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
 
     def call_model(self, model_name, question, use_search=False):
-        try:
-            if model_name == "GPT-5.1":
-                # Try up to 5 times to handle intermittent errors
-                max_retries = 5
-                for attempt in range(max_retries):
-                    try:
-                        response = self.clients['openai'].chat.completions.create(
-                            model="gpt-5.1",
-                            messages=[{"role": "user", "content": question}],
-                            max_completion_tokens=500
-                        )
-                        return response.choices[0].message.content, None
-
-                    except Exception as e:
-                        error_msg = str(e)
-
-                        # Check for retryable errors
-                        retryable_errors = [
-                            "504",
-                            "503",
-                            "429",  # Rate limit
-                            "500",  # Internal server error
-                            "timeout",
-                            "Timeout",
-                            "RESOURCE_EXHAUSTED",
-                            "UNAVAILABLE"
-                        ]
-
-                        is_retryable = any(err in error_msg for err in retryable_errors)
-
-                        if is_retryable and attempt < max_retries - 1:
-                            wait_time = 2 ** attempt  # Exponential backoff
-                            print(f" ({error_msg[:50]}... retry {attempt+1}/{max_retries} after {wait_time}s)...", end="", flush=True)
-                            time.sleep(wait_time)
-                            continue
-                        else:
-                            # Not retryable or max retries reached
-                            if attempt == max_retries - 1:
-                                return None, f"GPT-5.1 error after {max_retries} retries: {error_msg[:200]}"
-                            else:
-                                return None, f"GPT-5.1 non-retryable error: {error_msg[:200]}"
-
-                return None, "GPT-5.1: Max retries reached"
-
-        except Exception as e:
-            return None, str(e)
-
-        return None, "Unknown model"
+        return generate(self.registry, self.adapters, model_name, question, use_search=use_search)
 
     def judge_response(self, question, expected_answer, response):
-        if 'anthropic' not in self.clients:
+        judge = self.registry.judge
+        if judge.provider not in self.adapters:
             return None, "No judge available"
 
-        judge_prompt = f"""You are evaluating an AI's answer to a question.
-
-QUESTION: {question}
+        judge_prompt = JUDGE_PROMPT.format(question=question, expected_answer=expected_answer, response=response)
 
-CORRECT ANSWER: {expected_answer}
-
-AI'S ANSWER:
-{response}
-
-Evaluate if the AI's answer is correct.
-
-Respond with ONLY a JSON object:
-{{"score": 0 or 1, "reasoning": "brief explanation"}}
-
-Score 1 if correct, 0 if incorrect."""
+        self.rate_limiter.acquire(judge.provider)
+        judge_text, error = self.adapters[judge.provider].generate(judge, judge_prompt)
+        if error:
+            return 0, error
+        self.rate_limiter.record_success(judge.provider)
 
         try:
-            judge_response = self.clients['anthropic'].messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                messages=[{"role": "user", "content": judge_prompt}]
-            )
-
-            judge_text = judge_response.content[0].text.strip()
+            judge_text = judge_text.strip()
 
             if judge_text.startswith('```'):
                 judge_text = judge_text.split('```')[1]
@@ -129,25 +59,35 @@ Score 1 if correct, 0 if incorrect."""
         print(f"MODE: {mode_name}")
         print(f"{'='*70}\n")
 
+        # One evaluation row per question and the planned trials, recorded up front as the run manifest
+        eval_name = f"{eval_data.get('eval_name', 'benchmark')} ({mode_name}) - RUN_{self.run_id}"
+        eval_ids = {}
+        for test_case in test_cases:
+            eval_ids[test_case['id']] = self.logger.log_evaluation(
+                question=test_case['prompt'],
+                expected_answer=test_case['expected_answer'],
+                category=test_case.get('category', 'general'),
+                eval_name=eval_name
+            )
+        self.logger.plan_trials(self.run_id, mode_name, [
+            (test_case['id'], model_name, trial + 1, eval_ids[test_case['id']])
+            for test_case in test_cases
+            for model_name in models
+            for trial in range(num_trials)
+        ])
+
         results = {}
 
         for test_case in test_cases:
             test_id = test_case['id']
             question = test_case['prompt']
             expected = test_case['expected_answer']
+            eval_id = eval_ids[test_id]
 
             print(f"\n📝 Testing: {test_id}")
             print(f"Question: {question[:80]}...")
             print("-" * 70)
 
-            eval_name = f"{eval_data.get('eval_name', 'benchmark')} ({mode_name}) - RUN_{self.run_id}"
-            eval_id = self.logger.log_evaluation(
-                question=question,
-                expected_answer=expected,
-                category=test_case.get('category', 'general'),
-                eval_name=eval_name
-            )
-
             results[test_id] = {}
 
             for model_name in models:
@@ -157,30 +97,26 @@ Score 1 if correct, 0 if incorrect."""
                 for trial in range(num_trials):
                     print(f"    Trial {trial+1}/{num_trials}...", end=" ", flush=True)
 
+                    throttle = self.rate_limiter.acquire('openai')
                     start_time = time.time()
                     response, error = self.call_model(model_name, question, use_search=use_search)
                     latency = time.time() - start_time
 
                     if response:
+                        self.rate_limiter.record_success('openai')
                         score, reasoning = self.judge_response(question, expected, response)
 
-                        self.logger.log_model_response(
+                        response_id = self.logger.log_model_response(
                             eval_id=eval_id,
                             model_name=model_name,
                             response=response,
                             error=None,
-                            latency=latency
+                            latency=latency,
+                            throttle=throttle,
+                            score=score,
+                            reasoning=reasoning
                         )
-
-                        conn = sqlite3.connect('eval_history.db')
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            UPDATE model_responses
-                            SET score = ?, reasoning = ?
-                            WHERE eval_id = ? AND model_name = ? AND response = ?
-                        ''', (score, reasoning, eval_id, model_name, response))
-                        conn.commit()
-                        conn.close()
+                        self.logger.complete_trial(self.run_id, mode_name, test_id, model_name, trial + 1, response_id, 'done')
 
                         self.all_responses.append({
                             'question_id': test_id,
@@ -201,13 +137,15 @@ Score 1 if correct, 0 if incorrect."""
                         print(f"{status}")
 
                     else:
-                        self.logger.log_model_response(
+                        response_id = self.logger.log_model_response(
                             eval_id=eval_id,
                             model_name=model_name,
                             response=None,
                             error=error if error else "Unknown error",
-                            latency=latency
+                            latency=latency,
+                            throttle=throttle
                         )
+                        self.logger.complete_trial(self.run_id, mode_name, test_id, model_name, trial + 1, response_id, 'error')
 
                         self.all_responses.append({
                             'question_id': test_id,
@@ -226,45 +164,10 @@ Score 1 if correct, 0 if incorrect."""
                         print(f"❌")
                         model_results.append(0)
 
-                    time.sleep(0.5)
-
                 results[test_id][model_name] = model_results
 
         return results
 
-    def calculate_stats(self, results_no_search, results_with_search, num_trials):
-        """Calculate Pass@1, Pass@5, and Accuracy"""
-
-        stats = {}
-        models = list(next(iter(results_no_search.values())).keys())
-
-        for model in models:
-            stats[model] = {}
-
-            for mode_name, results in [("No Search", results_no_search), ("With Search", results_with_search)]:
-                pass1_scores = []
-                passN_scores = []
-                all_trial_scores = []
-
-                for test_id, test_results in results.items():
-                    scores = test_results[model]
-
-                    pass1_scores.append(scores[0] if scores else 0)
-                    passN_scores.append(1 if any(scores) else 0)
-                    all_trial_scores.extend(scores)
-
-                pass1_mean = statistics.mean(pass1_scores) * 100 if pass1_scores else 0
-                passN_mean = statistics.mean(passN_scores) * 100 if passN_scores else 0
-                accuracy = statistics.mean(all_trial_scores) * 100 if all_trial_scores else 0
-
-                stats[model][mode_name] = {
-                    'pass@1': pass1_mean,
-                    f'pass@{num_trials}': passN_mean,
-                    'accuracy': accuracy
-                }
-
-        return stats
-
     def run_benchmark(self, eval_file='eval_set.json', num_trials=3):
         with open(eval_file, 'r') as f:
             eval_data = json.load(f)
@@ -283,10 +186,16 @@ Score 1 if correct, 0 if incorrect."""
         print(f"Total tests: {len(test_cases) * len(models) * num_trials * 2}")
         print("="*70)
 
+        self.logger.create_run(self.run_id, eval_data.get('eval_name', 'benchmark'), eval_file, num_trials,
+                               models, ["NO SEARCH", "WITH SEARCH"])
         results_no_search = self.run_single_mode(eval_data, models, num_trials, use_search=False)
         results_with_search = self.run_single_mode(eval_data, models, num_trials, use_search=True)
+        unfinished = self.logger.count_unfinished_trials(self.run_id)
+        self.logger.set_run_status(self.run_id, 'complete' if unfinished == 0 else 'incomplete')
+        # Commit the last partial batch now rather than on the flush timer
+        self.logger.flush()
 
-        stats = self.calculate_stats(results_no_search, results_with_search, num_trials)
+        stats = leaderboard_stats(self.logger, self.run_id, models, ["NO SEARCH", "WITH SEARCH"], num_trials)
         self.display_results(stats, num_trials)
         self.export_all(eval_data.get('eval_name', 'benchmark'), stats, num_trials)
 
@@ -0,0 +1,238 @@
+"""
+Tiered scoring: cheap deterministic checks first, the LLM judge last.
+
+The fast path only ever accepts confident positives. A response is scored 1
+locally when the answer it commits to (its first bolded phrase that doesn't
+echo the question, or else its first sentence) contains the expected answer
+or one of the test case's aliases as a whole phrase after normalization.
+The match must not be negated or hedged, and long responses are left to the
+judge, which also marks down wrong claims made around a correct answer.
+Single-word and generic answers ("fake", "Who is Judy?") never take the
+fast path. Everything else goes to the judge, so a miss here never turns a
+correct answer into a 0.
+
+Before the tier is trusted it is replayed against judged history:
+
+    python scoring.py twinpeaks_v1_detailed_results.csv
+
+lists every response the fast path would accept that the judge scored 0.
+The runner does the same for each run's eval set, over the v1 results plus
+the judge's verdicts in the eval history database, and only turns the tier
+on when every question it could match has history with the same expected
+answers (untested_answers) and none of that history disagrees. The v1
+results are also what the thresholds below were tuned on, so it's the
+verdicts judged since then that actually test them.
+
+Aliases come from the test case's rubric.acceptable_variations, an optional
+"aliases" list, or evaluation_criteria.acceptable_answers (the LLMEvaluator
+format).
+"""
+import csv
+import json
+import re
+import sys
+import unicodedata
+
+# Which tier decided a row's score (model_responses.score_tier)
+TIER_FAST_PATH = 'fast_path'
+TIER_JUDGE_CACHE = 'judge_cache'
+TIER_JUDGE = 'judge'
+TIER_ERROR = 'error'
+
+# Shorter answers ("red", "fake") appear inside too many unrelated answers to trust a match
+MIN_MATCH_LENGTH = 8
+
+# Answers with fewer words left after dropping these ("who is judy") are too generic
+MIN_CONTENT_WORDS = 2
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'in', 'on', 'at', 'to', 'for', 'from', 'by', 'with', 'and', 'or',
+    'is', 'are', 'was', 'were', 'be', 'it', 'who', 'what', 'which', 'where', 'when', 'how', 'why',
+    'he', 'she', 'they', 'his', 'her', 'their', 'this', 'that',
+}
+
+# Longer responses go to the judge: they add claims the fast path can't check, and the
+# judge fails a correct answer surrounded by wrong ones (q023 in the v1 results)
+MAX_RESPONSE_WORDS = 120
+
+# Judged history the fast path is replayed against (python scoring.py)
+HISTORY_FILE = 'twinpeaks_v1_detailed_results.csv'
+HISTORY_EVAL_FILE = 'eval_set_v1.json'
+
+BOLD_SPAN = re.compile(r"\*\*(.+?)\*\*", re.DOTALL)
+SENTENCE_END = re.compile(r"[.!?](?:\s|$)|\n")
+
+# A match preceded by one of these (within NEGATION_WINDOW words) is escalated
+NEGATION_WORDS = {
+    'not', 'no', 'never', 'nor', 'neither', 'isn', 'wasn', 'aren', 'weren',
+    'doesn', 'didn', 'instead', 'rather', 'unlike', 'except',
+}
+NEGATION_WINDOW = 4
+
+# Responses containing any of these are escalated however well they match
+HEDGE_PHRASES = [
+    'not sure', 'not certain', 'unclear', 'uncertain', 'i don t know',
+    'cannot confirm', 'can t confirm', 'unable to confirm', 'cannot verify', 'can t verify',
+]
+
+LEADING_ARTICLES = ('the ', 'a ', 'an ')
+
+
+def normalize_text(text):
+    """Lowercase, drop accents, possessives and punctuation, collapse whitespace"""
+    text = re.sub(r"['’]s\b", "", text)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return ' '.join(text.split())
+
+
+def answer_variants(test_case):
+    """Normalized phrases that count as the expected answer"""
+    expected = test_case.get('expected_answer') or ''
+    criteria = test_case.get('evaluation_criteria', {})
+    rubric = test_case.get('rubric', {})
+    candidates = [expected, re.sub(r"\([^)]*\)", " ", expected)]
+    candidates += rubric.get('acceptable_variations', [])
+    candidates += test_case.get('aliases', [])
+    candidates += criteria.get('acceptable_answers', [])
+
+    variants = []
+    for candidate in candidates:
+        phrase = normalize_text(candidate)
+        for article in LEADING_ARTICLES:
+            if phrase.startswith(article):
+                phrase = phrase[len(article):]
+        if is_specific(phrase) and phrase not in variants:
+            variants.append(phrase)
+    return variants
+
+
+def is_specific(phrase):
+    """Whether a normalized answer is distinctive enough to match on its own"""
+    content = [word for word in phrase.split() if word not in STOP_WORDS]
+    return len(phrase) >= MIN_MATCH_LENGTH and len(content) >= MIN_CONTENT_WORDS
+
+
+def answer_span(response, question=''):
+    """Normalized text of what the response commits to as its answer.
+
+    That's the first bolded phrase that doesn't just repeat part of the
+    question (the show's name, say), or the first sentence if none is bold.
+    """
+    padded_question = f" {normalize_text(question)} "
+    for match in BOLD_SPAN.finditer(response):
+        span = normalize_text(match.group(1))
+        if span and f" {span} " not in padded_question:
+            return span
+    return normalize_text(first_sentence(response))
+
+
+def first_sentence(response):
+    return SENTENCE_END.split(response.strip(), 1)[0]
+
+
+def find_phrase(words, phrase_words):
+    """Start indices of phrase_words as a contiguous run in words"""
+    size = len(phrase_words)
+    return [i for i in range(len(words) - size + 1) if words[i:i + size] == phrase_words]
+
+
+def fast_path_score(response, test_case):
+    """Returns (1, reasoning) for a confident local match, or None to escalate to the judge"""
+    if not response:
+        return None
+
+    normalized = normalize_text(response)
+    words = normalized.split()
+    if len(words) > MAX_RESPONSE_WORDS:
+        return None
+
+    padded = f" {normalized} "
+    if any(f" {hedge} " in padded for hedge in HEDGE_PHRASES):
+        return None
+
+    # Only the committed answer counts; a match elsewhere may be a quote or an alternative
+    span = f" {answer_span(response, test_case.get('prompt', ''))} "
+    opening = f" {normalize_text(first_sentence(response))} "
+    for variant in answer_variants(test_case):
+        if f" {variant} " not in span:
+            continue
+        starts = find_phrase(words, variant.split())
+        negated = any(
+            NEGATION_WORDS.intersection(words[max(0, start - NEGATION_WINDOW):start])
+            for start in starts
+        )
+        if negated:
+            # The answer is mentioned, but possibly as the wrong one
+            return None
+        if NEGATION_WORDS.intersection(opening.replace(f" {variant} ", " ").split()):
+            # The answer comes with a correction or caveat ("..., not the one you mean")
+            return None
+        return 1, f"Fast path: response answers with expected answer \"{variant}\""
+
+    # Responses committing to something else go to the judge
+    return None
+
+
+def history_case(row, test_cases):
+    """The test case a judged row was scored against: its logged question and
+    expected answer, with any aliases the same question has in test_cases"""
+    test_case = dict(test_cases.get(row['question_id'], {}))
+    test_case.update(id=row['question_id'], prompt=row['question'], expected_answer=row['expected_answer'])
+    return test_case
+
+
+def load_history(csv_path=HISTORY_FILE, eval_file=HISTORY_EVAL_FILE):
+    """Judged rows of a detailed results CSV, each with its test case (aliases from eval_file)"""
+    test_cases = {}
+    try:
+        with open(eval_file, 'r') as f:
+            test_cases = {case['id']: case for case in json.load(f)['test_cases']}
+    except FileNotFoundError:
+        pass
+
+    with open(csv_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            if row['score'] not in ('0', '1'):
+                continue
+            yield row, history_case(row, test_cases)
+
+
+def untested_answers(test_cases, history):
+    """IDs of test cases the fast path could match whose answers no judged row was scored against"""
+    tested = {}
+    for row, test_case in history:
+        tested.setdefault(row['question_id'], set()).add(tuple(answer_variants(test_case)))
+
+    untested = []
+    for test_case in test_cases:
+        variants = tuple(answer_variants(test_case))
+        # Questions with no specific answer never take the fast path, so they need no history
+        if variants and variants not in tested.get(test_case['id'], ()):
+            untested.append(test_case['id'])
+    return untested
+
+
+def fast_path_regressions(history=None):
+    """(accepted, disagreements): rows the fast path would score 1, and those the judge scored 0.
+
+    history is (row, test_case) pairs as load_history() yields them; the v1 results by default.
+    """
+    accepted = 0
+    disagreements = []
+    for row, test_case in (history if history is not None else load_history()):
+        if fast_path_score(row['response'], test_case) is None:
+            continue
+        accepted += 1
+        if str(row['score']) == '0':
+            disagreements.append(row)
+    return accepted, disagreements
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else HISTORY_FILE
+    accepted, disagreements = fast_path_regressions(load_history(csv_path))
+    print(f"Fast path would accept {accepted} judged responses; {len(disagreements)} of them were scored 0")
+    for row in disagreements:
+        print(f"  ❌ {row['question_id']} {row['model']} ({row['mode']}, trial {row['trial']}): "
+              f"expected \"{row['expected_answer']}\"")
+    sys.exit(1 if disagreements else 0)
@@ -0,0 +1,47 @@
+"""
+Full-text search over model responses and judge reasoning.
+
+Every response is indexed in the response_search FTS5 table, which
+EvalLogger keeps in sync with model_responses through triggers. Queries use
+FTS5 syntax: words are AND'ed, "double quotes" match a phrase, OR/NOT and
+prefix* work, and `reasoning: cobra` searches one column only. Words are
+stemmed, so "owl" also finds "owls".
+
+    search_responses(logger.conn, 'cobra kai', modes=["WITH SEARCH"])
+
+The index holds its own copy of the text, so any connection to the database
+works, EvalLogger's or a plain sqlite3 one. The run/model/mode filters are
+the ones compute_stats() takes.
+"""
+from stats import build_filter
+
+# Tokens of context on each side of a match in a snippet
+SNIPPET_TOKENS = 12
+
+
+def search_responses(conn, query, run_ids=None, models=None, modes=None, limit=20):
+    """Best-matching responses first, one dict each with highlighted [snippets].
+
+    Responses that belong to no run (manual tests) have run_id, mode,
+    question_id and trial set to None, and are left out once a filter is given.
+    """
+    where, params = build_filter(run_ids, models, modes)
+    where = f"{where} AND" if where else 'WHERE'
+
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT r.id AS response_id, c.run_id, c.mode, c.question_id, r.model_name, t.trial,
+               r.score, r.error,
+               snippet(response_search, 0, '[', ']', '…', {SNIPPET_TOKENS}) AS response_snippet,
+               snippet(response_search, 1, '[', ']', '…', {SNIPPET_TOKENS}) AS reasoning_snippet
+        FROM response_search
+        JOIN model_responses r ON r.id = response_search.rowid
+        LEFT JOIN trials t ON t.response_id = r.id
+        LEFT JOIN cells c ON c.id = t.cell_id
+        {where} response_search MATCH ?
+        ORDER BY response_search.rank
+        LIMIT ?
+    ''', params + [query, limit])
+
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
@@ -0,0 +1,151 @@
+"""
+Benchmark statistics computed inside SQLite.
+
+compute_stats() returns pass@1, pass@k, accuracy, error rate and latency
+percentiles per (model, mode), or per (run, model, mode) with by_run=True.
+It works from the run manifest (cells -> trials -> model_responses) with
+window functions and GROUP BY, so memory stays flat however many runs the
+history holds. Only finished trials count, and errors count as failures,
+the same as in the runner's results:
+
+- pass@1: share of questions whose first finished trial (lowest trial
+  number with a response) scored 1; EvalLogger.get_leaderboard reads the
+  same definition from the aggregates table
+- pass@k: share of questions with at least one trial scoring 1
+- accuracy: share of all trials scoring 1
+
+Filters (all optional, combined with AND):
+
+    compute_stats(logger.conn, run_ids=["20260104_130836"], modes=["WITH SEARCH"])
+
+`slices` picks (run_id, mode, excluded question IDs) combinations
+instead; they are OR'ed together. `cells` is (sql, params) for a query
+selecting cell ids, such as the one results_store.spec_cells() builds to
+splice several runs into one result set.
+"""
+
+# Nearest-rank latency percentiles reported for every group
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def _in_clause(column, values, params):
+    params.extend(values)
+    return f"{column} IN ({', '.join('?' for _ in values)})"
+
+
+def build_filter(run_ids=None, models=None, modes=None, slices=None, cells=None):
+    """WHERE clause (over cells c) and its parameters"""
+    clauses = []
+    params = []
+    if run_ids:
+        clauses.append(_in_clause('c.run_id', run_ids, params))
+    if models:
+        clauses.append(_in_clause('c.model_name', models, params))
+    if modes:
+        clauses.append(_in_clause('c.mode', modes, params))
+    if slices:
+        alternatives = []
+        for run_id, mode, excluded in slices:
+            alternative = 'c.run_id = ? AND c.mode = ?'
+            params.extend([run_id, mode])
+            if excluded:
+                alternative += ' AND NOT ' + _in_clause('c.question_id', excluded, params)
+            alternatives.append(f"({alternative})")
+        clauses.append(f"({' OR '.join(alternatives)})")
+    if cells:
+        cells_sql, cells_params = cells
+        clauses.append(f"c.id IN ({cells_sql})")
+        params.extend(cells_params)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    return where, params
+
+
+def compute_stats(conn, run_ids=None, models=None, modes=None, slices=None, cells=None, by_run=False):
+    """One dict per group, ordered by (run_id,) model_name, mode"""
+    where, params = build_filter(run_ids, models, modes, slices, cells)
+    group = 'run_id, model_name, mode' if by_run else 'model_name, mode'
+    percentiles = ',\n'.join(
+        f"MIN(CASE WHEN latency_rank * 100 >= latency_count * {p} THEN latency END) AS latency_p{p}"
+        for p in LATENCY_PERCENTILES
+    )
+
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        WITH scored AS (
+            SELECT c.run_id, c.model_name, c.mode, c.question_id,
+                   COALESCE(r.score, 0) = 1 AS success,
+                   r.error IS NOT NULL AS is_error,
+                   r.latency_seconds AS latency,
+                   ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY t.trial) AS attempt
+            FROM cells c
+            JOIN trials t ON t.cell_id = c.id
+            JOIN model_responses r ON r.id = t.response_id
+            {where}
+        ),
+        per_question AS (
+            SELECT run_id, model_name, mode, question_id,
+                   MAX(CASE WHEN attempt = 1 THEN success END) AS first_success,
+                   MAX(success) AS solved
+            FROM scored
+            GROUP BY run_id, model_name, mode, question_id
+        ),
+        ranked_latency AS (
+            SELECT {group}, latency,
+                   ROW_NUMBER() OVER (PARTITION BY {group} ORDER BY latency) AS latency_rank,
+                   COUNT(*) OVER (PARTITION BY {group}) AS latency_count
+            FROM scored
+            WHERE latency IS NOT NULL
+        )
+        SELECT *
+        FROM (
+            SELECT {group},
+                   COUNT(*) AS trials,
+                   SUM(success) AS successes,
+                   SUM(is_error) AS errors,
+                   AVG(success) * 100 AS accuracy,
+                   AVG(is_error) * 100 AS error_rate,
+                   AVG(latency) AS latency_mean
+            FROM scored
+            GROUP BY {group}
+        )
+        JOIN (
+            SELECT {group},
+                   COUNT(*) AS questions,
+                   AVG(first_success) * 100 AS pass_at_1,
+                   AVG(solved) * 100 AS pass_at_k
+            FROM per_question
+            GROUP BY {group}
+        ) USING ({group})
+        LEFT JOIN (
+            SELECT {group},
+                   {percentiles}
+            FROM ranked_latency
+            GROUP BY {group}
+        ) USING ({group})
+        ORDER BY {group}
+    ''', params)
+
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+def format_table(rows, num_trials=None):
+    """Plain-text table of compute_stats rows"""
+    k = f"Pass@{num_trials}" if num_trials else "Pass@k"
+    by_run = bool(rows) and 'run_id' in rows[0]
+    header = f"{'Run':<17} " if by_run else ''
+    header += (f"{'Model':<20} {'Mode':<12} {'Qs':>4} {'Trials':>6} {'Pass@1':>7} {k:>7} "
+               f"{'Acc':>7} {'Err':>6} {'p50 s':>6} {'p90 s':>6}")
+    lines = [header, "-" * len(header)]
+
+    for row in rows:
+        line = f"{row['run_id']:<17} " if by_run else ''
+        p50 = f"{row['latency_p50']:.1f}" if row['latency_p50'] is not None else "-"
+        p90 = f"{row['latency_p90']:.1f}" if row['latency_p90'] is not None else "-"
+        line += (f"{row['model_name']:<20} {row['mode']:<12} {row['questions']:>4} {row['trials']:>6} "
+                 f"{row['pass_at_1']:>6.1f}% {row['pass_at_k']:>6.1f}% {row['accuracy']:>6.1f}% "
+                 f"{row['error_rate']:>5.1f}% {p50:>6} {p90:>6}")
+        lines.append(line)
+
+    return '\n'.join(lines)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSONL event log and its replay (event_log.py)
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+
+from eval_logger import EvalLogger
+from event_log import EventLog, read_events, best_trials, ingest_into_db, export_csv
+
+RUN_ID = "20260101_120000"
+
+
+def check(label, passed):
+    print(f"  {'✓' if passed else '✗'} {label}")
+    return passed
+
+
+def trial_event(question_id, model, trial, response=None, score=None, error=None):
+    return {
+        'event': 'trial', 'mode': 'NO SEARCH', 'question_id': question_id, 'model': model, 'trial': trial,
+        'question': f"Question {question_id}?", 'expected_answer': "Answer", 'category': 'general',
+        'response': response, 'error': error, 'latency': 1.5, 'tier': 'judge' if response else 'error',
+        'score': score, 'reasoning': "Test" if response else None
+    }
+
+
+def write_log(log_dir):
+    """A run that crashed mid-append: two questions, one trial retried after an error"""
+    log = EventLog(RUN_ID, log_dir=log_dir)
+    log.append({'event': 'run_started', 'eval_name': 'test', 'eval_file': 'eval_set.json',
+                'num_trials': 2, 'models': ["Model A"], 'modes': ['NO SEARCH']})
+    log.append_many([
+        trial_event('q001', "Model A", 1, response="Answer", score=1),
+        trial_event('q001', "Model A", 2, error="Timeout"),
+        trial_event('q002', "Model A", 1, response="Wrong", score=0),
+        trial_event('q002', "Model A", 2, error="Timeout"),
+    ])
+    log.append(trial_event('q001', "Model A", 2, response="Answer again", score=1))
+    log.close()
+
+    with open(log.path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "trial", "run_id": "2026')
+    return log.path
+
+
+def test_read_events():
+    """Torn last lines are skipped, and the next append starts a fresh line"""
+    print("Testing log reading...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = write_log(work_dir)
+        events = read_events(path)
+        trials = best_trials(events)
+        retried = trials.get((RUN_ID, 'NO SEARCH', 'q001', "Model A", 2), {})
+
+        log = EventLog(RUN_ID, log_dir=work_dir)
+        log.append(trial_event('q002', "Model A", 3, error="Timeout"))
+        log.close()
+        reopened = read_events(path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = [
+        check("torn line skipped", len(events) == 6),
+        check("every event carries the run id", all(event['run_id'] == RUN_ID for event in events)),
+        check("one entry per trial", len(trials) == 4),
+        check("retry success replaces the error", retried.get('response') == "Answer again"),
+        check("append after a torn line is readable", len(reopened) == 7 and reopened[-1]['trial'] == 3),
+    ]
+
+    if not all(results):
+        print("\n❌ Log reading is wrong\n")
+        return False
+    print("\n✅ Log reading works\n")
+    return True
+
+
+def test_ingest():
+    """Replaying into the database rebuilds the run, and replaying again changes nothing"""
+    print("Testing database replay...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = write_log(work_dir)
+        with EvalLogger(os.path.join(work_dir, "eval_history.db")) as logger:
+            written, skipped = ingest_into_db([path], logger)
+            again = ingest_into_db([path], logger)
+            run = logger.get_run(RUN_ID)
+            rows = {(row['question_id'], row['trial']): row for row in logger.get_run_trials(RUN_ID, 'NO SEARCH')}
+            leaderboard = logger.get_leaderboard(RUN_ID)
+            responses = logger.conn.execute('SELECT COUNT(*) FROM model_responses').fetchone()[0]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = [
+        check("all trials written", written == 4 and skipped == 0),
+        check("replay again is a no-op", again == (0, 4)),
+        check("run created from its header", run is not None and run['eval_name'] == 'test' and run['num_trials'] == 2),
+        check("run without run_finished is incomplete", run is not None and run['status'] == 'incomplete'),
+        check("retried trial is done", rows.get(('q001', 2), {}).get('response') == "Answer again"),
+        check("errored trial stays an error", rows.get(('q002', 2), {}).get('status') == 'error'),
+        check("one response row per trial", responses == 4),
+        check("aggregates see the replayed scores",
+              len(leaderboard) == 1 and leaderboard[0]['successes'] == 2 and leaderboard[0]['errors'] == 1),
+    ]
+
+    if not all(results):
+        print("\n❌ Database replay is wrong\n")
+        return False
+    print("\n✅ Database replay works\n")
+    return True
+
+
+def test_export_csv():
+    """CSV export writes one row per trial, with errors marked FAIL"""
+    print("Testing CSV export...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(work_dir, "recovered.csv")
+        count = export_csv([write_log(work_dir)], csv_path)
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            rows = {(row['Question ID'], row['Trial']): row for row in csv.DictReader(f)}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = [
+        check("one row per trial", count == 4 and len(rows) == 4),
+        check("passing trial", rows.get(('q001', '1'), {}).get('Pass/Fail') == 'PASS'),
+        check("errored trial", rows.get(('q002', '2'), {}).get('Model Response') == "ERROR: Timeout"
+              and rows.get(('q002', '2'), {}).get('Pass/Fail') == 'FAIL'),
+    ]
+
+    if not all(results):
+        print("\n❌ CSV export is wrong\n")
+        return False
+    print("\n✅ CSV export works\n")
+    return True
+
+
+def main():
+    print("\n" + "="*60)
+    print("Event Log - Tests")
+    print("="*60 + "\n")
+
+    passed = [test_read_events(), test_ingest(), test_export_csv()]
+
+    print("="*60)
+    print("✅ ALL TESTS PASSED!" if all(passed) else "❌ SOME TESTS FAILED")
+    print("="*60 + "\n")
+    sys.exit(0 if all(passed) else 1)
+
+
+if __name__ == "__main__":
+    main()
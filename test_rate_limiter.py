@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive rate limiter (rate_limiter.py)
+
+Time is moved by shifting the bucket's refill clock, so nothing sleeps.
+"""
+
+import sys
+import time
+from email.utils import formatdate
+
+from rate_limiter import TokenBucket, AdaptiveRateLimiter, is_rate_limit_error, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+def check(label, passed):
+    print(f"  {'✓' if passed else '✗'} {label}")
+    return passed
+
+
+def test_refill():
+    """Bursts are free, then calls are spaced at the refill rate"""
+    print("Testing token bucket refill...")
+
+    bucket = TokenBucket(rate=2.0, burst=2)
+    burst = [bucket.reserve(), bucket.reserve()]
+    third = bucket.reserve()
+    fourth = bucket.reserve()
+
+    bucket = TokenBucket(rate=2.0, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    bucket.last_refill -= 10
+    refilled = [bucket.reserve(), bucket.reserve()]
+    capped = bucket.reserve()
+
+    results = [
+        check("burst calls don't wait", burst == [0.0, 0.0]),
+        check("next call waits one refill interval", abs(third - 0.5) < 0.01),
+        check("waits queue up behind each other", abs(fourth - 1.0) < 0.01),
+        check("idle time refills the bucket", refilled == [0.0, 0.0]),
+        check("refill is capped at the burst size", capped > 0.4),
+    ]
+
+    if not all(results):
+        print("\n❌ Token bucket refill is wrong\n")
+        return False
+    print("\n✅ Token bucket refills correctly\n")
+    return True
+
+
+def test_backoff():
+    """Throttles back off multiplicatively, honour retry-after, and successes recover the rate"""
+    print("Testing backoff and recovery...")
+
+    bucket = TokenBucket(rate=2.0, burst=4, min_rate=0.3, increase_step=0.5)
+    bucket.on_throttled()
+    after_throttle = bucket.rate
+    drained = bucket.reserve()
+    bucket.on_throttled()
+    bucket.on_throttled()
+    floored = bucket.rate
+
+    bucket.on_throttled(retry_after=5)
+    held = bucket.reserve()
+
+    for _ in range(50):
+        bucket.on_success()
+    recovered = bucket.rate
+
+    results = [
+        check("throttle halves the rate", after_throttle == 1.0),
+        check("throttle empties the bucket", drained > 0.9),
+        check("rate never drops below min_rate", floored == 0.3),
+        check("retry-after holds calls back", held >= 5),
+        check("successes raise the rate up to max_rate", recovered == 8.0),
+    ]
+
+    if not all(results):
+        print("\n❌ Backoff is wrong\n")
+        return False
+    print("\n✅ Backoff works\n")
+    return True
+
+
+def test_errors():
+    """Rate-limit errors are recognised and their retry-after headers read"""
+    print("Testing rate-limit error handling...")
+
+    date = formatdate(time.time() + 30, usegmt=True)
+    limiter = AdaptiveRateLimiter({'anthropic': {'rate': 2.0, 'burst': 4}})
+    throttled = limiter.record_error('anthropic', FakeAPIError("slow down", status_code=429))
+    ignored = limiter.record_error('anthropic', ValueError("bad request"))
+    limiter.record_error('openai', "Error code: 529 - overloaded")
+
+    results = [
+        check("429 status", is_rate_limit_error(FakeAPIError("error", status_code=429))),
+        check("overloaded message", is_rate_limit_error("Overloaded")),
+        check("RESOURCE_EXHAUSTED message", is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED"))),
+        check("other errors", not is_rate_limit_error(ValueError("Invalid API key"))),
+        check("retry-after-ms", retry_after_seconds(FakeAPIError("", headers={'retry-after-ms': '1500'})) == 1.5),
+        check("retry-after seconds", retry_after_seconds(FakeAPIError("", headers={'retry-after': '7'})) == 7.0),
+        check("retry-after date", 25 < (retry_after_seconds(FakeAPIError("", headers={'retry-after': date})) or 0) <= 30),
+        check("no headers", retry_after_seconds(ValueError("nope")) is None),
+        check("limiter backs off on a throttle", throttled and limiter.current_rates()['anthropic'] == 1.0),
+        check("limiter ignores other errors", not ignored and limiter.throttle_events['anthropic'] == 1),
+        check("unknown provider gets a bucket", limiter.throttle_events.get('openai') == 1),
+    ]
+
+    if not all(results):
+        print("\n❌ Rate-limit error handling is wrong\n")
+        return False
+    print("\n✅ Rate-limit errors handled\n")
+    return True
+
+
+def main():
+    print("\n" + "="*60)
+    print("Rate Limiter - Tests")
+    print("="*60 + "\n")
+
+    passed = [test_refill(), test_backoff(), test_errors()]
+
+    print("="*60)
+    print("✅ ALL TESTS PASSED!" if all(passed) else "❌ SOME TESTS FAILED")
+    print("="*60 + "\n")
+    sys.exit(0 if all(passed) else 1)
+
+
+if __name__ == "__main__":
+    main()
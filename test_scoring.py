@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the fast-path scoring tier (scoring.py)
+"""
+
+import os
+import sys
+
+from scoring import fast_path_score, fast_path_regressions, load_history, untested_answers, HISTORY_FILE
+
+ALICE = {
+    'id': 'twin_peaks_002',
+    'prompt': "What's the name of the lady living in the Palmers house at the end of season 3?",
+    'expected_answer': 'Alice Tremond'
+}
+OWLS = {
+    'id': 'twin_peaks_006',
+    'prompt': 'What is the second hint from the giant to agent Dale Cooper?',
+    'expected_answer': 'Owls are not what they seem'
+}
+
+
+def check(label, passed):
+    print(f"  {'✓' if passed else '✗'} {label}")
+    return passed
+
+
+def test_accepts():
+    """Confident answers are scored 1 locally"""
+    print("Testing fast-path accepts...")
+
+    cases = [
+        ("bold answer", 'The lady is **Alice Tremond**.', ALICE),
+        ("first sentence", 'It was Alice Tremond. She showed Carrie the house.', ALICE),
+        ("negation inside the answer", '**Owls are not what they seem**', OWLS),
+        ("leading article", 'The giant says: **The owls are not what they seem.**', OWLS),
+        ("parenthetical in expected answer", 'It was Alice Tremond.',
+         dict(ALICE, expected_answer='Alice Tremond (the owner)')),
+        ("alias", 'It was **Mrs. Tremond**.', dict(ALICE, aliases=['Mrs. Tremond'])),
+    ]
+    results = [check(label, fast_path_score(response, case) is not None) for label, response, case in cases]
+
+    if not all(results):
+        print("\n❌ Fast path rejected a confident answer\n")
+        return False
+    print("\n✅ Fast path accepts confident answers\n")
+    return True
+
+
+def test_escalates():
+    """Negated, hedged, buried and generic answers go to the judge"""
+    print("Testing fast-path escalations...")
+
+    cases = [
+        ("negated", 'It is not Alice Tremond. The owner is Mrs. Chalfont.', ALICE),
+        ("negated answer that contains a negation", 'The hint is not "owls are not what they seem".', OWLS),
+        ("correction in the opening sentence", 'Alice Tremond, not the Chalfonts.', ALICE),
+        ("hedged", "I'm not sure, but I think it is Alice Tremond.", ALICE),
+        ("hedged after the answer", 'Probably Alice Tremond, though it is unclear.', ALICE),
+        ("commits to another answer", '**Mrs. Chalfont**. Alice Tremond bought it later.', ALICE),
+        ("too long", 'Alice Tremond ' + 'and more ' * 70, ALICE),
+        ("single-word answer", '**Red**', {'id': 'twin_peaks_008', 'prompt': '?', 'expected_answer': 'red'}),
+        ("generic answer", 'Who is Judy?', {'id': 'twin_peaks_009', 'prompt': '?', 'expected_answer': 'Who is Judy?'}),
+        ("empty response", '', ALICE),
+    ]
+    results = [check(label, fast_path_score(response, case) is None) for label, response, case in cases]
+
+    if not all(results):
+        print("\n❌ Fast path accepted an answer it should escalate\n")
+        return False
+    print("\n✅ Fast path escalates what it can't be sure of\n")
+    return True
+
+
+def test_history_checks():
+    """Disagreements with the judge and untested answers are reported"""
+    print("Testing history replay...")
+
+    def row(case, response, score):
+        return {'question_id': case['id'], 'question': case['prompt'], 'expected_answer': case['expected_answer'],
+                'response': response, 'score': score, 'model': 'Test', 'mode': 'NO SEARCH', 'trial': '1'}, case
+
+    history = [
+        row(ALICE, '**Alice Tremond**', '1'),
+        row(ALICE, 'It was Alice Tremond.', '0'),
+        row(ALICE, 'It is not Alice Tremond.', '0'),
+    ]
+    accepted, disagreements = fast_path_regressions(history)
+    results = [
+        check("accepted responses are counted", accepted == 2),
+        check("judge's 0 on an accepted response is a disagreement", len(disagreements) == 1),
+        check("history covers its own answers", untested_answers([ALICE], history) == []),
+        check("question without history is untested", untested_answers([ALICE, OWLS], history) == [OWLS['id']]),
+        check("changed answer is untested",
+              untested_answers([dict(ALICE, expected_answer='Sarah Palmer')], history) == [ALICE['id']]),
+    ]
+
+    if os.path.exists(HISTORY_FILE):
+        accepted, disagreements = fast_path_regressions()
+        results.append(check(f"v1 results: {accepted} accepted, {len(disagreements)} disagreements",
+                             not disagreements))
+        results.append(check("v1 results cover the v1 eval set",
+                             untested_answers([case for _, case in load_history()], load_history()) == []))
+
+    if not all(results):
+        print("\n❌ History replay is wrong\n")
+        return False
+    print("\n✅ History replay works\n")
+    return True
+
+
+def main():
+    print("\n" + "="*60)
+    print("Fast Path Scoring - Tests")
+    print("="*60 + "\n")
+
+    results = [test_accepts(), test_escalates(), test_history_checks()]
+
+    print("="*60)
+    print("✅ ALL TESTS PASSED!" if all(results) else "❌ SOME TESTS FAILED")
+    print("="*60 + "\n")
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL statistics (stats.py, EvalLogger.get_leaderboard, results_store.py)
+
+Builds a throwaway database and checks the SQL numbers against the
+per-question Python computation the runner used before.
+"""
+
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+
+from eval_logger import EvalLogger, RUN_KIND_BENCHMARK, RUN_KIND_RERUN
+from results_store import ResultsStore
+from stats import compute_stats
+
+MODELS = ["Model A", "Model B"]
+MODES = ["NO SEARCH", "WITH SEARCH"]
+QUESTIONS = [f"q{n:03d}" for n in range(1, 13)]
+NUM_TRIALS = 3
+BENCHMARK_RUN = "20260101_120000"
+RERUN_RUN = "20260101_130000"
+
+
+def check(label, passed):
+    print(f"  {'✓' if passed else '✗'} {label}")
+    return passed
+
+
+def close(a, b):
+    return abs(a - b) < 1e-9
+
+
+def python_stats(results):
+    """The runner's old calculate_stats, over {(model, mode): {question_id: [scores]}}"""
+    stats = {}
+    for key, questions in results.items():
+        pass1_scores = []
+        passN_scores = []
+        all_trial_scores = []
+        for scores in questions.values():
+            pass1_scores.append(scores[0] if scores else 0)
+            passN_scores.append(1 if any(scores) else 0)
+            all_trial_scores.extend(scores)
+        stats[key] = {
+            'pass@1': statistics.mean(pass1_scores) * 100,
+            'pass@k': statistics.mean(passN_scores) * 100,
+            'accuracy': statistics.mean(all_trial_scores) * 100
+        }
+    return stats
+
+
+def build_run(logger, run_id, seed, kind=RUN_KIND_BENCHMARK):
+    """Log a complete random run; returns its scores as python_stats() takes them.
+
+    Errors score 0, and a few trials fail first and are retried, replacing their error row.
+    """
+    rng = random.Random(seed)
+    logger.create_run(run_id, "test", None, NUM_TRIALS, MODELS, MODES, kind=kind)
+
+    results = {}
+    for mode in MODES:
+        eval_ids = {
+            question_id: logger.log_evaluation(f"Question {question_id}?", "Answer", eval_name=f"test ({mode}) - RUN_{run_id}")
+            for question_id in QUESTIONS
+        }
+        logger.plan_trials(run_id, mode, [
+            (question_id, model, trial, eval_ids[question_id])
+            for question_id in QUESTIONS for model in MODELS for trial in range(1, NUM_TRIALS + 1)
+        ])
+
+        batch = []
+        retries = []
+        for question_id in QUESTIONS:
+            for model in MODELS:
+                scores = []
+                for trial in range(1, NUM_TRIALS + 1):
+                    key = (run_id, mode, question_id, model, trial)
+                    if rng.random() < 0.1:
+                        batch.append(({'eval_id': eval_ids[question_id], 'model_name': model, 'response': None,
+                                       'error': "Timeout", 'latency': rng.uniform(1, 30)}, key + ('error',)))
+                        scores.append(0)
+                        continue
+                    score = 1 if rng.random() < 0.6 else 0
+                    response = {'eval_id': eval_ids[question_id], 'model_name': model,
+                                'response': f"Answer {rng.random()}", 'latency': rng.uniform(1, 30),
+                                'tier': 'judge', 'score': score, 'reasoning': "Test"}
+                    if rng.random() < 0.1:
+                        batch.append((dict(response, response=None, error="Timeout", score=None), key + ('error',)))
+                        retries.append((response, key + ('done',)))
+                    else:
+                        batch.append((response, key + ('done',)))
+                    scores.append(score)
+                results.setdefault((model, mode), {})[question_id] = scores
+
+        logger.write_responses(batch)
+        logger.write_responses(retries)
+
+    logger.set_run_status(run_id, 'complete')
+    logger.flush()
+    return results
+
+
+def build_history(work_dir):
+    """A database holding one benchmark run and one later rerun; returns (db path, benchmark scores)"""
+    db_path = os.path.join(work_dir, "eval_history.db")
+    with EvalLogger(db_path) as logger:
+        results = build_run(logger, BENCHMARK_RUN, seed=1)
+        build_run(logger, RERUN_RUN, seed=2, kind=RUN_KIND_RERUN)
+    return db_path, results
+
+
+def test_sql_matches_python():
+    """compute_stats and get_leaderboard agree with the Python stats"""
+    print("Testing SQL stats against the Python computation...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        db_path, results = build_history(work_dir)
+        with EvalLogger(db_path) as logger:
+            sql = {(row['model_name'], row['mode']): row for row in compute_stats(logger.conn, run_ids=[BENCHMARK_RUN])}
+            leaderboard = {(row['model_name'], row['mode']): row for row in logger.get_leaderboard(BENCHMARK_RUN)}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    expected = python_stats(results)
+    passed = check("one row per (model, mode)", set(sql) == set(expected) == set(leaderboard))
+    for key, python_row in expected.items():
+        for name, rows in (("compute_stats", sql), ("get_leaderboard", leaderboard)):
+            row = rows.get(key)
+            matches = row is not None and row['questions'] == len(QUESTIONS) \
+                and row['trials'] == len(QUESTIONS) * NUM_TRIALS \
+                and close(row['pass_at_1'], python_row['pass@1']) \
+                and close(row['pass_at_k'], python_row['pass@k']) \
+                and close(row['accuracy'], python_row['accuracy'])
+            passed = check(f"{name} {key[0]} / {key[1]}", matches) and passed
+
+    if not passed:
+        print("\n❌ SQL stats disagree with the Python stats\n")
+        return False
+    print("\n✅ SQL stats match\n")
+    return True
+
+
+def test_results_store():
+    """latest_run skips reruns; iter_trials and stats see every finished trial"""
+    print("Testing results store...")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        db_path, _ = build_history(work_dir)
+        with ResultsStore(db_path) as store:
+            trials = list(store.iter_trials(run_ids=[BENCHMARK_RUN], with_text=False))
+            latest = store.latest_run()
+            latest_any = store.latest_run(include_reruns=True)
+            by_run = store.stats(by_run=True)
+            responses = store.conn.execute('SELECT COUNT(*) FROM model_responses').fetchone()[0]
+            planned = store.conn.execute('SELECT COUNT(*) FROM trials').fetchone()[0]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = [
+        check("latest run skips reruns", latest is not None and latest['run_id'] == BENCHMARK_RUN),
+        check("latest run with reruns", latest_any is not None and latest_any['run_id'] == RERUN_RUN),
+        check("every trial is finished",
+              len(trials) == len(MODELS) * len(MODES) * len(QUESTIONS) * NUM_TRIALS),
+        check("retried trials keep their successful response",
+              all(trial.error is None for trial in trials if trial.score is not None)),
+        check("replaced error rows are deleted", responses == planned),
+        check("by-run stats cover both runs", {row['run_id'] for row in by_run} == {BENCHMARK_RUN, RERUN_RUN}),
+    ]
+
+    if not all(results):
+        print("\n❌ Results store is wrong\n")
+        return False
+    print("\n✅ Results store works\n")
+    return True
+
+
+def main():
+    print("\n" + "="*60)
+    print("SQL Statistics - Tests")
+    print("="*60 + "\n")
+
+    passed = [test_sql_matches_python(), test_results_store()]
+
+    print("="*60)
+    print("✅ ALL TESTS PASSED!" if all(passed) else "❌ SOME TESTS FAILED")
+    print("="*60 + "\n")
+    sys.exit(0 if all(passed) else 1)
+
+
+if __name__ == "__main__":
+    main()
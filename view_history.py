@@ -1,24 +1,111 @@
+import argparse
+import sqlite3
+
 from eval_logger import EvalLogger
-from datetime import datetime
+from results_store import ResultsStore
+from search import search_responses
+from stats import compute_stats, format_table
+
+def show_history(logger):
+    print("\n" + "="*70)
+    print("EVALUATION HISTORY")
+    print("="*70)
+
+    stats = logger.get_stats()
+
+    print(f"\n📊 STATS:")
+    print(f"   Total Evaluations: {stats['total_evaluations']}")
+    print(f"\n   Model Performance:")
+
+    for model, count, latency in stats['model_stats']:
+        latency_str = f"{latency:.2f}s" if latency else "N/A"
+        print(f"   • {model:20s}: {count} tests, {latency_str} avg latency")
+
+    print("\n" + "="*70)
+    print("View detailed history:")
+    print("  sqlite3 eval_history.db 'SELECT * FROM evaluations;'")
+    # Response/reasoning text is stored compressed; the search index has a plain copy
+    print("  sqlite3 eval_history.db 'SELECT id, model_name, score, error, latency_seconds FROM model_responses;'")
+    print("  sqlite3 eval_history.db 'SELECT rowid, response, reasoning FROM response_search;'")
+    print("  python view_history.py stats --help")
+    print("  python view_history.py search --help")
+    print("="*70 + "\n")
+
+def show_stats(logger, args):
+    run_ids = args.run
+    if not run_ids and not args.all_runs:
+        # Default to the most recent run
+        latest = ResultsStore(logger=logger).latest_run()
+        if latest is None:
+            print("No runs found in database")
+            return
+        run_ids = [latest['run_id']]
+
+    rows = compute_stats(logger.conn, run_ids=run_ids, models=args.model, modes=args.mode, by_run=args.by_run)
+
+    print("\n" + "="*70)
+    print(f"STATS: {', '.join(run_ids) if run_ids else 'all runs'}")
+    print("="*70)
+    if not rows:
+        print("No finished trials match these filters")
+        return
+    print(format_table(rows))
+    print()
+
+def show_search(logger, args):
+    query = ' '.join(args.query)
+    try:
+        rows = search_responses(logger.conn, query, run_ids=args.run, models=args.model, modes=args.mode, limit=args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Bad search query ({e}); wrap phrases and punctuation in double quotes")
+        return
+
+    print("\n" + "="*70)
+    print(f"SEARCH: {query}")
+    print("="*70)
+    if not rows:
+        print("No matching responses")
+        return
 
-logger = EvalLogger()
+    for row in rows:
+        if row['run_id']:
+            where = f"{row['run_id']} {row['mode']} {row['question_id']} trial {row['trial']}"
+        else:
+            where = f"response #{row['response_id']} (no run)"
+        verdict = "ERROR" if row['error'] else ("PASS" if row['score'] == 1 else "FAIL")
+        print(f"\n• {row['model_name']} — {where} [{verdict}]")
+        if row['response_snippet']:
+            print(f"  Response:  {' '.join(row['response_snippet'].split())}")
+        if row['reasoning_snippet']:
+            print(f"  Reasoning: {' '.join(row['reasoning_snippet'].split())}")
+    print(f"\n{len(rows)} matches (best first, at most --limit {args.limit})")
+    print()
 
-print("\n" + "="*70)
-print("EVALUATION HISTORY")
-print("="*70)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Browse eval_history.db")
+    subparsers = parser.add_subparsers(dest='command')
 
-stats = logger.get_stats()
+    stats_parser = subparsers.add_parser('stats', help="Pass@1/Pass@k/accuracy, error rate and latency percentiles")
+    stats_parser.add_argument('--run', action='append', metavar='RUN_ID', help="Run ID (repeatable; default: latest run)")
+    stats_parser.add_argument('--all-runs', action='store_true', help="Pool every run in the database")
+    stats_parser.add_argument('--model', action='append', help="Only this model (repeatable)")
+    stats_parser.add_argument('--mode', action='append', choices=['NO SEARCH', 'WITH SEARCH'], help="Only this mode")
+    stats_parser.add_argument('--by-run', action='store_true', help="One row per run instead of pooling runs")
 
-print(f"\n📊 STATS:")
-print(f"   Total Evaluations: {stats['total_evaluations']}")
-print(f"\n   Model Performance:")
+    search_parser = subparsers.add_parser('search', help="Full-text search over responses and judge reasoning")
+    search_parser.add_argument('query', nargs='+', help='FTS5 query, e.g. cobra kai, "black lodge", reasoning: hallucinat*')
+    search_parser.add_argument('--run', action='append', metavar='RUN_ID', help="Only this run (repeatable; default: all runs)")
+    search_parser.add_argument('--model', action='append', help="Only this model (repeatable)")
+    search_parser.add_argument('--mode', action='append', choices=['NO SEARCH', 'WITH SEARCH'], help="Only this mode")
+    search_parser.add_argument('--limit', type=int, default=20, help="Most matches to show (default: 20)")
 
-for model, count, latency in stats['model_stats']:
-    latency_str = f"{latency:.2f}s" if latency else "N/A"
-    print(f"   • {model:20s}: {count} tests, {latency_str} avg latency")
+    args = parser.parse_args()
 
-print("\n" + "="*70)
-print("View detailed history:")
-print("  sqlite3 eval_history.db 'SELECT * FROM evaluations;'")
-print("  sqlite3 eval_history.db 'SELECT * FROM model_responses;'")
-print("="*70 + "\n")
+    logger = EvalLogger()
+    if args.command == 'stats':
+        show_stats(logger, args)
+    elif args.command == 'search':
+        show_search(logger, args)
+    else:
+        show_history(logger)
+    logger.close()
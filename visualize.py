@@ -6,11 +6,22 @@ import glob
 import json
 from datetime import datetime
 
+import columnar
+from results_store import MODE_LABELS
+
+# Columns the charts use; benchmark Parquet files are read without the response text
+CHART_COLUMNS = ['model', 'mode', 'category', 'score', 'latency']
+
 def load_all_results():
-    """Load all result CSV files"""
-    result_files = glob.glob("results_*.csv")
-    
-    if not result_files:
+    """Load evaluator result CSVs and benchmark Parquet exports"""
+    # results_detailed/summary CSVs are benchmark exports with different columns; their Parquet copies are read instead
+    result_files = [f for f in glob.glob("results_*.csv") if not f.startswith(("results_detailed_", "results_summary_"))]
+    parquet_files = glob.glob("results_detailed_*.parquet")
+    if parquet_files and not columnar.available():
+        print(f"⚠️  Skipping {len(parquet_files)} benchmark Parquet files: pyarrow is not installed (pip install pyarrow)")
+        parquet_files = []
+    
+    if not result_files and not parquet_files:
         print("No result files found. Run evaluator.py first!")
         return None
     
@@ -18,8 +29,19 @@ def load_all_results():
     for file in sorted(result_files):
         df = pd.read_csv(file)
         all_results.append(df)
+    for file in sorted(parquet_files):
+        df = columnar.read_frame(file, columns=CHART_COLUMNS)
+        all_results.append(df)
+    
+    df = pd.concat(all_results, ignore_index=True)
+    
+    # Benchmark runs hold both modes; each (model, mode) pair is charted as its own series
+    if 'mode' in df.columns:
+        modes = df['mode'].astype(object)
+        labelled = df['model'].astype(str) + " (" + modes.map(lambda mode: MODE_LABELS.get(mode, mode)) + ")"
+        df['model'] = labelled.where(modes.notna(), df['model'].astype(str))
     
-    return pd.concat(all_results, ignore_index=True)
+    return df
 
 def create_completion_rate_chart(df):
     """Create bar chart of completion rates by model"""
@@ -165,7 +187,7 @@ def generate_html_report(df, output_file="evaluation_report.html"):
     comparison_table = create_detailed_comparison(df)
     
     # Try to create time series if multiple timestamps exist
-    if df['timestamp'].nunique() > 1:
+    if 'timestamp' in df.columns and df['timestamp'].nunique() > 1:
         time_chart = create_time_series_chart(df)
     else:
         time_chart = None